@@ -0,0 +1,1334 @@
+#!/usr/bin/env python3
+"""
+Usage:
+    python audio_benchmark.py suite [--durations <sec> ...] [--output <json>] [--compare <json>]
+    python audio_benchmark.py compare <baseline.json> <results.json>
+    python audio_benchmark.py envelope [--minutes <n>] [--sample_rate <hz>]
+    python audio_benchmark.py ticks [--minutes <n>] [--sample_rate <hz>] [--bpm <n>]
+    python audio_benchmark.py precision [--minutes <n>] [--sample_rate <hz>] [--channels <n>]
+    python audio_benchmark.py targets [--minutes <n>] [--sample_rate <hz>] [--channels <n>]
+    python audio_benchmark.py executor [--files <n>] [--seconds <sec>] [--jobs <n>] [--io_threads <n>]
+    python audio_benchmark.py encode [--minutes <n>] [--sample_rate <hz>] [--channels <n>] [--threads <n>]
+    python audio_benchmark.py api [--seconds <sec>] [--calls <n>] [--sample_rate <hz>]
+    python audio_benchmark.py scan [--dirs <n>] [--files_per_dir <n>] [--depth <n>]
+    python audio_benchmark.py startup [--repeat <n>]
+    python audio_benchmark.py watch [--files <n>] [--seconds <sec>] [--settle <sec>]
+    python audio_benchmark.py serve [--requests <n>] [--clients <n>] [--seconds <sec>] [--jobs <n>] [--queue <n>]
+    python audio_benchmark.py analyze [--files <n>] [--seconds <sec>] [--sample_rate <hz>]
+
+Reproducible benchmarks for audio_processor.py on deterministic synthetic input
+(click trains, pink-noise ambience and breathing-like envelopes, mono and stereo).
+
+Examples:
+    python audio_benchmark.py suite --output benchmarks/baseline.json
+    python audio_benchmark.py suite --compare benchmarks/baseline.json
+    python audio_benchmark.py suite --full --output full.json
+    python audio_benchmark.py envelope --minutes 10 --sample_rate 48000
+    python audio_benchmark.py ticks --minutes 60 --bpm 97
+    python audio_benchmark.py precision --minutes 10 --channels 2
+    python audio_benchmark.py targets --minutes 5
+    python audio_benchmark.py executor --files 48 --jobs 8
+    python audio_benchmark.py encode --minutes 2 --threads 3
+    python audio_benchmark.py api --seconds 2 --calls 20
+    python audio_benchmark.py scan --dirs 200 --files_per_dir 100
+    python audio_benchmark.py startup --repeat 5
+    python audio_benchmark.py watch --files 10 --settle 0.5
+    python audio_benchmark.py serve --requests 24 --clients 8 --queue 2
+    python audio_benchmark.py analyze --files 6 --seconds 120
+"""
+
+import io
+import os
+import sys
+import argparse
+import contextlib
+import http.client
+import json
+import math
+import platform
+import shutil
+import signal as os_signal
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+try:
+    import numpy as np
+    import scipy
+    import soundfile as sf
+    from scipy import signal
+except ImportError as e:
+    print("Error: Required libraries are not installed.")
+    print("Please run: pip install -r requirements.txt")
+    print(f"Missing: {e.name}")
+    sys.exit(1)
+
+import audio_processor as ap
+
+DEFAULT_DURATIONS_SEC = [1.0, 10.0, 60.0]
+FULL_DURATIONS_SEC = [1.0, 10.0, 60.0, 600.0, 3600.0]
+DEFAULT_SAMPLE_RATE = 48000
+DEFAULT_REPEAT = 3
+DEFAULT_REGRESSION_THRESHOLD = 0.15  # Flag results more than 15% slower than the baseline
+DEFAULT_MIN_SECONDS = 0.005  # Ignore timings too short to compare reliably
+
+def click_train(duration_sec: float, sample_rate: int, channels: int = 1, bpm: float = 60.0, seed: int = 0) -> np.ndarray:
+    """
+    Generate a metronome-like click train over a faint hiss floor.
+
+    Each click is a 2 kHz burst with a 4 ms exponential decay. Leading and trailing
+    silence is included so trimming has work to do.
+
+    Args:
+        duration_sec: Length in seconds
+        sample_rate: Sample rate in Hz
+        channels: Number of channels (stereo uses a slightly quieter right channel)
+        bpm: Clicks per minute
+        seed: Random seed for reproducible input
+
+    Returns:
+        Audio as (samples x channels) float64 array
+    """
+    rng = np.random.default_rng(seed)
+    num_samples = int(duration_sec * sample_rate)
+    audio = rng.normal(0.0, 0.0005, num_samples)
+
+    t = np.arange(int(0.03 * sample_rate)) / sample_rate
+    click = 0.6 * np.sin(2 * np.pi * 2000.0 * t) * np.exp(-t / 0.004)
+    period = sample_rate * 60.0 / bpm
+    lead = int(0.1 * sample_rate)
+    positions = np.arange(lead, num_samples - len(click) - lead, period).astype(int)
+    for position in positions:
+        audio[position:position + len(click)] += click
+
+    audio[:lead // 2] = 0.0
+    audio[num_samples - lead // 2:] = 0.0
+    return _to_channels(audio, channels)
+
+def pink_noise_ambience(duration_sec: float, sample_rate: int, channels: int = 1, seed: int = 0) -> np.ndarray:
+    """
+    Generate pink (1/f) noise ambience using Paul Kellet's economy filter.
+
+    Args:
+        duration_sec: Length in seconds
+        sample_rate: Sample rate in Hz
+        channels: Number of channels (channels are decorrelated)
+        seed: Random seed for reproducible input
+
+    Returns:
+        Audio as (samples x channels) float64 array, about -20 dBFS RMS
+    """
+    rng = np.random.default_rng(seed)
+    num_samples = int(duration_sec * sample_rate)
+    b = [0.049922035, -0.095993537, 0.050612699, -0.004408786]
+    a = [1.0, -2.494956002, 2.017265875, -0.522189400]
+    white = rng.normal(0.0, 1.0, (num_samples, channels))
+    pink = signal.lfilter(b, a, white, axis=0)
+    pink *= 0.1 / (np.std(pink) + 1e-12)
+    return pink
+
+def breathing_texture(duration_sec: float, sample_rate: int, channels: int = 1, seed: int = 0) -> np.ndarray:
+    """
+    Generate a breathing-like texture: band-limited noise under slow inhale/exhale swells.
+
+    Args:
+        duration_sec: Length in seconds
+        sample_rate: Sample rate in Hz
+        channels: Number of channels
+        seed: Random seed for reproducible input
+
+    Returns:
+        Audio as (samples x channels) float64 array
+    """
+    rng = np.random.default_rng(seed)
+    num_samples = int(duration_sec * sample_rate)
+    sos = signal.butter(2, [300.0, 3000.0], btype='bandpass', fs=sample_rate, output='sos')
+    noise = signal.sosfilt(sos, rng.normal(0.0, 1.0, num_samples))
+
+    # 4 s breath cycle: inhale swell, exhale swell, short pause
+    t = np.arange(num_samples) / sample_rate
+    phase = (t % 4.0) / 4.0
+    envelope = np.where(phase < 0.4, np.sin(np.pi * phase / 0.4), 0.0)
+    envelope += np.where((phase >= 0.45) & (phase < 0.9), 0.7 * np.sin(np.pi * (phase - 0.45) / 0.45), 0.0)
+    audio = noise * envelope ** 2
+    audio *= 0.3 / (np.max(np.abs(audio)) + 1e-12)
+    return _to_channels(audio, channels)
+
+def _to_channels(audio: np.ndarray, channels: int) -> np.ndarray:
+    """Expand a mono signal to (samples x channels), attenuating each extra channel slightly."""
+    return np.stack([audio * (0.9 ** ch) for ch in range(channels)], axis=1)
+
+SIGNAL_GENERATORS: Dict[str, Callable[..., np.ndarray]] = {
+    'click_60bpm': lambda d, sr, ch: click_train(d, sr, ch, bpm=60.0),
+    'click_120bpm': lambda d, sr, ch: click_train(d, sr, ch, bpm=120.0),
+    'pink_ambience': pink_noise_ambience,
+    'breathing': breathing_texture,
+}
+
+def _time_call(func: Callable[[], object], repeat: int) -> float:
+    """Return the fastest of `repeat` wall-clock timings of func(), with its output suppressed."""
+    best = float('inf')
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+def benchmark_signal(audio: np.ndarray, sample_rate: int, repeat: int, work_dir: Path) -> Dict[str, dict]:
+    """
+    Time each public pipeline function and the end-to-end process_audio_file on one input.
+
+    Args:
+        audio: Input audio as (samples x channels)
+        sample_rate: Sample rate in Hz
+        repeat: Number of runs per function (the fastest is kept)
+        work_dir: Scratch directory for the end-to-end input and output files
+
+    Returns:
+        Mapping of function name to {"seconds": ..., "realtime_factor": ...}
+    """
+    duration = len(audio) / sample_rate
+    data = audio[:, 0] if audio.shape[1] == 1 else audio
+    functions = {
+        'trim_silence': lambda: ap.trim_silence(data.copy(), sample_rate),
+        'apply_noise_reduction': lambda: ap.apply_noise_reduction(data, sample_rate),
+        'apply_crossfade': lambda: ap.apply_crossfade(data.copy(), sample_rate, ap.DEFAULT_XFADE_DURATION_MS),
+        'normalize_lufs': lambda: ap.normalize_lufs(data, sample_rate),
+        'stabilize_loop': lambda: ap.stabilize_loop(data.copy(), sample_rate),
+    }
+
+    input_path = work_dir / 'input.wav'
+    output_path = work_dir / 'output.wav'
+    sf.write(str(input_path), data.astype(np.float32), sample_rate, subtype='PCM_24')
+    functions['process_audio_file'] = lambda: ap.process_audio_file(input_path, output_path)
+
+    results = {}
+    for name, func in functions.items():
+        seconds = _time_call(func, repeat)
+        results[name] = {'seconds': seconds, 'realtime_factor': duration / max(seconds, 1e-12)}
+    return results
+
+def run_suite(
+    durations: List[float],
+    sample_rate: int,
+    channel_counts: List[int],
+    signals: List[str],
+    repeat: int
+) -> dict:
+    """
+    Run the benchmark suite over every signal, channel count and duration, then the
+    CLI startup scenarios (see measure_startup).
+
+    Args:
+        durations: Input durations in seconds
+        sample_rate: Sample rate in Hz
+        channel_counts: Channel counts to test (1 = mono, 2 = stereo)
+        signals: Names from SIGNAL_GENERATORS
+        repeat: Number of runs per function (the fastest is kept)
+
+    Returns:
+        Results document ({"meta": ..., "results": {"<signal>/<n>ch/<dur>s/<function>": ...}})
+    """
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='hqabp_bench_') as temp_dir:
+        for signal_name in signals:
+            for channels in channel_counts:
+                for duration in durations:
+                    audio = SIGNAL_GENERATORS[signal_name](duration, sample_rate, channels)
+                    case = f"{signal_name}/{channels}ch/{duration:g}s"
+                    print(f"{case}")
+                    for name, entry in benchmark_signal(audio, sample_rate, repeat, Path(temp_dir)).items():
+                        results[f"{case}/{name}"] = entry
+                        print(f"  {name:<24} {entry['seconds']:9.4f} s  {entry['realtime_factor']:10.1f}x realtime")
+        print("startup")
+        for name, entry in measure_startup(repeat, Path(temp_dir)).items():
+            results[name] = entry
+            print(f"  {name.split('/', 1)[1]:<24} {entry['seconds']:9.4f} s  imports: {', '.join(entry['modules']) or 'none'}")
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'scipy': scipy.__version__,
+            'cpu_count': os.cpu_count(),
+            'pipeline_version': ap.PIPELINE_VERSION,
+            'sample_rate': sample_rate,
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+def compare_results(
+    baseline: dict,
+    current: dict,
+    threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+    min_seconds: float = DEFAULT_MIN_SECONDS
+) -> List[str]:
+    """
+    Compare two results documents and report regressions.
+
+    Args:
+        baseline: Baseline results document
+        current: New results document
+        threshold: Relative slowdown that counts as a regression (0.15 = 15% slower)
+        min_seconds: Entries faster than this in both runs are ignored as noise
+
+    Returns:
+        List of regressed entry names
+    """
+    regressions = []
+    baseline_results = baseline.get('results', {})
+    for name, entry in sorted(current.get('results', {}).items()):
+        reference = baseline_results.get(name)
+        if reference is None:
+            continue
+        old_seconds = reference['seconds']
+        new_seconds = entry['seconds']
+        change = (new_seconds - old_seconds) / max(old_seconds, 1e-12)
+        if max(old_seconds, new_seconds) < min_seconds:
+            status = 'noise'
+        elif change > threshold:
+            status = 'REGRESSION'
+            regressions.append(name)
+        elif change < -threshold:
+            status = 'faster'
+        else:
+            status = 'ok'
+        print(f"  {status:<10} {name:<60} {old_seconds:9.4f} s -> {new_seconds:9.4f} s ({change:+.1%})")
+    return regressions
+
+def _reference_smooth_gain_curve(values: np.ndarray, sample_rate: int, attack_ms: float, release_ms: float) -> np.ndarray:
+    """
+    Original per-sample attack/release recursion, kept as the correctness and speed baseline.
+    """
+    if values.size == 0:
+        return values
+
+    attack_ms = max(0.1, attack_ms)
+    release_ms = max(0.1, release_ms)
+    attack_coeff = math.exp(-1.0 / max(1.0, sample_rate * (attack_ms / 1000.0)))
+    release_coeff = math.exp(-1.0 / max(1.0, sample_rate * (release_ms / 1000.0)))
+
+    smoothed = np.zeros_like(values)
+    smoothed[0] = values[0]
+    for i in range(1, len(values)):
+        coeff = attack_coeff if values[i] < smoothed[i - 1] else release_coeff
+        smoothed[i] = (coeff * smoothed[i - 1]) + ((1.0 - coeff) * values[i])
+    return smoothed
+
+def synthetic_gate_curve(duration_sec: float, sample_rate: int, seed: int = 0) -> np.ndarray:
+    """
+    Build a deterministic noise-gate target gain curve like apply_noise_reduction produces.
+
+    The source is a hiss floor hovering around the default gate threshold with slow level
+    swings and periodic clicks, which exercises frequent attack/release switching.
+
+    Args:
+        duration_sec: Length of the curve in seconds
+        sample_rate: Sample rate in Hz
+        seed: Random seed for reproducible input
+
+    Returns:
+        Target gain curve (float64, one value per sample)
+    """
+    rng = np.random.default_rng(seed)
+    num_samples = int(duration_sec * sample_rate)
+    t = np.arange(num_samples) / sample_rate
+    hiss = rng.normal(0.0, 1.0, num_samples) * 0.003 * (1.0 + np.sin(2 * np.pi * 0.4 * t))
+    hiss[::sample_rate] += 0.5
+
+    window_samples = max(1, int(sample_rate * ap.DEFAULT_NOISE_GATE_WINDOW_MS / 1000.0))
+    kernel = np.ones(window_samples) / float(window_samples)
+    rms_envelope = np.sqrt(np.convolve(hiss ** 2, kernel, mode='same') + 1e-12)
+
+    threshold_linear = 10 ** (ap.DEFAULT_NOISE_GATE_THRESHOLD_DB / 20.0)
+    reduction_linear = 10 ** (-abs(ap.DEFAULT_NOISE_REDUCTION_DB) / 20.0)
+    ratio = np.clip(rms_envelope / (threshold_linear + 1e-12), 0.0, 1.0)
+    return reduction_linear + (1.0 - reduction_linear) * ratio
+
+def benchmark_envelope(minutes: float, sample_rate: int, tolerance: float = 1e-9) -> bool:
+    """
+    Compare _smooth_gain_curve against the per-sample reference on multi-minute curves.
+
+    Runs the synthetic gate curve, where attack and release alternate in long runs, and
+    seeded white noise, where the decision flips every few samples.
+
+    Args:
+        minutes: Input length in minutes
+        sample_rate: Sample rate in Hz
+        tolerance: Maximum allowed absolute difference
+
+    Returns:
+        True if the outputs match within tolerance
+    """
+    curves = {
+        'gate curve': synthetic_gate_curve(minutes * 60.0, sample_rate),
+        'white noise': np.random.default_rng(0).random(int(minutes * 60.0 * sample_rate)),
+    }
+    attack_ms = ap.DEFAULT_NOISE_GATE_ATTACK_MS
+    release_ms = ap.DEFAULT_NOISE_GATE_RELEASE_MS
+    print(f"Envelope follower: {minutes:g} min at {sample_rate} Hz ({len(curves['gate curve']):,} samples)")
+
+    matches = True
+    for name, values in curves.items():
+        print(f"  {name}:")
+        start = time.perf_counter()
+        reference = _reference_smooth_gain_curve(values, sample_rate, attack_ms, release_ms)
+        reference_time = time.perf_counter() - start
+        print(f"    Per-sample loop:   {reference_time:8.3f} s")
+
+        start = time.perf_counter()
+        result = ap._smooth_gain_curve(values, sample_rate, attack_ms, release_ms)
+        result_time = time.perf_counter() - start
+        print(f"    _smooth_gain_curve:{result_time:8.3f} s")
+
+        max_error = float(np.max(np.abs(result - reference)))
+        print(f"    Speedup:           {reference_time / max(result_time, 1e-9):8.1f}x")
+        print(f"    Max abs error:     {max_error:.3e} (tolerance {tolerance:.0e})")
+        matches = matches and max_error <= tolerance
+    return matches
+
+def _reference_tick_period(mono_envelope: np.ndarray, sample_rate: int) -> int:
+    """
+    Original full-rate tick detector and integer median period, kept as the speed and accuracy baseline.
+    """
+    peak_amp = np.max(mono_envelope)
+    min_distance = max(1, int(sample_rate * 0.05))
+    peaks, _ = signal.find_peaks(mono_envelope, height=peak_amp * 0.2, distance=min_distance)
+    return int(np.median(np.diff(peaks[1:-1])))
+
+def benchmark_ticks(minutes: float, sample_rate: int, bpm: float, tolerance: float = 0.01) -> bool:
+    """
+    Compare _detect_ticks against the full-rate reference on a long metronome recording.
+
+    Reports detection time, the error of each period estimate against the true click
+    period, and the drift that error accumulates over the recording.
+
+    Args:
+        minutes: Input length in minutes
+        sample_rate: Sample rate in Hz
+        bpm: Clicks per minute (pick a tempo whose period is not a whole number of samples)
+        tolerance: Maximum allowed period error of _detect_ticks in samples
+
+    Returns:
+        True if the fitted period is within tolerance
+    """
+    envelope = np.abs(click_train(minutes * 60.0, sample_rate, bpm=bpm)[:, 0])
+    true_period = sample_rate * 60.0 / bpm
+    num_periods = len(envelope) / true_period
+    print(f"Tick detection: {minutes:g} min at {sample_rate} Hz, {bpm:g} BPM (period {true_period:.4f} samples)")
+
+    start = time.perf_counter()
+    reference_period = _reference_tick_period(envelope, sample_rate)
+    reference_time = time.perf_counter() - start
+    reference_error = reference_period - true_period
+    print(f"  Full-rate reference: {reference_time:8.3f} s, period {reference_period} "
+          f"(error {reference_error:+.4f} samples, drift {reference_error * num_periods / sample_rate * 1000.0:+.2f} ms)")
+
+    ticks = ap._detect_ticks(envelope, sample_rate)
+    error = ticks.period - true_period if ticks.period is not None else float('inf')
+    print(f"  _detect_ticks:       {ticks.detection_seconds:8.3f} s, period {ticks.period:.4f} +/- {ticks.period_error:.4f} "
+          f"(error {error:+.4f} samples, drift {error * num_periods / sample_rate * 1000.0:+.2f} ms)")
+    print(f"  Speedup:             {reference_time / max(ticks.detection_seconds, 1e-9):8.1f}x")
+    return abs(error) <= tolerance
+
+def benchmark_precision(minutes: float, sample_rate: int, channels: int, tolerance: float = 1e-4) -> bool:
+    """
+    Run process_audio_file at float32 and float64 precision on the same synthetic recording.
+
+    Reports wall time and the largest traced (numpy) allocation of each stage, and the
+    largest sample difference between the two rendered outputs.
+
+    Args:
+        minutes: Input length in minutes
+        sample_rate: Sample rate in Hz
+        channels: Number of channels
+        tolerance: Maximum allowed absolute difference between the two outputs
+
+    Returns:
+        True if the float32 output is within tolerance of the float64 output
+    """
+    duration = minutes * 60.0
+    audio = click_train(duration, sample_rate, channels) + 0.3 * pink_noise_ambience(duration, sample_rate, channels)
+    print(f"Precision: {minutes:g} min, {channels} ch at {sample_rate} Hz")
+
+    outputs = {}
+    with tempfile.TemporaryDirectory(prefix='hqabp_bench_') as temp_dir:
+        work_dir = Path(temp_dir)
+        input_path = work_dir / 'input.wav'
+        sf.write(str(input_path), audio.astype(np.float32), sample_rate, subtype='PCM_24')
+        for precision in ap.PRECISION_CHOICES:
+            profiler = ap.StageProfiler(trace_memory=True)
+            with contextlib.redirect_stdout(io.StringIO()):
+                ap.process_audio_file(input_path, work_dir / f'{precision}.wav', profiler=profiler,
+                                      streaming_threshold_sec=None, precision=precision)
+            profiler.close()
+            seconds = sum(timing.seconds for timing in profiler.timings)
+            peak_mb = max((timing.peak_traced_mb or 0.0) for timing in profiler.timings)
+            print(f"  {precision}:  {seconds:8.3f} s  {duration / max(seconds, 1e-12):8.1f}x realtime  "
+                  f"peak stage allocation {peak_mb:8.1f} MB")
+            rendered = sorted(work_dir.glob(f'{precision}*'))
+            outputs[precision], _ = sf.read(str(rendered[0]), dtype='float64', always_2d=True)
+
+    difference = float(np.max(np.abs(outputs['float32'] - outputs['float64'])))
+    print(f"  Max output difference: {difference:.2e} ({20.0 * math.log10(max(difference, 1e-12)):.1f} dBFS)")
+    return difference <= tolerance
+
+BENCHMARK_OUTPUT_TARGETS = [
+    {'suffix': ''},
+    {'suffix': '-16', 'subtype': 'PCM_16', 'sample_rate': 22050},
+    {'suffix': '-quiet', 'format': 'FLAC', 'target_lufs': -20.0},
+]
+
+def benchmark_targets(minutes: float, sample_rate: int, channels: int, tolerance: float = 1e-6) -> bool:
+    """
+    Render BENCHMARK_OUTPUT_TARGETS in one pass and as one full process_audio_file run each.
+
+    Reports both wall times and the largest sample difference between matching outputs.
+
+    Args:
+        minutes: Input length in minutes
+        sample_rate: Sample rate in Hz
+        channels: Number of channels
+        tolerance: Maximum allowed absolute difference between matching outputs
+
+    Returns:
+        True if every variant rendered in one pass matches its separate run
+    """
+    duration = minutes * 60.0
+    audio = breathing_texture(duration, sample_rate, channels)
+    print(f"Output targets: {len(BENCHMARK_OUTPUT_TARGETS)} variants of {minutes:g} min, {channels} ch at {sample_rate} Hz")
+
+    with tempfile.TemporaryDirectory(prefix='hqabp_bench_') as temp_dir:
+        work_dir = Path(temp_dir)
+        input_path = work_dir / 'input.wav'
+        sf.write(str(input_path), audio.astype(np.float32), sample_rate, subtype='PCM_24')
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            ap.process_audio_file(input_path, work_dir / 'shared' / 'input.wav',
+                                  streaming_threshold_sec=None, output_targets=BENCHMARK_OUTPUT_TARGETS)
+            shared_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            for target in BENCHMARK_OUTPUT_TARGETS:
+                ap.process_audio_file(input_path, work_dir / 'separate' / 'input.wav',
+                                      streaming_threshold_sec=None, output_targets=[target])
+            separate_seconds = time.perf_counter() - start
+        print(f"  One run per variant: {separate_seconds:8.3f} s")
+        print(f"  One shared pass:     {shared_seconds:8.3f} s  ({separate_seconds / max(shared_seconds, 1e-9):.1f}x faster)")
+
+        difference = 0.0
+        for shared_path in sorted((work_dir / 'shared').iterdir()):
+            shared, _ = sf.read(str(shared_path), dtype='float64')
+            separate, _ = sf.read(str(work_dir / 'separate' / shared_path.name), dtype='float64')
+            difference = max(difference, float(np.max(np.abs(shared - separate))))
+    print(f"  Max output difference: {difference:.2e}")
+    return difference <= tolerance
+
+BENCHMARK_ENCODE_TARGETS = [
+    {'suffix': ''},
+    {'suffix': '-lossless', 'format': 'FLAC'},
+    {'suffix': '-mobile', 'format': 'OGG', 'subtype': 'VORBIS'},
+]
+
+def benchmark_encode(minutes: float, sample_rate: int, channels: int, threads: int) -> bool:
+    """
+    Write BENCHMARK_ENCODE_TARGETS with one encode thread and with several.
+
+    Reports wall time, file size against the WAV and the seam of every compressed
+    output, checked against the 24-bit WAV rendered in the same pass.
+
+    Args:
+        minutes: Input length in minutes
+        sample_rate: Sample rate in Hz
+        channels: Number of channels
+        threads: Encode threads of the parallel run
+
+    Returns:
+        True if both runs wrote identical lossless files and every compressed file
+        passes the seam check
+    """
+    duration = minutes * 60.0
+    audio = click_train(duration, sample_rate, channels) + 0.3 * pink_noise_ambience(duration, sample_rate, channels)
+    print(f"Encode: {len(BENCHMARK_ENCODE_TARGETS)} targets of {minutes:g} min, {channels} ch at {sample_rate} Hz")
+
+    with tempfile.TemporaryDirectory(prefix='hqabp_bench_') as temp_dir:
+        work_dir = Path(temp_dir)
+        input_path = work_dir / 'input.wav'
+        sf.write(str(input_path), audio.astype(np.float32), sample_rate, subtype='PCM_24')
+        for encode_threads in (1, threads):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                ap.process_audio_file(input_path, work_dir / f'threads{encode_threads}' / 'input.wav',
+                                      streaming_threshold_sec=None, output_targets=BENCHMARK_ENCODE_TARGETS,
+                                      encode_threads=encode_threads, seam_check='off')
+                seconds = time.perf_counter() - start
+            print(f"  {encode_threads} encode thread(s): {seconds:8.3f} s")
+
+        ok = True
+        rendered_dir = work_dir / f'threads{threads}'
+        reference, _ = sf.read(str(rendered_dir / 'input.wav'), dtype='float64', always_2d=True)
+        context = ap.seam_context_frames(sample_rate, len(reference))
+        wav_bytes = (rendered_dir / 'input.wav').stat().st_size
+        for target in ap.parse_output_targets(BENCHMARK_ENCODE_TARGETS):
+            output_path = target.output_file(rendered_dir / 'input.wav')
+            ratio = output_path.stat().st_size / wav_bytes
+            if target.subtype in ap.LOSSY_SUBTYPES:
+                check = ap.check_encoded_seam(output_path, reference[:context], reference[len(reference) - context:],
+                                              len(reference))
+                ok = ok and check.passed()
+                print(f"  {output_path.name:<20} {ratio:6.1%} of WAV  {check.describe()}")
+            else:
+                single = (work_dir / 'threads1' / output_path.name).read_bytes()
+                ok = ok and single == output_path.read_bytes()
+                print(f"  {output_path.name:<20} {ratio:6.1%} of WAV")
+    print(f"  Lossless outputs identical and seams intact: {ok}")
+    return ok
+
+def benchmark_api(clip_seconds: float, calls: int, sample_rate: int, tolerance: float = 1e-6) -> bool:
+    """
+    Per-clip latency of a warm AudioProcessor against a fresh interpreter per clip.
+
+    The fresh-interpreter figure is what shelling out to audio_processor.py costs before
+    any processing: starting Python and importing numpy, scipy and pyloudnorm.
+
+    Args:
+        clip_seconds: Length of each stereo clip in seconds
+        calls: Number of clips processed by the warm processor
+        sample_rate: Sample rate in Hz
+        tolerance: Maximum allowed difference between the API and the process_audio_file output
+
+    Returns:
+        True if the API output matches process_audio_file on the same clip
+    """
+    print(f"API: {calls} clips of {clip_seconds:g} s stereo at {sample_rate} Hz")
+    start = time.perf_counter()
+    # Libraries are imported lazily, so load what a default run needs as the CLI would
+    subprocess.run([sys.executable, '-c', 'import audio_processor as ap; '
+                    'ap.load_modules(ap.ProcessorConfig().required_modules())'], check=True,
+                   cwd=str(Path(ap.__file__).resolve().parent))
+    import_seconds = time.perf_counter() - start
+    print(f"  Fresh interpreter + imports: {import_seconds * 1000:8.1f} ms per clip before processing")
+
+    processor = ap.AudioProcessor(streaming_threshold_sec=None)
+    clips = [breathing_texture(clip_seconds, sample_rate, 2, seed=seed) + 0.5 * click_train(clip_seconds, sample_rate, 2, seed=seed)
+             for seed in range(calls)]
+    cold_seconds = processor.process(clips[0], sample_rate).processing_seconds
+    latencies = sorted(processor.process(clip, sample_rate).processing_seconds for clip in clips)
+    print(f"  First call:                  {cold_seconds * 1000:8.1f} ms")
+    print(f"  Warm calls:                  {latencies[len(latencies) // 2] * 1000:8.1f} ms median, "
+          f"{latencies[-1] * 1000:.1f} ms max")
+
+    with tempfile.TemporaryDirectory(prefix='hqabp_bench_') as temp_dir:
+        input_path = Path(temp_dir) / 'clip.wav'
+        sf.write(str(input_path), clips[0], sample_rate, subtype='DOUBLE')
+        with contextlib.redirect_stdout(io.StringIO()):
+            ap.process_audio_file(input_path, Path(temp_dir) / 'out' / 'clip.wav',
+                                  **processor.config.process_kwargs())
+        reference, _ = sf.read(str(Path(temp_dir) / 'out' / 'clip_processed.wav'), dtype='float64', always_2d=True)
+    difference = float(np.max(np.abs(processor.process(clips[0], sample_rate).audio_data - reference)))
+    # The file is 24-bit PCM, so allow one quantization step on top of the tolerance
+    print(f"  Max difference from process_audio_file: {difference:.2e}")
+    return difference <= tolerance + 2.0 ** -23
+
+def benchmark_executor(num_files: int, seconds: float, jobs: int, io_threads: int, sample_rate: int = 48000) -> bool:
+    """
+    Process one batch with the per-file process pool and with the pipelined executor.
+
+    The per-file pool is what --jobs does by default: each worker decodes, processes
+    and encodes whole files. The pipelined executor decodes and encodes in I/O threads
+    and sends only DSP to the workers.
+
+    Args:
+        num_files: Number of stereo input files (click trains and breathing textures)
+        seconds: Length of each file in seconds
+        jobs: Worker processes for both executors
+        io_threads: Decode and encode threads of the pipelined executor
+        sample_rate: Sample rate in Hz
+
+    Returns:
+        True if both executors wrote identical outputs
+    """
+    print(f"Executor: {num_files} files of {seconds:g} s stereo at {sample_rate} Hz, {jobs} worker(s)")
+    with tempfile.TemporaryDirectory(prefix='hqabp_bench_') as temp_dir:
+        work_dir = Path(temp_dir)
+        work_items = {'pool': [], 'pipelined': []}
+        for index in range(num_files):
+            generator = click_train if index % 2 == 0 else breathing_texture
+            input_path = work_dir / 'input' / f'file{index:03d}.wav'
+            input_path.parent.mkdir(parents=True, exist_ok=True)
+            audio = generator(seconds, sample_rate, 2, seed=index)
+            sf.write(str(input_path), audio.astype(np.float32), sample_rate, subtype='PCM_24')
+            for mode in work_items:
+                work_items[mode].append((index + 1, input_path, work_dir / mode / input_path.name))
+
+        process_kwargs = {'streaming_threshold_sec': None}
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(ap._process_file_task, input_path, output_path, process_kwargs)
+                       for _, input_path, output_path in work_items['pool']]
+            pool_ok = all(future.result()[0] for future in futures)
+        pool_seconds = time.perf_counter() - start
+        print(f"  Per-file pool:       {pool_seconds:8.3f} s  {num_files / pool_seconds:6.2f} files/s")
+
+        executor = ap.PipelinedExecutor(process_kwargs, jobs, io_threads)
+        pipelined_ok = all(result.success for result in executor.run(work_items['pipelined']))
+        print(f"  Pipelined executor:  {executor.wall_seconds:8.3f} s  {num_files / executor.wall_seconds:6.2f} files/s")
+        executor.report()
+
+        identical = pool_ok and pipelined_ok
+        for output_path in sorted((work_dir / 'pool').iterdir()):
+            pool_audio, _ = sf.read(str(output_path))
+            pipelined_audio, _ = sf.read(str(work_dir / 'pipelined' / output_path.name))
+            identical = identical and np.array_equal(pool_audio, pipelined_audio)
+    print(f"  Outputs identical: {identical}")
+    return identical
+
+# Command lines timed from a fresh interpreter ({input} and {output} are filled in), with
+# the heavy libraries each may import; loading any other one is an import regression
+STARTUP_SCENARIOS = {
+    'import': (['-c', 'import audio_processor'], []),
+    'help': (['audio_processor.py', '--help'], []),
+    'peak_only': (
+        ['audio_processor.py', '-i', '{input}', '-o', '{output}', '--disable_cache', '--jobs', '1',
+         '--use_peak_normalization', '--disable_noise_reduction', '--disable_seamless_loop',
+         '--disable_loop_stabilization'],
+        ['numpy', 'soundfile']
+    ),
+    'default': (
+        ['audio_processor.py', '-i', '{input}', '-o', '{output}', '--disable_cache', '--jobs', '1'],
+        ['numpy', 'soundfile', 'pyloudnorm', 'scipy.signal']
+    ),
+}
+
+def _import_times(importtime_log: str) -> Dict[str, float]:
+    """
+    Parse `python -X importtime` output into cumulative seconds per heavy library imported.
+    """
+    times = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line.split('|')
+        name = fields[-1].strip()
+        if name in ap.LAZY_MODULES and name not in times:
+            times[name] = int(fields[1]) / 1e6
+    return times
+
+def measure_startup(repeat: int, work_dir: Path) -> Dict[str, dict]:
+    """
+    Time each STARTUP_SCENARIOS command in a fresh interpreter and record what it imports.
+
+    Args:
+        repeat: Number of runs per command (the fastest is kept)
+        work_dir: Scratch directory for the one-second input file and the outputs
+
+    Returns:
+        Mapping of "startup/<scenario>" to {"seconds": ..., "modules": {library: import seconds},
+        "allowed": [libraries the scenario may import]}
+    """
+    input_dir = work_dir / 'startup_input'
+    input_dir.mkdir(parents=True, exist_ok=True)
+    sf.write(str(input_dir / 'clip.wav'), click_train(1.0, DEFAULT_SAMPLE_RATE, 2), DEFAULT_SAMPLE_RATE, subtype='PCM_24')
+    cwd = str(Path(ap.__file__).resolve().parent)
+
+    results = {}
+    for name, (arguments, allowed) in STARTUP_SCENARIOS.items():
+        command = [sys.executable] + [
+            argument.format(input=input_dir, output=work_dir / f'startup_{name}') for argument in arguments
+        ]
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run(command, cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+            best = min(best, time.perf_counter() - start)
+        # Import timing slows the interpreter down, so it gets a run of its own
+        traced = subprocess.run(command[:1] + ['-X', 'importtime'] + command[1:], cwd=cwd, check=True,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        results[f"startup/{name}"] = {'seconds': best, 'modules': _import_times(traced.stderr), 'allowed': allowed}
+    return results
+
+def benchmark_startup(repeat: int) -> bool:
+    """
+    Wall time of CLI startup and which heavy libraries each kind of run imports.
+
+    Args:
+        repeat: Number of runs per command (the fastest is kept)
+
+    Returns:
+        True if no scenario imports a library its stages do not need
+    """
+    print(f"Startup: fastest of {repeat} fresh interpreter(s) per command")
+    with tempfile.TemporaryDirectory(prefix='hqabp_bench_') as temp_dir:
+        results = measure_startup(repeat, Path(temp_dir))
+    clean = True
+    for name, entry in results.items():
+        unexpected = sorted(set(entry['modules']) - set(entry['allowed']))
+        clean = clean and not unexpected
+        imported = ', '.join(f"{module} {seconds * 1000:.0f} ms" for module, seconds in entry['modules'].items())
+        print(f"  {name:<20} {entry['seconds'] * 1000:8.1f} ms  imports: {imported or 'none'}"
+              + (f"  UNEXPECTED: {', '.join(unexpected)}" if unexpected else ""))
+    return clean
+
+def _wait_for(condition: Callable[[], bool], timeout: float, interval: float = 0.01) -> bool:
+    """Poll condition() until it is true or timeout seconds pass; return its last value."""
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() >= deadline:
+            return False
+        time.sleep(interval)
+    return True
+
+def benchmark_watch(num_files: int, seconds: float, settle_sec: float, sample_rate: int = 48000) -> bool:
+    """
+    Latency from dropping a file into the input folder to its processed output, for
+    --watch (warm worker pool) against rerunning the batch CLI for every new file.
+
+    Each file is moved into the folder whole, so the watch latency is the settle time
+    plus processing; the rerun latency adds interpreter start, imports and a full scan.
+
+    Args:
+        num_files: Number of files dropped in, one at a time
+        seconds: Length of each stereo file in seconds
+        settle_sec: --watch_settle_sec of the watching run
+        sample_rate: Sample rate in Hz
+
+    Returns:
+        True if both ways wrote identical outputs for every file
+    """
+    print(f"Watch: {num_files} files of {seconds:g} s stereo dropped in one at a time, settle {settle_sec:g} s")
+    cwd = str(Path(ap.__file__).resolve().parent)
+    with tempfile.TemporaryDirectory(prefix='hqabp_bench_') as temp_dir:
+        work_dir = Path(temp_dir)
+        staging = work_dir / 'staging'
+        staging.mkdir()
+        names = [f'drop{index:03d}.wav' for index in range(num_files)]
+        for index, name in enumerate(names):
+            audio = breathing_texture(seconds, sample_rate, 2, seed=index) + 0.5 * click_train(seconds, sample_rate, 2, seed=index)
+            sf.write(str(staging / name), audio, sample_rate, subtype='PCM_24')
+
+        rerun_input, rerun_output = work_dir / 'rerun_in', work_dir / 'rerun_out'
+        rerun_input.mkdir()
+        rerun_latencies = []
+        for name in names:
+            shutil.copy2(staging / name, work_dir / name)
+            start = time.perf_counter()
+            os.replace(work_dir / name, rerun_input / name)
+            subprocess.run([sys.executable, 'audio_processor.py', '-i', str(rerun_input), '-o', str(rerun_output)],
+                           cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+            rerun_latencies.append(time.perf_counter() - start)
+
+        watch_input, watch_output = work_dir / 'watch_in', work_dir / 'watch_out'
+        watch_input.mkdir()
+        log_path = work_dir / 'watch.log'
+        watch_latencies = []
+        with open(log_path, 'w') as log:
+            process = subprocess.Popen(
+                [sys.executable, '-u', 'audio_processor.py', '-i', str(watch_input), '-o', str(watch_output),
+                 '--watch', '--watch_settle_sec', str(settle_sec)],
+                cwd=cwd, stdout=log, stderr=subprocess.STDOUT
+            )
+            try:
+                ready = _wait_for(lambda: 'Watching' in log_path.read_text(), 60.0)
+                for index, name in enumerate(names):
+                    if not ready:
+                        break
+                    shutil.copy2(staging / name, work_dir / name)
+                    start = time.perf_counter()
+                    os.replace(work_dir / name, watch_input / name)
+                    # Each dropped file ends with one "Watch:" batch summary line
+                    ready = _wait_for(lambda: log_path.read_text().count('  Watch: ') > index + 1, 60.0)
+                    watch_latencies.append(time.perf_counter() - start)
+            finally:
+                process.send_signal(os_signal.SIGINT)
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+        if len(watch_latencies) < num_files:
+            print("  The watching run did not process every file")
+            return False
+
+        identical = all(
+            np.array_equal(sf.read(str(rerun_output / name.replace('.wav', '_processed.wav')))[0],
+                           sf.read(str(watch_output / name.replace('.wav', '_processed.wav')))[0])
+            for name in names
+        )
+    for label, latencies in (('rerun CLI per file', rerun_latencies), ('--watch', watch_latencies)):
+        latencies = sorted(latencies)
+        print(f"  {label + ':':<20} {latencies[len(latencies) // 2] * 1000:8.1f} ms median, "
+              f"{latencies[-1] * 1000:.1f} ms max from drop to output")
+    print(f"  Outputs identical: {identical}")
+    return identical
+
+SERVE_RETRY_SEC = 0.05  # Backoff of a benchmark client after a 429
+
+def _post(port: int, path: str, body: bytes = b'', method: str = 'POST') -> Tuple[int, Dict[str, str], bytes]:
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=300)
+    try:
+        connection.request(method, path, body=body if method == 'POST' else None)
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+def benchmark_serve(num_requests: int, clients: int, seconds: float, jobs: int, queue_size: int,
+                    sample_rate: int = 48000) -> bool:
+    """
+    Load-test the --serve HTTP service on localhost.
+
+    `clients` threads upload stereo clips as fast as they get answers, so with more
+    clients than the service admits (jobs + queue_size) some requests are refused
+    with 429 instead of queueing without bound. A refused client retries after
+    SERVE_RETRY_SEC, so the latency of a request includes its refusals.
+
+    Args:
+        num_requests: Requests sent in total
+        clients: Concurrent clients
+        seconds: Length of each stereo clip in seconds
+        jobs: --jobs of the service
+        queue_size: --serve_queue_size of the service
+        sample_rate: Sample rate in Hz
+
+    Returns:
+        True if every 200 response is byte-identical to the same file encoded from
+        AudioProcessor, the service refused requests only beyond its capacity and
+        /metrics counted every response
+    """
+    capacity = jobs + queue_size
+    print(f"Serve: {num_requests} requests of {seconds:g} s stereo from {clients} clients, "
+          f"{jobs} worker(s) + {queue_size} queued")
+    ap.load_modules(ap.ProcessorConfig().required_modules() + ['pyloudnorm'])
+    processor = ap.AudioProcessor()
+    uploads, expected = [], []
+    for index in range(min(num_requests, 4)):
+        audio = breathing_texture(seconds, sample_rate, 2, seed=index) + 0.5 * click_train(seconds, sample_rate, 2, seed=index)
+        upload = io.BytesIO()
+        sf.write(upload, audio, sample_rate, format='WAV', subtype='PCM_24')
+        uploads.append(upload.getvalue())
+        decoded, _ = sf.read(io.BytesIO(uploads[-1]), dtype=processor.config.precision, always_2d=True)
+        output = processor.process(decoded, sample_rate).outputs[0]
+        reference = io.BytesIO()
+        ap.save_audio_file(output.audio_data, output.sample_rate, reference)
+        expected.append(reference.getvalue())
+
+    cwd = str(Path(ap.__file__).resolve().parent)
+    with tempfile.TemporaryDirectory(prefix='hqabp_bench_') as temp_dir:
+        log_path = Path(temp_dir) / 'serve.log'
+        with open(log_path, 'w') as log:
+            process = subprocess.Popen(
+                [sys.executable, '-u', 'audio_processor.py', '--serve', '--serve_port', '0',
+                 '--jobs', str(jobs), '--serve_queue_size', str(queue_size)],
+                cwd=cwd, stdout=log, stderr=subprocess.STDOUT
+            )
+            try:
+                if not _wait_for(lambda: 'Serving on' in log_path.read_text(), 60.0):
+                    print("  The service did not start")
+                    return False
+                port = int(log_path.read_text().split('Serving on http://127.0.0.1:')[1].split()[0])
+
+                def send(index: int) -> Tuple[int, int, int, float, bytes]:
+                    start = time.perf_counter()
+                    refusals = 0
+                    status, _, body = _post(port, '/process', uploads[index % len(uploads)])
+                    while status == 429:
+                        refusals += 1
+                        time.sleep(SERVE_RETRY_SEC)
+                        status, _, body = _post(port, '/process', uploads[index % len(uploads)])
+                    return index, status, refusals, time.perf_counter() - start, body
+
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=clients) as client_pool:
+                    results = list(client_pool.map(send, range(num_requests)))
+                wall_seconds = time.perf_counter() - start
+                metrics = _post(port, '/metrics', method='GET')[2].decode()
+            finally:
+                process.send_signal(os_signal.SIGINT)
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    succeeded = sum(status == 200 for _, status, _, _, _ in results)
+    refused = sum(refusals for _, _, refusals, _, _ in results)
+    latencies = sorted(latency for _, _, _, latency, _ in results)
+    identical = all(body == expected[index % len(expected)] for index, status, _, _, body in results if status == 200)
+    counted = sum(
+        int(line.rsplit(' ', 1)[1]) for line in metrics.splitlines() if line.startswith('hqabp_responses_total{path="/process"')
+    )
+    print(f"  200: {succeeded}/{num_requests}  429 refusals (retried): {refused}")
+    print(f"  Latency: {latencies[len(latencies) // 2] * 1000:.1f} ms median, "
+          f"{latencies[math.ceil(0.95 * len(latencies)) - 1] * 1000:.1f} ms p95, {latencies[-1] * 1000:.1f} ms max")
+    print(f"  Throughput: {succeeded * seconds / wall_seconds:.1f}x realtime over {wall_seconds:.2f} s")
+    print(f"  Outputs identical to AudioProcessor: {identical}")
+    backpressure_ok = refused == 0 or clients > capacity
+    print(f"  Refused only beyond capacity: {backpressure_ok}  "
+          f"/metrics counted every response: {counted == num_requests + refused}")
+    return identical and succeeded == num_requests and backpressure_ok and counted == num_requests + refused
+
+def _reference_true_peak(audio: np.ndarray) -> float:
+    """
+    True peak of the fully oversampled signal, with the interpolation filter of measure_true_peak.
+    """
+    up, taps_per_phase = ap.TRUE_PEAK_OVERSAMPLING, ap.TRUE_PEAK_TAPS_PER_PHASE
+    taps = up * signal.firwin(up * taps_per_phase + 1, 1.0 / up, window=('kaiser', 8.0))
+    delay = (len(taps) - 1) // 2
+    oversampled = signal.upfirdn(taps, audio, up=up, axis=0)[delay:delay + up * len(audio)]
+    return max(float(np.max(np.abs(oversampled))), float(np.max(np.abs(audio))))
+
+def benchmark_analyze(num_files: int, seconds: float, sample_rate: int, tolerance: float = 1e-6) -> bool:
+    """
+    Time --analyze against a full render of the same files and check its measurements.
+
+    Every measurement is compared with the slow path it replaces: pyloudnorm for loudness,
+    the fully oversampled signal for the true peak, and trim_silence, _detect_audio_character
+    and _detect_ticks on their own for the trimmed length, label and tick period.
+
+    Args:
+        num_files: Number of stereo input files (click trains, ambience and breathing textures)
+        seconds: Length of each file in seconds
+        sample_rate: Sample rate in Hz
+        tolerance: Maximum allowed difference of loudness (LU), true peak and tick period (samples)
+
+    Returns:
+        True if every measurement matches its reference
+    """
+    generators = [click_train, pink_noise_ambience, breathing_texture]
+    print(f"Analysis: {num_files} files of {seconds:g} s stereo at {sample_rate} Hz")
+    with tempfile.TemporaryDirectory(prefix='hqabp_bench_') as temp_dir:
+        work_dir = Path(temp_dir)
+        input_paths = []
+        for index in range(num_files):
+            input_path = work_dir / 'input' / f'file{index:03d}.wav'
+            input_path.parent.mkdir(parents=True, exist_ok=True)
+            audio = generators[index % len(generators)](seconds, sample_rate, 2, seed=index)
+            sf.write(str(input_path), audio.astype(np.float32), sample_rate, subtype='PCM_24')
+            input_paths.append(input_path)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            for input_path in input_paths:
+                ap.process_audio_file(input_path, work_dir / 'output' / input_path.name, streaming_threshold_sec=None)
+            render_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        analyses = [ap.analyze_audio_file(input_path) for input_path in input_paths]
+        analysis_seconds = time.perf_counter() - start
+        print(f"  Full render:  {render_seconds:8.3f} s")
+        print(f"  --analyze:    {analysis_seconds:8.3f} s  ({render_seconds / max(analysis_seconds, 1e-9):.1f}x faster)")
+
+        matches = True
+        for input_path, result in zip(input_paths, analyses):
+            audio, _ = ap.load_audio_file(input_path, always_2d=True)
+            loudness = ap._loudness_meter(sample_rate).integrated_loudness(audio)
+            true_peak_db = 20.0 * np.log10(_reference_true_peak(audio))
+            trimmed, _ = ap.trim_silence(audio, sample_rate, ap.DEFAULT_TRIM_THRESHOLD_DB, ap.DEFAULT_MIN_SILENCE_MS,
+                                         collapse_silence=ap.DEFAULT_ENABLE_SILENCE_COLLAPSE,
+                                         silence_residual_ms=ap.DEFAULT_SILENCE_RESIDUAL_MS)
+            label = ap._detect_audio_character(audio, sample_rate)
+            ticks = ap._detect_ticks(np.mean(np.abs(audio), axis=1), sample_rate)
+            period_ms = ticks.period * 1000.0 / sample_rate if ticks.period is not None else None
+            errors = {
+                'loudness': abs(result.loudness_lufs - loudness),
+                'true_peak': abs(result.true_peak_dbtp - true_peak_db),
+                'period': (abs(result.tick_period_ms - period_ms) * sample_rate / 1000.0
+                           if period_ms is not None and result.tick_period_ms is not None
+                           else (0.0 if period_ms == result.tick_period_ms else float('inf'))),
+            }
+            same = (all(error <= tolerance for error in errors.values())
+                    and abs(result.trimmed_duration_sec - len(trimmed) / sample_rate) < 0.5 / sample_rate
+                    and result.character == label)
+            matches = matches and same
+            print(f"  {input_path.name}: {result.describe()}"
+                  + ("" if same else f"  MISMATCH (reference {loudness:.3f} LUFS, {true_peak_db:.3f} dBTP, "
+                                     f"{len(trimmed) / sample_rate:.3f} s, {label})"))
+    print(f"  Measurements match: {matches}")
+    return matches
+
+def _reference_get_audio_files(folder_path: Path) -> List[Path]:
+    """
+    The original scanner: rglob every entry, stat each one and sort the full list.
+    """
+    return sorted(
+        file_path for file_path in folder_path.rglob('*')
+        if file_path.is_file() and file_path.suffix.lower() in ap.AUDIO_EXTENSIONS
+    )
+
+def benchmark_scan(num_dirs: int, files_per_dir: int, depth: int) -> bool:
+    """
+    Time the lazy os.scandir scanner against the rglob-and-sort reference on a synthetic tree.
+
+    The tree holds empty audio files plus one non-audio file per directory, so only
+    directory walking and filtering are measured.
+
+    Args:
+        num_dirs: Number of leaf directories
+        files_per_dir: Audio files per leaf directory
+        depth: Nesting depth of each leaf directory
+
+    Returns:
+        True if the sorted scan yields exactly the reference list, in the same order
+    """
+    print(f"Scan: {num_dirs} directories x {files_per_dir} files at depth {depth}")
+    with tempfile.TemporaryDirectory(prefix='hqabp_bench_') as temp_dir:
+        root = Path(temp_dir)
+        for index in range(num_dirs):
+            directory = root.joinpath(*(f'd{index % (level + 2)}_{level}' for level in range(depth - 1)), f'leaf{index:04d}')
+            directory.mkdir(parents=True, exist_ok=True)
+            (directory / 'notes.txt').touch()
+            for file_index in range(files_per_dir):
+                extension = ('.wav', '.flac', '.ogg')[file_index % 3]
+                (directory / f'take{file_index:04d}{extension}').touch()
+
+        start = time.perf_counter()
+        reference = _reference_get_audio_files(root)
+        reference_seconds = time.perf_counter() - start
+        print(f"  rglob + sort:        {reference_seconds:8.3f} s  first file after {reference_seconds:8.3f} s")
+
+        identical = True
+        for label, sort in (('scandir', False), ('scandir (sorted)', True)):
+            start = time.perf_counter()
+            scanner = ap.iter_audio_files(root, sort=sort)
+            first = next(scanner, None)
+            first_seconds = time.perf_counter() - start
+            found = ([first] if first is not None else []) + list(scanner)
+            total_seconds = time.perf_counter() - start
+            print(f"  {label + ':':<20} {total_seconds:8.3f} s  first file after {first_seconds:8.3f} s")
+            identical = identical and (found == reference if sort else sorted(found) == reference)
+    print(f"  {len(reference)} files, same files and order: {identical}")
+    return identical
+
+def main():
+    """
+    CLI entry point for the benchmarks.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmarks for the High-Quality Audio Batch Processor (HQABP)'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    suite_parser = subparsers.add_parser(
+        'suite',
+        help='Time every pipeline function and the end-to-end realtime factor on synthetic input'
+    )
+    suite_parser.add_argument('--durations', type=float, nargs='+', default=None, metavar='SEC',
+                              help=f'Input durations in seconds (default: {DEFAULT_DURATIONS_SEC})')
+    suite_parser.add_argument('--full', action='store_true',
+                              help=f'Use the full duration range {FULL_DURATIONS_SEC} (1 s to 60 min, needs several GB of RAM)')
+    suite_parser.add_argument('--signals', nargs='+', default=list(SIGNAL_GENERATORS), choices=list(SIGNAL_GENERATORS),
+                              help='Synthetic signals to benchmark (default: all)')
+    suite_parser.add_argument('--channels', type=int, nargs='+', default=[1, 2], help='Channel counts (default: 1 2)')
+    suite_parser.add_argument('--sample_rate', type=int, default=DEFAULT_SAMPLE_RATE,
+                              help=f'Sample rate in Hz (default: {DEFAULT_SAMPLE_RATE})')
+    suite_parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                              help=f'Runs per function, fastest is kept (default: {DEFAULT_REPEAT})')
+    suite_parser.add_argument('--output', type=str, default=None, metavar='JSON', help='Write results to this JSON file')
+    suite_parser.add_argument('--compare', type=str, default=None, metavar='JSON',
+                              help='Baseline JSON to compare against; exits with status 1 on regressions')
+    suite_parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                              help=f'Relative slowdown flagged as a regression (default: {DEFAULT_REGRESSION_THRESHOLD})')
+
+    compare_parser = subparsers.add_parser('compare', help='Compare two saved results files')
+    compare_parser.add_argument('baseline', type=str, help='Baseline results JSON')
+    compare_parser.add_argument('current', type=str, help='New results JSON')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                                help=f'Relative slowdown flagged as a regression (default: {DEFAULT_REGRESSION_THRESHOLD})')
+
+    envelope_parser = subparsers.add_parser(
+        'envelope',
+        help='Vectorized noise-gate envelope follower vs the per-sample reference loop'
+    )
+    envelope_parser.add_argument('--minutes', type=float, default=3.0, help='Input length in minutes (default: 3)')
+    envelope_parser.add_argument('--sample_rate', type=int, default=48000, help='Sample rate in Hz (default: 48000)')
+
+    ticks_parser = subparsers.add_parser(
+        'ticks',
+        help='Decimated sub-sample tick detector vs the full-rate reference on a long click train'
+    )
+    ticks_parser.add_argument('--minutes', type=float, default=10.0, help='Input length in minutes (default: 10)')
+    ticks_parser.add_argument('--sample_rate', type=int, default=48000, help='Sample rate in Hz (default: 48000)')
+    ticks_parser.add_argument('--bpm', type=float, default=97.0, help='Clicks per minute (default: 97)')
+
+    precision_parser = subparsers.add_parser(
+        'precision',
+        help='End-to-end time, memory and output difference of --precision float32 vs float64'
+    )
+    precision_parser.add_argument('--minutes', type=float, default=5.0, help='Input length in minutes (default: 5)')
+    precision_parser.add_argument('--sample_rate', type=int, default=48000, help='Sample rate in Hz (default: 48000)')
+    precision_parser.add_argument('--channels', type=int, default=2, help='Number of channels (default: 2)')
+
+    targets_parser = subparsers.add_parser(
+        'targets',
+        help='Several output targets rendered from one pass vs one full run per variant'
+    )
+    targets_parser.add_argument('--minutes', type=float, default=5.0, help='Input length in minutes (default: 5)')
+    targets_parser.add_argument('--sample_rate', type=int, default=44100, help='Sample rate in Hz (default: 44100)')
+    targets_parser.add_argument('--channels', type=int, default=2, help='Number of channels (default: 2)')
+
+    executor_parser = subparsers.add_parser(
+        'executor',
+        help='Per-file process pool vs the pipelined decode/DSP/encode executor on one batch'
+    )
+    executor_parser.add_argument('--files', type=int, default=24, help='Number of input files (default: 24)')
+    executor_parser.add_argument('--seconds', type=float, default=20.0, help='Length of each file in seconds (default: 20)')
+    executor_parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Worker processes (default: CPU count)')
+    executor_parser.add_argument('--io_threads', type=int, default=ap.DEFAULT_IO_THREADS,
+                                 help=f'Decode and encode threads (default: {ap.DEFAULT_IO_THREADS})')
+
+    encode_parser = subparsers.add_parser(
+        'encode',
+        help='WAV, FLAC and Ogg/Vorbis targets encoded on one thread vs several, with file sizes and seam checks'
+    )
+    encode_parser.add_argument('--minutes', type=float, default=2.0, help='Input length in minutes (default: 2)')
+    encode_parser.add_argument('--sample_rate', type=int, default=48000, help='Sample rate in Hz (default: 48000)')
+    encode_parser.add_argument('--channels', type=int, default=2, help='Number of channels (default: 2)')
+    encode_parser.add_argument('--threads', type=int, default=3, help='Encode threads of the parallel run (default: 3)')
+
+    api_parser = subparsers.add_parser(
+        'api',
+        help='Warm AudioProcessor latency per short clip vs starting a fresh interpreter per clip'
+    )
+    api_parser.add_argument('--seconds', type=float, default=2.0, help='Clip length in seconds (default: 2)')
+    api_parser.add_argument('--calls', type=int, default=20, help='Clips processed (default: 20)')
+    api_parser.add_argument('--sample_rate', type=int, default=48000, help='Sample rate in Hz (default: 48000)')
+
+    scan_parser = subparsers.add_parser(
+        'scan',
+        help='Lazy os.scandir directory scanner vs rglob-and-sort on a synthetic tree'
+    )
+    scan_parser.add_argument('--dirs', type=int, default=200, help='Number of leaf directories (default: 200)')
+    scan_parser.add_argument('--files_per_dir', type=int, default=100, help='Audio files per directory (default: 100)')
+    scan_parser.add_argument('--depth', type=int, default=3, help='Nesting depth of the leaf directories (default: 3)')
+
+    startup_parser = subparsers.add_parser(
+        'startup',
+        help='CLI startup time and the heavy libraries each kind of run imports'
+    )
+    startup_parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                                help=f'Runs per command, fastest is kept (default: {DEFAULT_REPEAT})')
+
+    watch_parser = subparsers.add_parser(
+        'watch',
+        help='Drop-to-output latency of --watch against rerunning the batch for every new file'
+    )
+    watch_parser.add_argument('--files', type=int, default=5, help='Files dropped in (default: 5)')
+    watch_parser.add_argument('--seconds', type=float, default=5.0, help='Length of each file in seconds (default: 5)')
+    watch_parser.add_argument('--settle', type=float, default=0.5, help='--watch_settle_sec of the watching run (default: 0.5)')
+
+    serve_parser = subparsers.add_parser(
+        'serve',
+        help='Latency, throughput and 429 backpressure of the --serve HTTP service on localhost'
+    )
+    serve_parser.add_argument('--requests', type=int, default=16, help='Requests sent in total (default: 16)')
+    serve_parser.add_argument('--clients', type=int, default=4, help='Concurrent clients (default: 4)')
+    serve_parser.add_argument('--seconds', type=float, default=5.0, help='Length of each clip in seconds (default: 5)')
+    serve_parser.add_argument('--jobs', type=int, default=1, help='Worker processes of the service (default: 1)')
+    serve_parser.add_argument('--queue', type=int, default=1, help='--serve_queue_size of the service (default: 1)')
+
+    analyze_parser = subparsers.add_parser(
+        'analyze',
+        help='Speed of --analyze against a full render, and its measurements against their slow references'
+    )
+    analyze_parser.add_argument('--files', type=int, default=3, help='Files analyzed (default: 3)')
+    analyze_parser.add_argument('--seconds', type=float, default=60.0, help='Length of each file in seconds (default: 60)')
+    analyze_parser.add_argument('--sample_rate', type=int, default=48000, help='Sample rate in Hz (default: 48000)')
+
+    args = parser.parse_args()
+
+    if args.command == 'suite':
+        durations = args.durations or (FULL_DURATIONS_SEC if args.full else DEFAULT_DURATIONS_SEC)
+        current = run_suite(durations, args.sample_rate, args.channels, args.signals, args.repeat)
+        if args.output:
+            output_path = Path(args.output)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(current, f, indent=2, sort_keys=True)
+            print(f"Results written to {output_path}")
+        if args.compare:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            print(f"\nComparison against {args.compare}:")
+            regressions = compare_results(baseline, current, args.threshold)
+            if regressions:
+                print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+                sys.exit(1)
+            print("No regressions")
+
+    elif args.command == 'compare':
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.current, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+        regressions = compare_results(baseline, current, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+        print("No regressions")
+
+    elif args.command == 'envelope':
+        if not benchmark_envelope(args.minutes, args.sample_rate):
+            print("FAILED: outputs differ beyond tolerance")
+            sys.exit(1)
+
+    elif args.command == 'ticks':
+        if not benchmark_ticks(args.minutes, args.sample_rate, args.bpm):
+            print("FAILED: fitted period error beyond tolerance")
+            sys.exit(1)
+
+    elif args.command == 'precision':
+        if not benchmark_precision(args.minutes, args.sample_rate, args.channels):
+            print("FAILED: float32 output differs from float64 beyond tolerance")
+            sys.exit(1)
+
+    elif args.command == 'targets':
+        if not benchmark_targets(args.minutes, args.sample_rate, args.channels):
+            print("FAILED: shared-pass outputs differ from separate runs beyond tolerance")
+            sys.exit(1)
+
+    elif args.command == 'executor':
+        if not benchmark_executor(args.files, args.seconds, args.jobs, args.io_threads):
+            print("FAILED: the executors wrote different outputs")
+            sys.exit(1)
+
+    elif args.command == 'encode':
+        if not benchmark_encode(args.minutes, args.sample_rate, args.channels, args.threads):
+            print("FAILED: lossless outputs differ or a compressed seam failed its check")
+            sys.exit(1)
+
+    elif args.command == 'api':
+        if not benchmark_api(args.seconds, args.calls, args.sample_rate):
+            print("FAILED: the API output differs from process_audio_file")
+            sys.exit(1)
+
+    elif args.command == 'scan':
+        if not benchmark_scan(args.dirs, args.files_per_dir, args.depth):
+            print("FAILED: the scanners found different files")
+            sys.exit(1)
+
+    elif args.command == 'startup':
+        if not benchmark_startup(args.repeat):
+            print("FAILED: a run imported a library its stages do not need")
+            sys.exit(1)
+
+    elif args.command == 'watch':
+        if not benchmark_watch(args.files, args.seconds, args.settle):
+            print("FAILED: the watching run wrote different outputs or missed files")
+            sys.exit(1)
+
+    elif args.command == 'serve':
+        if not benchmark_serve(args.requests, args.clients, args.seconds, args.jobs, args.queue):
+            print("FAILED: responses differ from AudioProcessor, were refused within capacity or went uncounted")
+            sys.exit(1)
+
+    elif args.command == 'analyze':
+        if not benchmark_analyze(args.files, args.seconds, args.sample_rate):
+            print("FAILED: a measurement differs from its reference")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -12,33 +12,117 @@ Examples:
     python audio_processor.py --input_dir ./audio --output_dir ./processed
     python audio_processor.py --input_dir ./audio --use_peak_normalization
     python audio_processor.py --input_dir ./audio --target_lufs -12.0
+    python audio_processor.py --input_dir ./audio --jobs 8
+    python audio_processor.py --input_dir ./audio --output_targets targets.json
+    python audio_processor.py --input_dir ./audio --watch
+    python audio_processor.py --serve --jobs 4   # then POST audio to http://127.0.0.1:8765/process
+    python audio_processor.py --input_dir ./audio --analyze   # measure only, write hqabp_analysis.json
+
+Library use (no subprocess; state stays warm between calls):
+    from audio_processor import AudioProcessor, ProcessorConfig
+    processor = AudioProcessor(ProcessorConfig(target_lufs=-16.0))
+    result = processor.process(audio, 48000)  # or processor.process_file(path, output_path)
 """
 
+from __future__ import annotations
+
+import io
+import os
 import sys
 import argparse
+import contextlib
+import cProfile
+import csv
+import fnmatch
+import glob
+import hashlib
+import inspect
+import pstats
+import queue
+import struct
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List, Optional, Tuple
+from dataclasses import asdict, dataclass, field, fields, replace
+from typing import BinaryIO, Callable, ClassVar, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple
 import math
 import json
+import tempfile
 import time
+import tracemalloc
 
 try:
-    import numpy as np
-    import soundfile as sf
-    import pyloudnorm as pyln
-    from scipy import signal
-except ImportError as e:
-    print("Error: Required libraries are not installed.")
-    print("Please run: pip install -r requirements.txt")
-    print(f"Missing: {e.name}")
-    sys.exit(1)
+    import resource  # Unix only; peak RSS is reported as unavailable elsewhere
+except ImportError:
+    resource = None
+
+class _LazyModule:
+    """
+    Stand-in for a heavy library that imports it on first attribute access.
+
+    numpy, soundfile, pyloudnorm and scipy.signal are bound to these at module load so
+    `--help`, argument errors and runs whose stages never touch a library do not pay
+    its import time. The first access imports the library and rebinds the module-level
+    name to it, so later lookups go straight to the real module.
+    """
+
+    def __init__(self, module_name: str, alias: str):
+        self._module_name = module_name
+        self._alias = alias
+
+    def load(self):
+        """Import the library (if not already imported) and return it."""
+        # The import statement machinery rather than importlib, so -X importtime lists it
+        __import__(self._module_name)
+        module = sys.modules[self._module_name]
+        globals()[self._alias] = module
+        return module
+
+    def __getattr__(self, attribute: str):
+        return getattr(self.load(), attribute)
+
+    def __repr__(self) -> str:
+        return f"<lazy module '{self._module_name}'>"
+
+def load_modules(module_names: Iterable[str]) -> None:
+    """
+    Import lazily loaded libraries now rather than at first use.
+
+    Args:
+        module_names: LAZY_MODULES keys, e.g. from Pipeline.required_modules
+
+    Raises:
+        ImportError: If a library is not installed (its `name` is the missing module)
+    """
+    for module_name in module_names:
+        lazy = LAZY_MODULES[module_name]
+        if globals()[lazy._alias] is lazy:
+            lazy.load()
+
+np = _LazyModule('numpy', 'np')
+sf = _LazyModule('soundfile', 'sf')
+pyln = _LazyModule('pyloudnorm', 'pyln')
+signal = _LazyModule('scipy.signal', 'signal')
+LAZY_MODULES: Dict[str, _LazyModule] = {
+    lazy._module_name: lazy for lazy in (np, sf, pyln, signal)
+}
+BASE_MODULES = ('numpy', 'soundfile')  # Needed by every run (decode, buffers, encode)
 
 DEFAULT_INPUT_DIR = "/Freelance/Testing/Audios/original"
 DEFAULT_OUTPUT_DIR = "/Freelance/Testing/Audios/processed"
 
+DEFAULT_INCLUDE_PATTERNS = None  # Glob patterns a file must match to be processed, e.g. ['*.wav', 'ambience/*'] (None = every audio file)
+DEFAULT_EXCLUDE_PATTERNS = None  # Glob patterns for files and directories to skip, e.g. ['*_draft.*', 'archive']
+DEFAULT_MAX_DEPTH = None  # Directory levels scanned below the input directory (0 = top level only, None = unlimited)
+DEFAULT_SORTED_SCAN = False  # Walk in sorted path order for deterministic numbering instead of directory order
+
 DEFAULT_TRIM_THRESHOLD_DB = -60.0
 
 DEFAULT_MIN_SILENCE_MS = 2000
+DEFAULT_ENABLE_SILENCE_COLLAPSE = False  # Shorten interior silences of at least DEFAULT_MIN_SILENCE_MS
+DEFAULT_SILENCE_RESIDUAL_MS = 250.0  # Length an interior silence is shortened to
 
 DEFAULT_XFADE_DURATION_MS = 100
 
@@ -59,8 +143,78 @@ DEFAULT_LOOP_ALIGNMENT_MS = 20.0
 DEFAULT_LOOP_MIRROR_HEAD = False
 
 DEFAULT_LOOP_STABILIZATION = True
+DEFAULT_LOOP_COMPARISON_WINDOW_MS = 50.0  # Seam window compared by loop stabilization (whole tick periods or seconds of ambience are fine)
+DEFAULT_LOOP_MAX_SHIFT_MS = 10.0  # Largest seam realignment loop stabilization searches for
+DEFAULT_LOOP_MIN_CORRELATION = 0.5  # Normalized correlation the seam must reach before it is shifted
 DEFAULT_TARGET_DURATION_SEC = None  # None = use current length, otherwise target duration in seconds
 
+DEFAULT_STREAMING_THRESHOLD_SEC = 300.0  # Files at least this long are processed block by block (None = never)
+DEFAULT_STREAM_BLOCK_SEC = 10.0  # Block length for streaming mode
+
+DEFAULT_JOBS = None  # None = use CPU count, 1 = process files sequentially in this process
+DEFAULT_PIPELINED_IO = False  # Decode/encode in I/O threads while worker processes only run DSP
+DEFAULT_IO_THREADS = 2  # Decode threads and encode threads each, for the pipelined executor
+DEFAULT_PREFETCH = None  # Decoded (and rendered) files queued between stages; None = one per worker
+DEFAULT_ENCODE_THREADS = 2  # Output files (or streamed blocks of each target) encoded in the background at once
+
+DEFAULT_USE_CACHE = True  # Skip files whose input and parameters are unchanged since the last run
+
+DEFAULT_WATCH = False  # Keep running after the batch and process new or changed files as they appear
+DEFAULT_WATCH_SETTLE_SEC = 2.0  # A new or changed file must keep its size and mtime this long before it is processed
+DEFAULT_WATCH_USE_INOTIFY = True  # Use Linux inotify to notice changes (polling is used where it is unavailable)
+DEFAULT_WATCH_POLL_SEC = 2.0  # Rescan interval when polling
+
+DEFAULT_SERVE = False  # Run the local HTTP processing service instead of a batch (see audio_service.py)
+DEFAULT_SERVE_HOST = '127.0.0.1'  # Interface the service listens on (localhost only)
+DEFAULT_SERVE_PORT = 8765  # 0 = any free port (printed at start)
+DEFAULT_SERVE_QUEUE_SIZE = 8  # Requests admitted beyond one per worker; further requests get 429
+DEFAULT_SERVE_TIMEOUT_SEC = 120.0  # Upload, queueing and processing time per request before a 504
+DEFAULT_SERVE_MAX_UPLOAD_MB = 256.0  # Larger uploads get 413
+
+DEFAULT_PRECISION = 'float64'  # Sample type of every buffer from decode to encode: 'float32' halves the memory
+PRECISION_CHOICES = ('float32', 'float64')
+
+# Variants rendered from one decode/analysis pass, e.g. [{"suffix": ""}, {"suffix": "-16", "subtype": "PCM_16"}]
+# (see OutputTarget for the keys); None = one <name>_processed.wav per input file
+DEFAULT_OUTPUT_TARGETS = None
+DEFAULT_OUTPUT_FORMAT = 'WAV'  # Format of the single <name>_processed output when no output targets are given
+
+DEFAULT_SEAM_CHECK = 'lossy'  # Decode written files and score their loop seam: 'off', 'lossy' (Vorbis/Opus) or 'all'
+SEAM_CHECK_CHOICES = ('off', 'lossy', 'all')
+DEFAULT_SEAM_CHECK_TOLERANCE_DB = 3.0  # Seam score increase from encoding that fails the check (lossy files are re-encoded once at best quality)
+DEFAULT_SEAM_WINDOW_MS = 2.0  # Window the seam score compares, short enough to isolate a click
+
+DEFAULT_KERNEL_CACHE_SIZE = 64  # Filter designs, kernels, meters and crossfade tables kept per process
+
+DEFAULT_PROFILE_REPORT_NAME = "hqabp_profile.json"  # Written to the output directory by --profile (.csv for CSV)
+
+DEFAULT_ANALYZE = False  # Measure every file and write a report instead of rendering (see analyze_audio)
+DEFAULT_ANALYSIS_REPORT_NAME = "hqabp_analysis.json"  # Written to the output directory by --analyze (.csv for CSV)
+ANALYSIS_MODULES = ('numpy', 'soundfile', 'scipy.signal')  # Loudness is measured by measure_integrated_loudness
+TRUE_PEAK_OVERSAMPLING = 4  # ITU-R BS.1770-4 Annex 2: 4x oversampling at 48 kHz
+TRUE_PEAK_TAPS_PER_PHASE = 12  # Interpolator length per phase (48 taps in total, as the Annex 2 filter)
+TRUE_PEAK_BLOCK_FRAMES = 2048  # Blocks the true-peak search oversamples one at a time, loudest first
+
+# ITU-R BS.1770 K-weighting: the +4 dB high-shelf pre-filter followed by the RLB high-pass
+K_WEIGHTING_SHELF = (4.0, 1.0 / math.sqrt(2.0), 1500.0)  # Gain in dB, Q, corner frequency in Hz
+K_WEIGHTING_HIGH_PASS = (0.5, 38.0)  # Q, corner frequency in Hz
+
+# Bump whenever a processing change alters the rendered output so cached results are invalidated
+PIPELINE_VERSION = 7
+CACHE_MANIFEST_NAME = ".hqabp_cache.json"
+AUDIO_EXTENSIONS = {'.wav', '.flac', '.ogg', '.mp3', '.aiff', '.aif', '.au', '.snd'}
+OUTPUT_FORMAT_EXTENSIONS = {'WAV': '.wav', 'FLAC': '.flac', 'OGG': '.ogg', 'AIFF': '.aiff'}
+# Lossy subtypes libsndfile writes to Ogg, whose granule positions make decoders trim
+# encoder priming and end padding so the decoded loop keeps its exact length
+LOSSY_SUBTYPES = {'VORBIS', 'OPUS'}
+SEAM_CONTEXT_WINDOWS = 16  # Windows on each side of the seam its score is compared against
+# Ticks count as regular (and get a period) only if their RMS deviation from the fitted grid
+# is at most this fraction of the period and at least this fraction of them fit the grid
+TICK_MAX_JITTER_RATIO = 0.05
+TICK_MIN_FIT_FRACTION = 0.5
+# Frames handed to libsndfile per write call; one multi-million-frame write crashes its Vorbis encoder
+ENCODE_BLOCK_FRAMES = 1 << 16
+
 def calculate_rms_energy(audio_block: np.ndarray) -> float:
     """
     Calculate Root Mean Square (RMS) energy for an audio block.
@@ -92,31 +246,558 @@ def rms_to_dbfs(rms_value: float) -> float:
         return -np.inf
     return 20.0 * np.log10(rms_value)
 
+def _block_rms(mono: np.ndarray, block_samples: int) -> np.ndarray:
+    """
+    RMS of each full block of block_samples samples (a trailing partial block is ignored).
+    """
+    num_blocks = len(mono) // block_samples
+    blocks = mono[:num_blocks * block_samples].reshape(num_blocks, block_samples)
+    return np.sqrt(np.mean(blocks ** 2, axis=1))
+
+def _block_peak(mono: np.ndarray, block_samples: int) -> np.ndarray:
+    """
+    Absolute peak of each full block of block_samples samples (a trailing partial block is ignored).
+    """
+    num_blocks = len(mono) // block_samples
+    blocks = mono[:num_blocks * block_samples].reshape(num_blocks, block_samples)
+    return np.max(np.abs(blocks), axis=1)
+
+@dataclass
+class TickAnalysis:
+    """Tick positions and loop period measured by _detect_ticks."""
+
+    positions: np.ndarray  # Sub-sample tick positions (fractional sample indices, ascending)
+    period: Optional[float] = None  # Fitted tick period in samples (None with fewer than 3 ticks or irregular ones)
+    period_error: float = 0.0  # Standard error of the fitted period in samples
+    jitter: float = 0.0  # RMS deviation of the ticks from the fitted grid in samples
+    detection_seconds: float = 0.0
+
+def _fit_tick_period(positions: np.ndarray) -> Tuple[Optional[float], float, float]:
+    """
+    Robust least-squares fit of a regular grid to tick positions.
+
+    Every tick is numbered by the nearest multiple of the median spacing, so missed ticks
+    leave gaps in the numbering instead of doubling a period. A line is fitted through
+    (number, position), ticks further than 3 robust standard deviations (or one sample)
+    from it are dropped, and the line is refitted.
+
+    Peaks in ambience or noise also fit some grid, so the fit is only accepted for
+    regular ticks: at least TICK_MIN_FIT_FRACTION of them must survive the cut, and their
+    RMS residual must be at most TICK_MAX_JITTER_RATIO of the period.
+
+    Args:
+        positions: Ascending tick positions in samples
+
+    Returns:
+        Tuple of (period, standard error of the period, RMS residual), all in samples;
+        period is None if fewer than 3 usable ticks remain or they are not regular
+        (the residual is still returned then)
+    """
+    if len(positions) < 3:
+        return None, 0.0, 0.0
+    rough_period = float(np.median(np.diff(positions)))
+    if rough_period <= 0:
+        return None, 0.0, 0.0
+    numbers = np.rint((positions - positions[0]) / rough_period)
+
+    keep = np.ones(len(positions), dtype=bool)
+    for _ in range(2):
+        if np.count_nonzero(keep) < 3 or np.ptp(numbers[keep]) == 0:
+            return None, 0.0, 0.0
+        slope, intercept = np.polyfit(numbers[keep], positions[keep], 1)
+        residuals = positions - (intercept + slope * numbers)
+        spread = 1.4826 * np.median(np.abs(residuals[keep]))
+        keep = np.abs(residuals) <= max(3.0 * spread, 1.0)
+
+    kept = np.count_nonzero(keep)
+    if kept < 3 or slope <= 0:
+        return None, 0.0, 0.0
+    kept_numbers = numbers[keep]
+    kept_residuals = residuals[keep]
+    jitter = float(np.sqrt(np.mean(kept_residuals ** 2)))
+    if kept < TICK_MIN_FIT_FRACTION * len(positions) or jitter > TICK_MAX_JITTER_RATIO * slope:
+        return None, 0.0, jitter
+    spread_numbers = np.sum((kept_numbers - np.mean(kept_numbers)) ** 2)
+    period_error = float(np.sqrt(np.sum(kept_residuals ** 2) / max(1, kept - 2) / spread_numbers))
+    return float(slope), period_error, jitter
+
+def _detect_ticks(mono_envelope: np.ndarray, sample_rate: int) -> TickAnalysis:
+    """
+    Find ticks and fit their period on a decimated onset envelope.
+
+    Peaks are searched on the 1ms block maxima of the envelope: above the envelope's
+    median plus 20% of the way to its maximum, at least 50ms apart. Each tick is then
+    placed at its loudest sample and refined to a sub-sample position by parabolic
+    interpolation over its neighbours, and the period is fitted over all ticks (see
+    _fit_tick_period).
+
+    Args:
+        mono_envelope: Non-negative mono envelope (mean absolute value across channels)
+        sample_rate: Sample rate in Hz
+
+    Returns:
+        TickAnalysis (no positions for silent input)
+    """
+    start_time = time.perf_counter()
+    num_samples = len(mono_envelope)
+    decimation = max(1, int(sample_rate * 0.001))
+    envelope = np.maximum.reduceat(mono_envelope, np.arange(0, num_samples, decimation)) if num_samples else mono_envelope
+    peak_amp = np.max(envelope) if num_samples else 0.0
+    if peak_amp <= 0:
+        return TickAnalysis(np.zeros(0), detection_seconds=time.perf_counter() - start_time)
+
+    floor = np.median(envelope)
+    # Minimum distance between ticks: at least 50ms
+    min_distance = max(1, int(sample_rate * 0.05) // decimation)
+    # Zero-padded so a tick in the first or last block can still be a peak
+    blocks, _ = signal.find_peaks(
+        np.concatenate(([0.0], envelope, [0.0])), height=floor + 0.2 * (peak_amp - floor), distance=min_distance
+    )
+    blocks -= 1
+
+    # Loudest sample of each peak block
+    candidates = np.minimum(blocks[:, np.newaxis] * decimation + np.arange(decimation), num_samples - 1)
+    peaks = candidates[np.arange(len(blocks)), np.argmax(mono_envelope[candidates], axis=1)]
+
+    # Parabolic interpolation through the peak and its neighbours
+    left = mono_envelope[np.maximum(peaks - 1, 0)]
+    centre = mono_envelope[peaks]
+    right = mono_envelope[np.minimum(peaks + 1, num_samples - 1)]
+    curvature = left - 2.0 * centre + right
+    with np.errstate(divide='ignore', invalid='ignore'):
+        offsets = np.where(curvature < 0, 0.5 * (left - right) / curvature, 0.0)
+    positions = peaks + np.clip(offsets, -0.5, 0.5)
+
+    period, period_error, jitter = _fit_tick_period(positions)
+    return TickAnalysis(positions, period, period_error, jitter, time.perf_counter() - start_time)
+
+@dataclass
+class AudioCharacter:
+    """Transient/sustained classification and the 10ms-window features behind it."""
+
+    label: str = 'sustained'  # 'transient' (clicks, ticks, drums) or 'sustained' (ambience, pads, textures)
+    confidence: float = 0.0  # 0 = the features disagree evenly (or too short to tell), 1 = all agree fully
+    crest_factor: float = 0.0  # Mean window peak / mean window RMS
+    spectral_flatness: float = 0.0  # Median per-window spectral flatness (0 = tonal, 1 = white noise)
+    onset_density: float = 0.0  # Energy onsets (rises of more than 6 dB between windows) per second
+    noise_floor_variation_db: float = 0.0  # Spread of the per-second noise floor (0 = perfectly stationary)
+    energy_concentration: float = 0.0  # Share of the energy in the loudest 5% of windows (1 = all of it)
+
+def _classify_character(
+    crest_factor: float,
+    energy_concentration: float,
+    onset_density: float,
+    spectral_flatness: float,
+    noise_floor_variation_db: float
+) -> Tuple[str, float]:
+    """
+    Label material transient or sustained by a weighted vote of its features.
+
+    Each feature votes between -1 (sustained) and +1 (transient), saturating at:
+      - crest factor: log2(crest / 5), a factor of two either side of 5 (weight 1)
+      - energy concentration: (share - 0.5) / 0.25; clicks put nearly all their energy
+        in the loudest 5% of windows, textures spread it out (weight 2)
+      - onset density: log2(onsets per second / 0.5) (weight 1)
+      - spectral flatness: (flatness - 0.3) / 0.3; ticks are broadband, pads and
+        pink ambience are not (weight 0.5)
+      - noise floor variation: (6 dB - variation) / 6 dB, only above 6 dB; a drifting
+        floor is an evolving texture, a steady one says nothing (weight 0.5)
+
+    Returns:
+        Tuple of (label, confidence): 'transient' if the weighted mean vote is positive,
+        and its magnitude as the confidence
+    """
+    def vote(value: float) -> float:
+        return min(1.0, max(-1.0, value))
+
+    votes = (
+        (1.0, vote(math.log2(crest_factor / 5.0)) if crest_factor > 0 else -1.0),
+        (2.0, vote((energy_concentration - 0.5) / 0.25)),
+        (1.0, vote(math.log2(onset_density / 0.5)) if onset_density > 0 else -1.0),
+        (0.5, vote((spectral_flatness - 0.3) / 0.3)),
+        (0.5, vote(min(0.0, (6.0 - noise_floor_variation_db) / 6.0))),
+    )
+    score = sum(weight * value for weight, value in votes) / sum(weight for weight, _ in votes)
+    return ('transient' if score > 0 else 'sustained'), abs(score)
+
+def _window_flatness(windows: np.ndarray, fft_chunk: int = 4096) -> np.ndarray:
+    """
+    Spectral flatness of each analysis window: geometric over arithmetic mean of its
+    Hann-tapered power spectrum, transformed fft_chunk windows at a time.
+    """
+    taper = _hann_window(windows.shape[1])
+    flatness = np.empty(len(windows))
+    for start in range(0, len(windows), fft_chunk):
+        power = np.abs(np.fft.rfft(windows[start:start + fft_chunk] * taper, axis=1)) ** 2 + 1e-20
+        flatness[start:start + fft_chunk] = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+    return flatness
+
+def _summarize_character(
+    rms_values: np.ndarray,
+    peak_values: np.ndarray,
+    flatness: np.ndarray,
+    window_samples: int,
+    sample_rate: int
+) -> AudioCharacter:
+    """
+    Features and label of material from per-window measurements (see _analyze_character).
+
+    Args:
+        rms_values: RMS of each window
+        peak_values: Absolute peak of each window
+        flatness: Spectral flatness of each window (see _window_flatness)
+        window_samples: Window length in samples
+        sample_rate: Sample rate in Hz
+
+    Returns:
+        AudioCharacter (label 'sustained' with zero confidence below 10 windows)
+    """
+    num_windows = len(rms_values)
+    if num_windows < 10:
+        return AudioCharacter()  # Default for very short audio
+
+    avg_rms = np.mean(rms_values)
+    crest_factor = float(np.mean(peak_values) / (avg_rms + 1e-10)) if avg_rms > 0 else 0.0
+
+    energy = rms_values.astype(np.float64) ** 2
+    total_energy = float(np.sum(energy))
+    loudest = max(1, int(round(num_windows * 0.05)))
+    energy_concentration = (float(np.sum(np.partition(energy, num_windows - loudest)[num_windows - loudest:]))
+                            / total_energy if total_energy > 0 else 0.0)
+
+    audible = rms_values > 0
+    spectral_flatness = float(np.median(flatness[audible])) if np.any(audible) else 0.0
+
+    levels_db = 20.0 * np.log10(rms_values + 1e-10)
+    rising = np.diff(levels_db) > 6.0
+    onsets = np.count_nonzero(rising[1:] & ~rising[:-1]) + int(rising[0])
+    onset_density = float(onsets / (num_windows * window_samples / sample_rate))
+
+    # Noise floor: 10th percentile window level of each full second (digital silence counts as -100 dBFS)
+    windows_per_second = max(1, int(round(sample_rate / window_samples)))
+    num_seconds = num_windows // windows_per_second
+    noise_floor_variation_db = 0.0
+    if num_seconds >= 2:
+        floors = np.percentile(
+            np.maximum(levels_db[:num_seconds * windows_per_second], -100.0).reshape(num_seconds, windows_per_second),
+            10, axis=1
+        )
+        noise_floor_variation_db = float(np.std(floors))
+
+    label, confidence = _classify_character(
+        crest_factor, energy_concentration, onset_density, spectral_flatness, noise_floor_variation_db
+    )
+    return AudioCharacter(label, confidence, crest_factor, spectral_flatness, onset_density,
+                          noise_floor_variation_db, energy_concentration)
+
+def _analyze_character(
+    windows: np.ndarray,
+    rms_values: np.ndarray,
+    peak_values: np.ndarray,
+    sample_rate: int,
+    fft_chunk: int = 4096
+) -> AudioCharacter:
+    """
+    Classify material from non-overlapping analysis windows in one pass.
+
+    The label comes from a vote of every feature (see _classify_character), and the
+    confidence is the margin of that vote. The features also describe the material for
+    stages that want to tune their parameters.
+
+    Args:
+        windows: (num_windows x window_samples) view of the mono signal
+        rms_values: RMS of each window
+        peak_values: Absolute peak of each window
+        sample_rate: Sample rate in Hz
+        fft_chunk: Windows transformed per FFT call, bounding the spectrum's memory
+
+    Returns:
+        AudioCharacter (label 'sustained' with zero confidence below 10 windows)
+    """
+    if len(rms_values) < 10:
+        return AudioCharacter()  # Default for very short audio
+    return _summarize_character(
+        rms_values, peak_values, _window_flatness(windows, fft_chunk), windows.shape[1], sample_rate
+    )
+
+class AnalysisContext:
+    """
+    Per-file cache of analyses of the buffer moving through the pipeline.
+
+    Downmixes, block energy envelopes, tick positions and the audio character are
+    computed on first use and reused by every stage that needs them until the buffer
+    changes. Functions that accept an `analysis` argument read from it and leave it
+    describing the buffer they return, through one of:
+      - slice(): the buffer was cut to [start, stop); per-sample downmixes are sliced
+      - apply_gain(): the buffer was scaled by a constant; tick positions and the
+        audio character are level-independent and kept
+      - replace(): anything else; every cached result is dropped
+    """
+
+    def __init__(self, audio_data: np.ndarray, sample_rate: int):
+        self.audio_data = audio_data if audio_data.ndim == 2 else audio_data[:, np.newaxis]
+        self.sample_rate = sample_rate
+        self._cache: Dict[tuple, object] = {}
+
+    def _cached(self, key: tuple, compute: Callable[[], object]) -> object:
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def detection_mono(self) -> np.ndarray:
+        """Per-sample maximum absolute value across channels (the raw channel for mono), used for trimming."""
+        def compute() -> np.ndarray:
+            if self.audio_data.shape[1] > 1:
+                # Fold channel by channel: a row-wise max over a few columns is far slower
+                envelope = np.abs(self.audio_data[:, 0])
+                for channel in range(1, self.audio_data.shape[1]):
+                    np.maximum(envelope, np.abs(self.audio_data[:, channel]), out=envelope)
+                return envelope
+            return self.audio_data[:, 0]
+        return self._cached(('detection',), compute)
+
+    def mean_mono(self) -> np.ndarray:
+        """Mean of the channels (the raw channel for mono)."""
+        def compute() -> np.ndarray:
+            if self.audio_data.shape[1] > 1:
+                # Summed column by column, like detection_mono
+                mono = self.audio_data[:, 0] + self.audio_data[:, 1]
+                for channel in range(2, self.audio_data.shape[1]):
+                    mono += self.audio_data[:, channel]
+                mono /= self.audio_data.shape[1]
+                return mono
+            return self.audio_data[:, 0]
+        return self._cached(('mean',), compute)
+
+    def mean_abs_mono(self) -> np.ndarray:
+        """Mean absolute value across channels, used for tick detection."""
+        def compute() -> np.ndarray:
+            envelope = np.abs(self.audio_data[:, 0])
+            for channel in range(1, self.audio_data.shape[1]):
+                envelope += np.abs(self.audio_data[:, channel])
+            if self.audio_data.shape[1] > 1:
+                envelope /= self.audio_data.shape[1]
+            return envelope
+        return self._cached(('mean_abs',), compute)
+
+    def block_rms(self, source: str, block_samples: int) -> np.ndarray:
+        """
+        RMS envelope of a downmix over full blocks.
+
+        Args:
+            source: 'detection' (see detection_mono) or 'mean' (see mean_mono)
+            block_samples: Block length in samples
+        """
+        mono = self.detection_mono if source == 'detection' else self.mean_mono
+        return self._cached(('block_rms', source, block_samples), lambda: _block_rms(mono(), block_samples))
+
+    def block_peak(self, source: str, block_samples: int) -> np.ndarray:
+        """Absolute peak envelope of a downmix over full blocks (see block_rms)."""
+        mono = self.detection_mono if source == 'detection' else self.mean_mono
+        return self._cached(('block_peak', source, block_samples), lambda: _block_peak(mono(), block_samples))
+
+    def ticks(self) -> TickAnalysis:
+        """Detected ticks and their fitted period (see _detect_ticks)."""
+        return self._cached(('ticks',), lambda: _detect_ticks(self.mean_abs_mono(), self.sample_rate))
+
+    def character_features(self) -> AudioCharacter:
+        """
+        Character label, confidence and features of 10ms windows of the mean downmix
+        (see _analyze_character). The windows are a reshaped view of the downmix, and
+        their RMS and peak envelopes are shared with other stages.
+        """
+        def compute() -> AudioCharacter:
+            window_samples = max(1, int(self.sample_rate * 0.01))  # 10ms windows
+            rms_values = self.block_rms('mean', window_samples)
+            if len(rms_values) < 10:
+                return AudioCharacter()
+            mono = self.mean_mono()
+            windows = mono[:len(rms_values) * window_samples].reshape(len(rms_values), window_samples)
+            return _analyze_character(windows, rms_values, self.block_peak('mean', window_samples), self.sample_rate)
+        return self._cached(('character',), compute)
+
+    def character(self) -> str:
+        """
+        'transient' for transient-heavy material, 'sustained' for ambience/sustained textures.
+
+        Decided by the features of 10ms windows of the mean downmix (see character_features).
+        """
+        return self.character_features().label
+
+    def replace(self, audio_data: np.ndarray, sample_rate: Optional[int] = None) -> None:
+        """The buffer changed arbitrarily: drop every cached result."""
+        self.audio_data = audio_data if audio_data.ndim == 2 else audio_data[:, np.newaxis]
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        self._cache = {}
+
+    def slice(self, start: int, stop: int) -> None:
+        """The buffer was cut to samples [start, stop): keep the per-sample downmixes, sliced."""
+        self.audio_data = self.audio_data[start:stop]
+        self._cache = {
+            key: value[start:stop]
+            for key, value in self._cache.items()
+            if key in (('detection',), ('mean',), ('mean_abs',))
+        }
+
+    def apply_gain(self, audio_data: np.ndarray) -> None:
+        """The buffer was scaled by a constant gain: keep the level-independent results."""
+        self.audio_data = audio_data if audio_data.ndim == 2 else audio_data[:, np.newaxis]
+        self._cache = {
+            key: value for key, value in self._cache.items() if key in (('ticks',), ('character',))
+        }
+
+def _slice_rms(search_window: np.ndarray, offsets: np.ndarray, length: int) -> np.ndarray:
+    """
+    RMS of search_window[o:o + length] for every offset o, in one vectorized gather.
+    """
+    return np.sqrt(np.mean(search_window[offsets[:, np.newaxis] + np.arange(length)] ** 2, axis=1))
+
+def _refine_trim_start(
+    search_window: np.ndarray,
+    search_start: int,
+    coarse_start: int,
+    fine_hop: int,
+    threshold_linear: float
+) -> int:
+    """
+    Refine a coarse trim start to the first non-silent 1ms slice of the search window.
+
+    Args:
+        search_window: Detection signal around the coarse start
+        search_start: Absolute sample index of search_window[0]
+        coarse_start: Coarse start boundary (returned if the window is empty)
+        fine_hop: Slice length in samples
+        threshold_linear: RMS threshold in linear scale
+
+    Returns:
+        Refined absolute start sample
+    """
+    if len(search_window) == 0:
+        return coarse_start
+
+    offsets = np.arange(0, len(search_window) - fine_hop, fine_hop)
+    loud = np.flatnonzero(_slice_rms(search_window, offsets, fine_hop) > threshold_linear)
+    fine_start_offset = int(offsets[loud[0]]) if len(loud) else 0
+    return search_start + fine_start_offset
+
+def _refine_trim_end(
+    search_window: np.ndarray,
+    search_start: int,
+    coarse_end: int,
+    fine_hop: int,
+    threshold_linear: float
+) -> int:
+    """
+    Refine a coarse trim end to the end of the last non-silent 1ms slice of the search window.
+
+    Slices are aligned to the end of the window.
+
+    Args:
+        search_window: Detection signal ending at the coarse end
+        search_start: Absolute sample index of search_window[0]
+        coarse_end: Coarse end boundary (upper bound of the result)
+        fine_hop: Slice length in samples
+        threshold_linear: RMS threshold in linear scale
+
+    Returns:
+        Refined absolute end sample (exclusive)
+    """
+    if len(search_window) == 0:
+        return coarse_end
+
+    # Latest slice first
+    offsets = np.arange(len(search_window) - fine_hop, -1, -fine_hop)
+    loud = np.flatnonzero(_slice_rms(search_window, offsets, fine_hop) > threshold_linear)
+    fine_end_offset = int(offsets[loud[0]]) + fine_hop if len(loud) else len(search_window)
+    return min(search_start + fine_end_offset, coarse_end)
+
+def _silent_runs(silent: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Start and stop (exclusive) indices of every run of True values in a boolean array.
+    """
+    edges = np.diff(np.concatenate(([0], silent.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+def _collapse_interior_silence(
+    audio_data: np.ndarray,
+    run_starts: np.ndarray,
+    run_stops: np.ndarray,
+    residual_samples: int
+) -> np.ndarray:
+    """
+    Shorten each silent region [start, stop) to residual_samples samples.
+
+    The residual is an Equal-Power Cosine Crossfade from the head of the region into
+    its tail, so the room tone on either side of the gap joins without a step.
+
+    Args:
+        audio_data: Audio signal (samples x channels)
+        run_starts: Sorted start samples of non-overlapping regions longer than residual_samples
+        run_stops: Matching stop samples (exclusive)
+        residual_samples: Length each region is shortened to (0 removes it)
+
+    Returns:
+        New array with the regions shortened
+    """
+    if residual_samples > 0:
+        fade_out, fade_in = generate_epcf_gains(residual_samples)
+        fade_out = fade_out.astype(audio_data.dtype)[:, np.newaxis]
+        fade_in = fade_in.astype(audio_data.dtype)[:, np.newaxis]
+    pieces = []
+    cursor = 0
+    for start, stop in zip(run_starts, run_stops):
+        pieces.append(audio_data[cursor:start])
+        if residual_samples > 0:
+            pieces.append(
+                audio_data[start:start + residual_samples] * fade_out
+                + audio_data[stop - residual_samples:stop] * fade_in
+            )
+        cursor = stop
+    pieces.append(audio_data[cursor:])
+    return np.concatenate(pieces)
+
 def trim_silence(
     audio_data: np.ndarray,
     sample_rate: int,
     trim_threshold_db: float = -60.0,
     min_silence_ms: int = 500,
     hop_size_ms: float = 25.0,
-    fine_grain_ms: float = 5.0
+    fine_grain_ms: float = 5.0,
+    collapse_silence: bool = DEFAULT_ENABLE_SILENCE_COLLAPSE,
+    silence_residual_ms: float = DEFAULT_SILENCE_RESIDUAL_MS,
+    analysis: Optional[AnalysisContext] = None
 ) -> Tuple[np.ndarray, int]:
     """
     High-fidelity silence trimming using RMS energy analysis with hybrid detection.
 
-    Implements a two-stage approach:
-    1. Coarse detection: Fast RMS calculation over moderate hop_size blocks
-    2. Fine-grained refinement: Precise boundary detection near transitions
+    Implements a two-stage approach over a multi-resolution energy pyramid:
+    1. Coarse detection: RMS of every hop_size block, computed in one vectorized pass
+       over the detection signal (and cached in the AnalysisContext)
+    2. Fine-grained refinement: 1ms slice RMS evaluated only inside the fine_grain_ms
+       windows around the two coarse boundaries, read straight from the samples
+
+    No copy of the signal is made; the boundaries are index lookups on the levels.
 
     CRITICAL: Always trims leading and trailing silence for perfect loops.
-    min_silence_ms parameter is reserved for future use (middle silence detection).
+
+    With collapse_silence, every interior run of silent coarse blocks lasting at least
+    min_silence_ms is also shortened to silence_residual_ms, found by run-length
+    encoding the same block levels. The residual is an equal-power splice of the head
+    and tail of the gap (see _collapse_interior_silence).
 
     Args:
         audio_data: Audio signal as numpy array (samples x channels)
         sample_rate: Sample rate in Hz
         trim_threshold_db: RMS energy threshold in dBFS (default: -60.0)
-        min_silence_ms: Reserved for future use (currently unused)
+        min_silence_ms: Minimum length of an interior silence to collapse
         hop_size_ms: Coarse detection block size in milliseconds (default: 25.0)
         fine_grain_ms: Fine-grained search window in milliseconds (default: 5.0)
+        collapse_silence: If True, shorten interior silences of at least min_silence_ms
+        silence_residual_ms: Length a collapsed silence is shortened to
+        analysis: Shared analysis of audio_data; its detection downmix and block RMS are
+                  reused, and it is sliced to the trimmed range (or replaced if any
+                  interior silence was collapsed)
 
     Returns:
         Tuple of (trimmed_audio_data, sample_rate)
@@ -131,10 +812,9 @@ def trim_silence(
 
     num_samples, num_channels = audio_data.shape
 
-    if num_channels > 1:
-        mono_for_detection = np.max(np.abs(audio_data), axis=1)
-    else:
-        mono_for_detection = audio_data[:, 0]
+    if analysis is None:
+        analysis = AnalysisContext(audio_data, sample_rate)
+    mono_for_detection = analysis.detection_mono()
 
     trim_threshold_linear = 10 ** (trim_threshold_db / 20.0)
 
@@ -145,20 +825,11 @@ def trim_silence(
 
         return (audio_data[:, 0] if is_mono else audio_data), sample_rate
 
-    padded_length = num_blocks * hop_size_samples
-    if padded_length < num_samples:
-        pad_amount = num_samples - padded_length
-        padding = np.zeros((pad_amount, num_channels))
-        audio_data_padded = np.vstack([audio_data, padding])
-        mono_padded = np.pad(mono_for_detection, (0, hop_size_samples - (num_samples % hop_size_samples)), 'constant')
-    else:
-        audio_data_padded = audio_data
-        mono_padded = mono_for_detection
-
-    blocks = mono_padded[:num_blocks * hop_size_samples].reshape(num_blocks, hop_size_samples)
-    rms_values = np.sqrt(np.mean(blocks ** 2, axis=1))
+    # RMS of each full hop (a trailing partial hop is never treated as sound)
+    rms_values = analysis.block_rms('detection', hop_size_samples)
 
-    rms_dbfs = np.array([rms_to_dbfs(rms) if rms > 0 else -np.inf for rms in rms_values])
+    with np.errstate(divide='ignore'):
+        rms_dbfs = np.where(rms_values > 0, 20.0 * np.log10(np.maximum(rms_values, 1e-300)), -np.inf)
 
     non_silent_blocks = rms_dbfs > trim_threshold_db
 
@@ -168,6 +839,7 @@ def trim_silence(
         if min_samples > num_samples:
             min_samples = num_samples
         result = audio_data[:min_samples]
+        analysis.slice(0, min_samples)
         return (result[:, 0] if is_mono else result), sample_rate
 
     first_sound_block = np.argmax(non_silent_blocks)
@@ -192,39 +864,14 @@ def trim_silence(
 
     search_start = max(0, coarse_start - fine_grain_samples)
     search_end = min(num_samples, coarse_start + fine_grain_samples)
-    search_window = mono_for_detection[search_start:search_end]
-
-    if len(search_window) > 0:
-
-        fine_start_offset = 0
-        for i in range(0, len(search_window) - fine_hop, fine_hop):
-            block = search_window[i:i + fine_hop]
-            rms = calculate_rms_energy(block)
-            if rms > trim_threshold_linear:
-                fine_start_offset = i
-                break
-        refined_start = search_start + fine_start_offset
-    else:
-        refined_start = coarse_start
+    refined_start = _refine_trim_start(
+        mono_for_detection[search_start:search_end], search_start, coarse_start, fine_hop, trim_threshold_linear
+    )
 
     search_start = max(0, coarse_end - fine_grain_samples)
-    search_end = coarse_end
-    search_window = mono_for_detection[search_start:search_end]
-
-    if len(search_window) > 0:
-
-        fine_end_offset = len(search_window)
-        for i in range(len(search_window) - fine_hop, -1, -fine_hop):
-            block = search_window[max(0, i):i + fine_hop]
-            rms = calculate_rms_energy(block)
-            if rms > trim_threshold_linear:
-                fine_end_offset = i + fine_hop
-                break
-        refined_end = search_start + fine_end_offset
-
-        refined_end = min(refined_end, coarse_end)
-    else:
-        refined_end = coarse_end
+    refined_end = _refine_trim_end(
+        mono_for_detection[search_start:coarse_end], search_start, coarse_end, fine_hop, trim_threshold_linear
+    )
 
     if refined_start >= refined_end:
 
@@ -233,11 +880,163 @@ def trim_silence(
 
     trimmed = audio_data[refined_start:refined_end]
 
+    run_starts = run_stops = np.zeros(0, dtype=np.intp)
+    if collapse_silence:
+        # Interior runs only: the first and last sound blocks bound them on both sides
+        run_starts, run_stops = _silent_runs(~non_silent_blocks[first_sound_block:last_sound_block + 1])
+        run_starts = np.maximum((run_starts + first_sound_block) * hop_size_samples, refined_start) - refined_start
+        run_stops = np.minimum((run_stops + first_sound_block) * hop_size_samples, refined_end) - refined_start
+        residual_samples = int(sample_rate * silence_residual_ms / 1000.0)
+        min_silence_samples = max(int(sample_rate * min_silence_ms / 1000.0), residual_samples + 1)
+        collapsible = (run_stops - run_starts) >= min_silence_samples
+        run_starts, run_stops = run_starts[collapsible], run_stops[collapsible]
+
+    if len(run_starts):
+        trimmed = _collapse_interior_silence(trimmed, run_starts, run_stops, residual_samples)
+        analysis.replace(trimmed, sample_rate)
+    else:
+        analysis.slice(refined_start, refined_end)
+
     if is_mono:
         trimmed = trimmed[:, 0]
 
     return trimmed, sample_rate
 
+class KernelCache:
+    """
+    Bounded LRU cache for DSP kernels that depend only on sample rate and parameters.
+
+    Filter coefficients, smoothing kernels, loudness meters and crossfade tables are
+    identical for every file at the same sample rate, so each process builds them once
+    and reuses them for every file it handles. Cached arrays are marked read-only.
+    Hits and misses are counted per kind of kernel for the --profile report.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_KERNEL_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters: Dict[str, List[int]] = {}
+
+    def get(self, kind: str, key: tuple, factory: Callable[[], object]) -> object:
+        """
+        Return the cached kernel for (kind, key), building it with factory() on a miss.
+
+        Args:
+            kind: Kernel family, used for the hit/miss counters (e.g. 'epcf_gains')
+            key: Hashable parameters the kernel depends on (sample rate, lengths, ...)
+            factory: Zero-argument callable that builds the kernel
+
+        Returns:
+            The cached kernel
+        """
+        counters = self._counters.setdefault(kind, [0, 0])
+        cache_key = (kind,) + key
+        if cache_key in self._entries:
+            self._entries.move_to_end(cache_key)
+            counters[0] += 1
+            return self._entries[cache_key]
+
+        counters[1] += 1
+        value = factory()
+        for array in (value if isinstance(value, tuple) else (value,)):
+            if isinstance(array, np.ndarray):
+                array.flags.writeable = False
+        self._entries[cache_key] = value
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit and miss counts per kernel kind."""
+        return {kind: {'hits': hits, 'misses': misses} for kind, (hits, misses) in self._counters.items()}
+
+    def clear(self) -> None:
+        """Drop every cached kernel and reset the counters."""
+        self._entries.clear()
+        self._counters.clear()
+
+KERNEL_CACHE = KernelCache()
+
+def _highpass_sos(sample_rate: int, cutoff_hz: float = 40.0) -> np.ndarray:
+    """
+    Second-order Butterworth DC/rumble high-pass used by the noise gate, as second-order
+    sections (cached per sample rate).
+    """
+    def design() -> np.ndarray:
+        nyquist = max(1.0, sample_rate / 2.0)
+        hp_cutoff = min(cutoff_hz, nyquist * 0.9)
+        hp_norm = max(1e-5, hp_cutoff / nyquist)
+        return signal.butter(2, hp_norm, btype='highpass', output='sos')
+    return KERNEL_CACHE.get('butter_highpass_sos', (sample_rate, cutoff_hz), design)
+
+def _sosfiltfilt(sos: np.ndarray, data: np.ndarray, chunk_samples: int = 1 << 16) -> np.ndarray:
+    """
+    Zero-phase SOS filtering along axis 0, identical to signal.sosfiltfilt with its default padding.
+
+    The filter state is carried in float64 from chunk to chunk and only one chunk at a time
+    is promoted, so float32 buffers are filtered with float64 accuracy (a float32 recursion
+    with poles this close to z=1 loses most of its precision) at float32 memory cost. The
+    result has data's dtype. Signals too short to pad are filtered forward only.
+
+    Args:
+        sos: Second-order sections (float64)
+        data: Signal (samples or samples x channels)
+        chunk_samples: Samples promoted to float64 at a time
+
+    Returns:
+        Filtered signal with data's shape and dtype
+    """
+    sos = np.array(sos, dtype=np.float64)  # sosfilt needs writable coefficients; cached ones are read-only
+    pad_len = 3 * (2 * len(sos) + 1 - min(int(np.sum(sos[:, 2] == 0)), int(np.sum(sos[:, 5] == 0))))
+    if len(data) <= pad_len:
+        return signal.sosfilt(sos, data.astype(np.float64), axis=0).astype(data.dtype, copy=False)
+
+    # Odd extension at both ends, as sosfiltfilt's default 'odd' padding
+    extended = np.concatenate((
+        2 * data[:1] - data[pad_len:0:-1],
+        data,
+        2 * data[-1:] - data[-2:-(pad_len + 2):-1]
+    ))
+    zi = signal.sosfilt_zi(sos)
+    zi = zi.reshape(zi.shape + (1,) * (data.ndim - 1))
+
+    # Forward pass, then backward pass over the reversed result, both in place
+    state = zi * extended[:1].astype(np.float64)
+    for start in range(0, len(extended), chunk_samples):
+        chunk = extended[start:start + chunk_samples]
+        chunk[:], state = signal.sosfilt(sos, chunk.astype(np.float64, copy=False), axis=0, zi=state)
+    state = zi * extended[-1:].astype(np.float64)
+    for stop in range(len(extended), 0, -chunk_samples):
+        chunk = extended[max(0, stop - chunk_samples):stop][::-1]
+        chunk[:], state = signal.sosfilt(sos, chunk.astype(np.float64, copy=False), axis=0, zi=state)
+    return extended[pad_len:-pad_len]
+
+def _box_kernel(window_samples: int) -> np.ndarray:
+    """
+    Normalized moving-average kernel of the given length (cached).
+    """
+    return KERNEL_CACHE.get(
+        'box_kernel', (window_samples,),
+        lambda: np.ones(window_samples, dtype=np.float64) / float(window_samples)
+    )
+
+def _hann_window(window_samples: int) -> np.ndarray:
+    """
+    Hann taper of the given length for spectral analysis (cached).
+    """
+    return KERNEL_CACHE.get('hann', (window_samples,), lambda: np.hanning(window_samples))
+
+def _loudness_meter(sample_rate: int, block_size: float = 0.400) -> 'pyln.Meter':
+    """
+    ITU-R BS.1770 meter with its K-weighting filters designed for this sample rate (cached).
+
+    Meter.integrated_loudness keeps no state between calls, so one instance is shared.
+    """
+    return KERNEL_CACHE.get(
+        'loudness_meter', (sample_rate, block_size),
+        lambda: pyln.Meter(sample_rate, block_size=block_size)
+    )
+
 def generate_epcf_gains(crossfade_length: int) -> Tuple[np.ndarray, np.ndarray]:
     """
     Generate gain coefficients for Equal-Power Cosine Crossfade (EPCF).
@@ -249,6 +1048,8 @@ def generate_epcf_gains(crossfade_length: int) -> Tuple[np.ndarray, np.ndarray]:
     g1(k) = sqrt(0.5 + 0.5 * cos(πk))  [Fade-Out]
     g2(k) = sqrt(0.5 - 0.5 * cos(πk))  [Fade-In]
 
+    Tables are cached per length (see KernelCache) and returned read-only.
+
     Args:
         crossfade_length: Number of samples in crossfade
 
@@ -256,18 +1057,22 @@ def generate_epcf_gains(crossfade_length: int) -> Tuple[np.ndarray, np.ndarray]:
         Tuple of (fade_out_gains, fade_in_gains) as numpy arrays
     """
 
-    k = np.linspace(0.0, 1.0, crossfade_length)
+    def build() -> Tuple[np.ndarray, np.ndarray]:
+        k = np.linspace(0.0, 1.0, crossfade_length)
+
+        fade_out = np.sqrt(0.5 + 0.5 * np.cos(np.pi * k))
 
-    fade_out = np.sqrt(0.5 + 0.5 * np.cos(np.pi * k))
+        fade_in = np.sqrt(0.5 - 0.5 * np.cos(np.pi * k))
 
-    fade_in = np.sqrt(0.5 - 0.5 * np.cos(np.pi * k))
+        return fade_out, fade_in
 
-    return fade_out, fade_in
+    return KERNEL_CACHE.get('epcf_gains', (crossfade_length,), build)
 
 
 def _adjust_loop_spacing(
     audio_data: np.ndarray,
-    sample_rate: int
+    sample_rate: int,
+    ticks: Optional[TickAnalysis] = None
 ) -> np.ndarray:
     """
     Adjust audio so loop spacing matches tick spacing.
@@ -275,6 +1080,8 @@ def _adjust_loop_spacing(
     Detects tick positions, measures the period between ticks,
     and adjusts the audio length so that the gap from the last tick
     to the end + gap from start to first tick equals the tick period.
+    Tick positions and the period are sub-sample estimates, so the only
+    rounding is of the final length (at most half a sample per loop).
     
     When padding is needed, uses background audio from between ticks
     (rather than silence) to maintain consistent low-level audio
@@ -283,6 +1090,7 @@ def _adjust_loop_spacing(
     Args:
         audio_data: Audio signal as numpy array (samples x channels or samples)
         sample_rate: Sample rate in Hz
+        ticks: Ticks already detected in audio_data (see _detect_ticks)
         
     Returns:
         Audio signal with adjusted spacing for perfect looping
@@ -295,42 +1103,16 @@ def _adjust_loop_spacing(
         
     num_samples, num_channels = audio_data.shape
     
-    # Convert to mono for detection
-    if num_channels > 1:
-        mono = np.mean(np.abs(audio_data), axis=1)
-    else:
-        mono = np.abs(audio_data[:, 0])
-    
-    # Detect peaks (ticks) using scipy
-    peak_amp = np.max(mono)
-    if peak_amp <= 0:
-        return audio_data[:, 0] if is_mono else audio_data
-    
-    # Minimum distance between ticks: at least 50ms
-    min_distance = max(1, int(sample_rate * 0.05))
-    # Height threshold: 20% of peak
-    height = peak_amp * 0.2
-    
-    peaks, _ = signal.find_peaks(mono, height=height, distance=min_distance)
-    
-    if len(peaks) < 3:
-        # Not enough ticks to determine spacing, return as-is
-        return audio_data[:, 0] if is_mono else audio_data
-    
-    # Calculate periods between ticks (skip first and last to avoid edge effects)
-    if len(peaks) >= 2:
-        periods = np.diff(peaks[1:-1])  # Use middle ticks for more reliable measurement
-    else:
-        periods = np.diff(peaks)
+    if ticks is None:
+        ticks = AnalysisContext(audio_data, sample_rate).ticks()
     
-    if len(periods) == 0:
+    if ticks.period is None:
+        # Too few ticks, or not regular enough, to determine spacing: return as-is
         return audio_data[:, 0] if is_mono else audio_data
     
-    # Use median period as the target spacing
-    target_period = int(np.median(periods))
-    
-    if target_period <= 0:
-        return audio_data[:, 0] if is_mono else audio_data
+    # Fitted period over all ticks is the target spacing
+    target_period = ticks.period
+    peaks = np.rint(ticks.positions).astype(np.intp)
     
     # Get first and last tick positions
     first_tick = peaks[0]
@@ -339,10 +1121,10 @@ def _adjust_loop_spacing(
     # Calculate current gaps
     gap_before_first = first_tick
     gap_after_last = num_samples - last_tick
-    current_wrap_gap = gap_before_first + gap_after_last
+    current_wrap_gap = ticks.positions[0] + (num_samples - ticks.positions[-1])
     
-    # Calculate how much we need to adjust
-    gap_adjustment = target_period - current_wrap_gap
+    # Calculate how much we need to adjust (rounded once, from sub-sample positions)
+    gap_adjustment = int(round(target_period - current_wrap_gap))
     
     if gap_adjustment == 0:
         # Already perfect spacing
@@ -357,18 +1139,17 @@ def _adjust_loop_spacing(
         # Extract a representative sample of background audio from between ticks
         # Use a gap between middle ticks (avoiding edges) for more reliable background
         if len(peaks) >= 2:
-            # Find a gap between ticks that's representative
+            # Find a gap between ticks that's representative: the longest one that is
+            # long enough, from 10% into the gap to 10% before the next tick
             best_gap_start = None
             best_gap_length = 0
             
-            for i in range(len(peaks) - 1):
-                gap_start = peaks[i] + int(target_period * 0.1)  # Start 10% into the gap
-                gap_end = peaks[i + 1] - int(target_period * 0.1)  # End 10% before next tick
-                gap_length = gap_end - gap_start
-                
-                if gap_length > best_gap_length and gap_length > samples_to_add:
-                    best_gap_start = gap_start
-                    best_gap_length = gap_length
+            gap_starts = peaks[:-1] + int(target_period * 0.1)
+            gap_lengths = (peaks[1:] - int(target_period * 0.1)) - gap_starts
+            if np.any(gap_lengths > samples_to_add):
+                best = int(np.argmax(gap_lengths))
+                best_gap_start = int(gap_starts[best])
+                best_gap_length = int(gap_lengths[best])
             
             if best_gap_start is not None and best_gap_length >= samples_to_add:
                 # Use a sample from the middle of a representative gap (quiet background audio)
@@ -445,7 +1226,8 @@ def apply_crossfade(
     xfade_duration_ms: int = 100,
     pre_normalize: bool = False,
     enforce_seamless_loop: bool = True,
-    mirror_loop_start: bool = DEFAULT_LOOP_MIRROR_HEAD
+    mirror_loop_start: bool = DEFAULT_LOOP_MIRROR_HEAD,
+    analysis: Optional[AnalysisContext] = None
 ) -> np.ndarray:
     """
     Apply Equal-Power Cosine Crossfade (EPCF) to audio signal.
@@ -469,6 +1251,8 @@ def apply_crossfade(
         pre_normalize: If True, normalize power levels before crossfade (default: False)
                       Set to False for clock/timer sounds to preserve transient shape
         mirror_loop_start: If True, writes the blended seam to both start and end
+        analysis: Shared analysis of audio_data; its tick positions are reused and it is
+                  updated to describe the returned signal
 
     Returns:
         Audio signal with EPCF applied
@@ -482,7 +1266,17 @@ def apply_crossfade(
 
     # Adjust spacing FIRST so loop gap matches tick spacing (before any processing)
     if enforce_seamless_loop:
-        audio_data = _adjust_loop_spacing(audio_data, sample_rate)
+        ticks = (analysis if analysis is not None else AnalysisContext(audio_data, sample_rate)).ticks()
+        if ticks.period is not None:
+            print(
+                f"    Tick period: {ticks.period / sample_rate * 1000.0:.4f} ms "
+                f"(+/- {ticks.period_error / sample_rate * 1000.0:.4f} ms, jitter {ticks.jitter:.2f} samples) "
+                f"from {len(ticks.positions)} ticks, detected in {ticks.detection_seconds * 1000.0:.1f} ms"
+            )
+        elif len(ticks.positions) >= 3:
+            print(f"    No regular tick period in {len(ticks.positions)} peaks (jitter {ticks.jitter:.1f} samples), "
+                  f"loop length kept")
+        audio_data = _adjust_loop_spacing(audio_data, sample_rate, ticks)
         # _adjust_loop_spacing preserves shape (returns 1D if input was 1D, 2D if input was 2D)
         # Update is_mono flag based on current shape
         if len(audio_data.shape) == 1:
@@ -500,6 +1294,8 @@ def apply_crossfade(
 
     if actual_xfade <= 0:
 
+        if analysis is not None:
+            analysis.replace(audio_data)
         return audio_data[:, 0] if is_mono else audio_data
 
     fade_out_gains, fade_in_gains = generate_epcf_gains(actual_xfade)
@@ -550,14 +1346,86 @@ def apply_crossfade(
         faded_audio[:actual_xfade] *= fade_in_gains_2d
         faded_audio[-actual_xfade:] *= fade_out_gains_2d
 
+    if analysis is not None:
+        analysis.replace(faded_audio)
+
     if is_mono:
         faded_audio = faded_audio[:, 0]
 
     return faded_audio
 
-def _smooth_gain_curve(values: np.ndarray, sample_rate: int, attack_ms: float, release_ms: float) -> np.ndarray:
+def _follow_switching_block(
+    segment: np.ndarray,
+    previous: float,
+    coeffs: Tuple[float, float],
+    powers: Tuple[np.ndarray, np.ndarray],
+    max_passes: int = 8
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Attack/release recursion over one block whose decisions switch too often for per-run lfilter calls.
+
+    With the attack/release decision of every sample fixed, the recursion is linear:
+    y[n] = P[n] * (previous + sum over k <= n of (1 - c[k]) * x[k] / P[k]), where P[n] is
+    the product of the coefficients so far, i.e. attack_coeff ** (attacks so far) *
+    release_coeff ** (releases so far), read from the precomputed power tables. The
+    decisions are guessed from previous, the block is computed at once, and the decisions
+    are recomputed from the result until they agree (usually after one or two passes).
+    Decision n depends only on outputs before it, so the outputs up to the first
+    disagreement are exact either way. Disagreements where the input equals the previous
+    output to within rounding are ignored: there both constants give the same output, and
+    the per-sample recursion's choice is down to rounding too (this happens wherever the
+    output has settled on a constant input).
+
+    Args:
+        segment: Input values of the block (at most len(powers[0]) - 1 of them)
+        previous: Output just before the block
+        coeffs: (attack_coeff, release_coeff)
+        powers: Powers 0, 1, 2, ... of attack_coeff and of release_coeff
+        max_passes: Passes before settling for the verified prefix
+
+    Returns:
+        Tuple of (outputs, decisions) for the verified prefix of the block (at least one sample)
+    """
+    attack_coeff, release_coeff = coeffs
+    attack_powers, release_powers = powers
+    positions = np.arange(1, len(segment) + 1)
+    tie_tolerance = 1e-12 * max(abs(previous), float(np.max(np.abs(segment))))
+    attacking = segment < previous
+    prior = np.empty_like(segment)
+    for _ in range(max_passes):
+        attacks = np.cumsum(attacking)
+        products = attack_powers[attacks] * release_powers[positions - attacks]
+        weighted = np.where(attacking, 1.0 - attack_coeff, 1.0 - release_coeff) * segment
+        outputs = products * (previous + np.cumsum(weighted / products))
+        prior[0] = previous
+        prior[1:] = outputs[:-1]
+        actual = segment < prior
+        mismatched = (actual != attacking) & (np.abs(segment - prior) > tie_tolerance)
+        if not mismatched.any():
+            return outputs, attacking
+        verified = max(1, int(np.argmax(mismatched)))
+        attacking = actual
+    return outputs[:verified], attacking[:verified]
+
+def _smooth_gain_curve(
+    values: np.ndarray,
+    sample_rate: int,
+    attack_ms: float,
+    release_ms: float,
+    initial_value: Optional[float] = None
+) -> np.ndarray:
     """
     Smooth an envelope using simple attack/release constants to avoid zipper noise.
+
+    Each sample uses the attack constant when the input falls below the previous output
+    and the release constant otherwise. Within a run of samples that keep the same
+    constant the recursion is a linear one-pole filter, so runs are computed with
+    lfilter and only the switch points are located in Python. Where the decision flips
+    every few samples, blocks are computed whole instead (see _follow_switching_block).
+    Output equals the per-sample recursion to within rounding.
+
+    initial_value continues the envelope from a previous block (streaming); when None
+    the curve starts at values[0].
     """
     if values.size == 0:
         return values
@@ -566,14 +1434,94 @@ def _smooth_gain_curve(values: np.ndarray, sample_rate: int, attack_ms: float, r
     release_ms = max(0.1, release_ms)
     attack_coeff = math.exp(-1.0 / max(1.0, sample_rate * (attack_ms / 1000.0)))
     release_coeff = math.exp(-1.0 / max(1.0, sample_rate * (release_ms / 1000.0)))
-
+    filters = {
+        coeff: (np.array([1.0 - coeff]), np.array([1.0, -coeff]))
+        for coeff in (attack_coeff, release_coeff)
+    }
+    # Switching blocks divide by products of the coefficients, so keep those far from underflow
+    switching_block = int(min(2048, max(16, math.log(1e-100) / math.log(min(attack_coeff, release_coeff)))))
+    powers = (attack_coeff ** np.arange(switching_block + 1), release_coeff ** np.arange(switching_block + 1))
+
+    num_values = len(values)
     smoothed = np.zeros_like(values)
-    smoothed[0] = values[0]
-    for i in range(1, len(values)):
-        coeff = attack_coeff if values[i] < smoothed[i - 1] else release_coeff
-        smoothed[i] = (coeff * smoothed[i - 1]) + ((1.0 - coeff) * values[i])
+    if initial_value is None:
+        smoothed[0] = values[0]
+        position = 1
+        previous = values[0]
+    else:
+        position = 0
+        previous = initial_value
+
+    block_length = 256
+    switching_length = switching_block
+    per_sample = False
+    while position < num_values:
+        if per_sample:
+            # Rapid switching: an lfilter call per short run costs more than computing
+            # whole blocks, until the last decision of a block has held for 64 samples
+            segment = values[position:position + switching_length].astype(np.float64)
+            outputs, decisions = _follow_switching_block(
+                segment, float(previous), (attack_coeff, release_coeff), powers
+            )
+            smoothed[position:position + len(outputs)] = outputs
+            previous = outputs[-1]
+            position += len(outputs)
+            # Near-ties can stop a block short; shrink the block until they pass
+            switching_length = (min(switching_block, switching_length * 2) if len(outputs) == len(segment)
+                                else min(switching_block, max(16, len(outputs) * 2)))
+            switches = np.flatnonzero(decisions[1:] != decisions[:-1])
+            last_run = len(decisions) - (switches[-1] + 1 if len(switches) else 0)
+            if last_run >= 64:
+                per_sample = False
+                block_length = 256
+            continue
+
+        stop = min(num_values, position + block_length)
+        segment = values[position:stop]
+        attacking = segment[0] < previous
+        coeff = attack_coeff if attacking else release_coeff
+        b, a = filters[coeff]
+        candidate, _ = signal.lfilter(b, a, segment, zi=[coeff * previous])
+
+        # The run ends at the first sample whose attack/release decision differs
+        prior = np.empty_like(candidate)
+        prior[0] = previous
+        prior[1:] = candidate[:-1]
+        mismatched = (segment >= prior) if attacking else (segment < prior)
+        run_length = int(np.argmax(mismatched)) if mismatched.any() else len(segment)
+
+        smoothed[position:position + run_length] = candidate[:run_length]
+        previous = candidate[run_length - 1]
+        position += run_length
+
+        if run_length == len(segment):
+            block_length = min(block_length * 2, 1 << 16)
+        else:
+            block_length = max(256, run_length * 2)
+            per_sample = run_length < 64
+            switching_length = switching_block
     return smoothed
 
+def _as_float_audio(audio_data: np.ndarray, precision: str = DEFAULT_PRECISION) -> np.ndarray:
+    """
+    Return audio as floating point in [-1.0, 1.0] without changing the working precision.
+
+    float32 and float64 buffers (see --precision) pass through untouched. Integer PCM is
+    scaled to the given precision; any other type is converted to it and clipped.
+
+    Args:
+        audio_data: Audio signal as numpy array
+        precision: Sample type ('float64' or 'float32') for buffers that are not float32 or float64
+    """
+    if audio_data.dtype in (np.float32, np.float64):
+        return audio_data
+    if audio_data.dtype == np.int16:
+        return audio_data.astype(precision) / 32768.0
+    if audio_data.dtype == np.int32:
+        return audio_data.astype(precision) / 2147483648.0
+    converted = audio_data.astype(precision)
+    return np.clip(converted, -1.0, 1.0, out=converted)
+
 def apply_noise_reduction(
     audio_data: np.ndarray,
     sample_rate: int,
@@ -581,7 +1529,8 @@ def apply_noise_reduction(
     reduction_db: float = 24.0,
     window_ms: float = 12.0,
     attack_ms: float = 2.0,
-    release_ms: float = 40.0
+    release_ms: float = 40.0,
+    analysis: Optional[AnalysisContext] = None
 ) -> np.ndarray:
     """
     Remove low-level hiss and crackle between clock ticks using a gentle noise gate.
@@ -599,6 +1548,7 @@ def apply_noise_reduction(
         window_ms: Window length for RMS envelope estimation
         attack_ms: Attack constant for gain smoothing
         release_ms: Release constant for gain smoothing
+        analysis: Shared analysis of audio_data, updated to describe the returned signal
 
     Returns:
         Noise-reduced audio signal
@@ -606,39 +1556,34 @@ def apply_noise_reduction(
     if audio_data.size == 0:
         return audio_data
 
-    # Use float64 during filtering/envelope math to avoid NaNs on some inputs.
-    # Cast back to float32 at the end for saving.
-    if len(audio_data.shape) == 1:
-        audio_working = audio_data[:, np.newaxis].astype(np.float64)
+    # Work in the buffer's own precision (see --precision); the filter keeps its state in
+    # float64 (see _sosfiltfilt), which is what avoids NaNs and precision loss in float32.
+    audio_working = _as_float_audio(audio_data)
+    if len(audio_working.shape) == 1:
+        audio_working = audio_working[:, np.newaxis]
         is_mono = True
     else:
-        audio_working = audio_data.astype(np.float64)
         is_mono = False
+    dtype = audio_working.dtype
 
     num_samples, num_channels = audio_working.shape
 
-    dc_offset = np.mean(audio_working, axis=0, keepdims=True)
+    dc_offset = np.mean(audio_working, axis=0, keepdims=True, dtype=np.float64).astype(dtype)
     audio_centered = audio_working - dc_offset
 
-    nyquist = max(1.0, sample_rate / 2.0)
-    hp_cutoff = min(40.0, nyquist * 0.9)
-    hp_norm = max(1e-5, hp_cutoff / nyquist)
-    b_hp, a_hp = signal.butter(2, hp_norm, btype='highpass')
-
-    pad_len = max(len(a_hp), len(b_hp)) * 3
-    if num_samples > pad_len:
-        filtered = signal.filtfilt(b_hp, a_hp, audio_centered, axis=0)
-    else:
-        filtered = signal.lfilter(b_hp, a_hp, audio_centered, axis=0)
+    filtered = _sosfiltfilt(_highpass_sos(sample_rate), audio_centered)
 
     # Guard against rare filter numerical issues producing NaNs/Infs.
     if not np.isfinite(filtered).all():
         filtered = np.nan_to_num(filtered, nan=0.0, posinf=0.0, neginf=0.0)
 
-    mono_signal = np.mean(filtered, axis=1)
+    # The gate envelope stays in float64 whatever the precision: float32 FFT round-off
+    # near silence is large enough to move the gain around the threshold.
+    mono_signal = np.mean(filtered, axis=1, dtype=np.float64)
     window_samples = max(1, int(sample_rate * window_ms / 1000.0))
-    kernel = np.ones(window_samples, dtype=np.float64) / float(window_samples)
-    rms_envelope = np.sqrt(signal.convolve(mono_signal ** 2, kernel, mode='same') + 1e-12)
+    kernel = _box_kernel(window_samples)
+    # FFT convolution can leave tiny negative energies where the signal is silent
+    rms_envelope = np.sqrt(np.maximum(signal.convolve(mono_signal ** 2, kernel, mode='same'), 0.0) + 1e-12)
 
     threshold_linear = 10 ** (threshold_db / 20.0)
     reduction_linear = 10 ** (-abs(reduction_db) / 20.0)
@@ -646,222 +1591,405 @@ def apply_noise_reduction(
 
     target_gain = reduction_linear + (1.0 - reduction_linear) * ratio
     smoothed_gain = _smooth_gain_curve(target_gain, sample_rate, attack_ms, release_ms)
-    gain = smoothed_gain[:, np.newaxis] if num_channels > 1 or is_mono else smoothed_gain
+    processed = filtered * smoothed_gain.astype(dtype, copy=False)[:, np.newaxis]
 
-    processed = filtered * gain
+    if analysis is not None:
+        analysis.replace(processed)
 
     if is_mono:
         processed = processed[:, 0]
 
-    return processed.astype(np.float32)
+    return processed
 
-def normalize_peak(
-    audio_data: np.ndarray,
-    sample_rate: int,
-    target_dbfs: float = -3.0,
-    max_peak_dbfs: float = -1.0
-) -> np.ndarray:
+@dataclass
+class LevelMeasurement:
     """
-    Normalize audio to target peak level using simple peak detection.
+    Sample peak and integrated loudness of a signal (see measure_level).
 
-    Peak normalization preserves transients better than LUFS for short sounds
-    like clock ticks, as it doesn't apply K-weighting filters that can soften attacks.
+    loudness is None in peak mode and when the BS.1770 measurement failed; it may be
+    -inf for silent input, which normalization_gain leaves untouched.
+    """
+
+    peak: float
+    loudness: Optional[float] = None
+
+def measure_level(audio_data: np.ndarray, sample_rate: int, use_lufs: bool = True) -> LevelMeasurement:
+    """
+    Measure the level normalize_lufs / normalize_peak compute their gain from.
+
+    Measuring once and calling normalization_gain per target lets several loudness
+    targets share one BS.1770 measurement.
 
     Args:
         audio_data: Audio signal as numpy array (samples x channels or samples)
         sample_rate: Sample rate in Hz
-        target_dbfs: Target peak level in dBFS (default: -3.0)
-        max_peak_dbfs: Maximum allowed peak in dBFS (default: -1.0, True Peak limit)
+        use_lufs: If True, also measure integrated loudness (ITU-R BS.1770)
 
     Returns:
-        Peak-normalized audio signal
+        LevelMeasurement of the signal
     """
-
-    if len(audio_data.shape) == 1:
+    if audio_data.ndim == 1:
         audio_data = audio_data[:, np.newaxis]
-        is_mono = True
-    else:
-        is_mono = False
-
-    if audio_data.dtype != np.float32:
-
-        if audio_data.dtype == np.int16:
-            audio_data = audio_data.astype(np.float32) / 32768.0
-        elif audio_data.dtype == np.int32:
-            audio_data = audio_data.astype(np.float32) / 2147483648.0
-        else:
-            audio_data = audio_data.astype(np.float32)
+    audio_data = _as_float_audio(audio_data)
+    peak = float(np.max(np.abs(audio_data))) if audio_data.size else 0.0
+    if not use_lufs:
+        return LevelMeasurement(peak)
 
-            audio_data = np.clip(audio_data, -1.0, 1.0)
-
-    peak_value = np.max(np.abs(audio_data))
-
-    if peak_value <= 0:
+    # pyloudnorm expects (samples, channels), which is already the layout here
+    try:
+        loudness = float(_loudness_meter(sample_rate).integrated_loudness(audio_data))
+    except Exception as e:
+        print(f"    Warning: LUFS measurement failed ({str(e)}), using peak normalization")
+        loudness = None
+    return LevelMeasurement(peak, loudness)
 
-        return audio_data[:, 0] if is_mono else audio_data
+def normalization_gain(
+    measurement: LevelMeasurement,
+    target: float,
+    max_peak_dbfs: float = -1.0,
+    use_lufs: bool = True
+) -> float:
+    """
+    Linear gain that brings a measured signal to the target level, peak limited.
 
-    target_linear = 10 ** (target_dbfs / 20.0)
-    gain = target_linear / peak_value
+    Args:
+        measurement: Level of the signal (see measure_level)
+        target: Target loudness in LUFS, or target peak in dBFS in peak mode (and when
+                the loudness could not be measured)
+        max_peak_dbfs: Maximum allowed peak in dBFS after the gain
+        use_lufs: If True, normalize loudness; otherwise normalize the peak
 
-    normalized = audio_data * gain
+    Returns:
+        Gain to multiply the signal by (1.0 for silent or unmeasurable input)
+    """
+    if use_lufs and measurement.loudness is not None:
+        if not np.isfinite(measurement.loudness):
+            return 1.0
+        gain = 10 ** ((target - measurement.loudness) / 20.0)
+    elif measurement.peak > 0:
+        gain = (10 ** (target / 20.0)) / measurement.peak
+    else:
+        return 1.0
 
     max_peak_linear = 10 ** (max_peak_dbfs / 20.0)
-    new_peak = np.max(np.abs(normalized))
-
+    new_peak = measurement.peak * gain
     if new_peak > max_peak_linear:
+        if use_lufs:
+            print(f"    Applied True Peak limiting: {new_peak:.4f} -> {max_peak_linear:.4f}")
+        gain = max_peak_linear / measurement.peak
+    return gain
 
-        attenuation_factor = max_peak_linear / new_peak
-        normalized = normalized * attenuation_factor
+def _apply_gain(audio_data: np.ndarray, gain: float, analysis: Optional[AnalysisContext] = None) -> np.ndarray:
+    """
+    Scale audio by a normalization gain in its own precision and update the shared analysis.
+    """
+    if gain != 1.0:
+        audio_data = (audio_data * gain).astype(audio_data.dtype, copy=False)
+    if analysis is not None:
+        analysis.apply_gain(audio_data)
+    return audio_data
 
-    if is_mono:
-        normalized = normalized[:, 0]
+def normalize_peak(
+    audio_data: np.ndarray,
+    sample_rate: int,
+    target_dbfs: float = -3.0,
+    max_peak_dbfs: float = -1.0,
+    analysis: Optional[AnalysisContext] = None
+) -> np.ndarray:
+    """
+    Normalize audio to target peak level using simple peak detection.
+
+    Peak normalization preserves transients better than LUFS for short sounds
+    like clock ticks, as it doesn't apply K-weighting filters that can soften attacks.
 
-    return normalized
+    Args:
+        audio_data: Audio signal as numpy array (samples x channels or samples)
+        sample_rate: Sample rate in Hz
+        target_dbfs: Target peak level in dBFS (default: -3.0)
+        max_peak_dbfs: Maximum allowed peak in dBFS (default: -1.0, True Peak limit)
+        analysis: Shared analysis of audio_data, updated to describe the returned signal
+
+    Returns:
+        Peak-normalized audio signal
+    """
+    audio_data = _as_float_audio(audio_data)
+    gain = normalization_gain(
+        measure_level(audio_data, sample_rate, use_lufs=False), target_dbfs, max_peak_dbfs, use_lufs=False
+    )
+    return _apply_gain(audio_data, gain, analysis)
 
 def normalize_lufs(
     audio_data: np.ndarray,
     sample_rate: int,
     target_lufs: float = -12.0,
-    max_peak_dbfs: float = -1.0
+    max_peak_dbfs: float = -1.0,
+    analysis: Optional[AnalysisContext] = None
 ) -> np.ndarray:
     """
     Normalize audio to target LUFS using ITU-R BS.1770 standard.
 
     Implements broadcast-quality loudness normalization with True Peak limiting.
-    Uses pyloudnorm for K-weighting, gating, and integrated loudness calculation.
+    Uses pyloudnorm for K-weighting, gating, and integrated loudness calculation;
+    falls back to peak normalization if the loudness cannot be measured.
 
     Args:
         audio_data: Audio signal as numpy array (samples x channels or samples)
         sample_rate: Sample rate in Hz
         target_lufs: Target loudness in LUFS (default: -12.0, louder playback)
         max_peak_dbfs: Maximum allowed peak in dBFS (default: -1.0, True Peak limit)
+        analysis: Shared analysis of audio_data, updated to describe the returned signal
 
     Returns:
         Loudness-normalized audio signal
     """
+    audio_data = _as_float_audio(audio_data)
+    gain = normalization_gain(measure_level(audio_data, sample_rate), target_lufs, max_peak_dbfs)
+    return _apply_gain(audio_data, gain, analysis)
 
-    if len(audio_data.shape) == 1:
-        audio_data = audio_data[:, np.newaxis]
-        is_mono = True
-    else:
-        is_mono = False
-
-    if audio_data.dtype != np.float32:
+def _detect_audio_character(
+    audio_data: np.ndarray,
+    sample_rate: int
+) -> str:
+    """
+    Detect if audio is transient-heavy (like clock ticks) or sustained/ambient.
+    
+    Uses the features of 10ms windows (see AnalysisContext.character);
+    analyze_audio_character returns the confidence and features as well.
+    
+    Args:
+        audio_data: Audio signal as numpy array (samples x channels or samples)
+        sample_rate: Sample rate in Hz
+        
+    Returns:
+        'transient' for transient-heavy material, 'sustained' for ambience/sustained textures
+    """
+    return AnalysisContext(audio_data, sample_rate).character()
 
-        if audio_data.dtype == np.int16:
-            audio_data = audio_data.astype(np.float32) / 32768.0
-        elif audio_data.dtype == np.int32:
-            audio_data = audio_data.astype(np.float32) / 2147483648.0
-        else:
-            audio_data = audio_data.astype(np.float32)
+def analyze_audio_character(audio_data: np.ndarray, sample_rate: int) -> AudioCharacter:
+    """
+    Classify audio as transient or sustained and describe it.
 
-            audio_data = np.clip(audio_data, -1.0, 1.0)
+    Args:
+        audio_data: Audio signal as numpy array (samples x channels or samples)
+        sample_rate: Sample rate in Hz
 
-    audio_for_meter = audio_data.T
+    Returns:
+        AudioCharacter with the label, its confidence, crest factor, spectral flatness,
+        onset density, noise floor variation and energy concentration
+    """
+    return AnalysisContext(audio_data, sample_rate).character_features()
 
-    meter = pyln.Meter(sample_rate)
+def _linear_to_db(value: float) -> Optional[float]:
+    """Amplitude in dB, or None for zero (silence)."""
+    return float(20.0 * np.log10(value)) if value > 0 else None
 
-    try:
-        measured_loudness = meter.integrated_loudness(audio_for_meter)
+@dataclass
+class AudioAnalysis:
+    """
+    Measurements of one file made without rendering it (see analyze_audio and --analyze).
 
-        if not np.isfinite(measured_loudness):
+    Every measurement is None for a file that could not be analyzed (see error), so a
+    failed row never reads as a silent, zero-length sustained clip.
+    """
 
-            return audio_data[:, 0] if is_mono else audio_data
+    file: str = ''
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    duration_sec: Optional[float] = None
+    trimmed_duration_sec: Optional[float] = None  # Length after trim_silence with the run's trim settings
+    loudness_lufs: Optional[float] = None  # Integrated loudness (ITU-R BS.1770); None below 400 ms or for silence
+    sample_peak_dbfs: Optional[float] = None  # None for silence
+    true_peak_dbtp: Optional[float] = None  # 4x oversampled peak (see measure_true_peak)
+    character: Optional[str] = None  # Label of _detect_audio_character: 'transient' or 'sustained'
+    character_confidence: Optional[float] = None
+    crest_factor: Optional[float] = None
+    tick_count: Optional[int] = None  # Detected ticks (None without a fitted period, like tick_period_ms)
+    tick_period_ms: Optional[float] = None  # Fitted tick period (None without 3 regular ticks)
+    tick_jitter_ms: Optional[float] = None  # RMS deviation of the ticks from the fitted grid
+    seam_db: Optional[float] = None  # score_loop_seam of the trimmed audio looped as is (around 0 dB = no click)
+    analysis_seconds: float = 0.0  # Decode and measurement time
+    error: Optional[str] = None  # Why the file could not be analyzed (every measurement is then None)
+
+    def describe(self) -> str:
+        """Return a one-line summary of the measurements."""
+        if self.error is not None:
+            return f"[ERROR] {self.error}"
+        def db(value: Optional[float], unit: str) -> str:
+            return f"{value:.1f} {unit}" if value is not None else f"-inf {unit}"
+        parts = [
+            f"{self.duration_sec:.2f} s (trimmed {self.trimmed_duration_sec:.2f} s)",
+            db(self.loudness_lufs, 'LUFS') if self.loudness_lufs is not None or self.duration_sec >= 0.4 else "LUFS n/a",
+            f"peak {db(self.sample_peak_dbfs, 'dBFS')} / {db(self.true_peak_dbtp, 'dBTP')}",
+            f"{self.character} ({self.character_confidence:.2f})",
+        ]
+        if self.tick_period_ms is not None:
+            parts.append(f"ticks every {self.tick_period_ms:.2f} ms (jitter {self.tick_jitter_ms:.3f} ms)")
+        if self.seam_db is not None:
+            parts.append(f"seam {self.seam_db:+.1f} dB")
+        return ", ".join(parts)
+
+def analyze_audio(
+    audio_data: np.ndarray,
+    sample_rate: int,
+    trim_threshold_db: float = DEFAULT_TRIM_THRESHOLD_DB,
+    min_silence_ms: int = DEFAULT_MIN_SILENCE_MS,
+    collapse_silence: bool = DEFAULT_ENABLE_SILENCE_COLLAPSE,
+    silence_residual_ms: float = DEFAULT_SILENCE_RESIDUAL_MS
+) -> AudioAnalysis:
+    """
+    Measure a clip without processing it: the numbers a render would look at, in one pass.
 
-        normalized = pyln.normalize.loudness(audio_for_meter, measured_loudness, target_lufs)
+    Every measurement reads the same AnalysisContext, so the downmixes and block envelopes
+    are computed once. The character comes from the same features as
+    analyze_audio_character, and the true peak is searched block by block (see
+    measure_true_peak). Loudness, peaks, ticks and character describe the whole input;
+    the seam is that of the trimmed audio looped without a crossfade.
 
-        normalized = normalized.T
+    Args:
+        audio_data: Audio signal as numpy array (samples x channels or samples)
+        sample_rate: Sample rate in Hz
+        trim_threshold_db: Trim threshold in dBFS (see trim_silence)
+        min_silence_ms: Minimum length of an interior silence to collapse
+        collapse_silence: If True, trimmed_duration_sec also counts collapsed interior silences
+        silence_residual_ms: Length a collapsed silence is shortened to
 
-    except Exception as e:
+    Returns:
+        AudioAnalysis (file and analysis_seconds are left for the caller)
+    """
+    analysis = AnalysisContext(audio_data, sample_rate)
+    audio_data = analysis.audio_data
+    num_samples, num_channels = audio_data.shape
+    sample_peak = float(np.max(np.abs(analysis.detection_mono()))) if num_samples else 0.0
+    true_peak = measure_true_peak(audio_data, sample_rate, analysis)
+    character = analysis.character_features()
+    ticks = analysis.ticks()
+    try:
+        loudness = measure_integrated_loudness(audio_data, sample_rate)
+    except ValueError:
+        loudness = None  # Shorter than one gating block
+    period_ms = jitter_ms = None
+    if ticks.period is not None:
+        period_ms = ticks.period * 1000.0 / sample_rate
+        jitter_ms = ticks.jitter * 1000.0 / sample_rate
+
+    # Last: trimming slices the shared analysis down to the trimmed range
+    trimmed, _ = trim_silence(
+        audio_data, sample_rate, trim_threshold_db, min_silence_ms,
+        collapse_silence=collapse_silence, silence_residual_ms=silence_residual_ms, analysis=analysis
+    )
+    context = seam_context_frames(sample_rate, len(trimmed))
+    seam_db = score_loop_seam(trimmed[len(trimmed) - context:], trimmed[:context], sample_rate) if context > 1 else None
+
+    return AudioAnalysis(
+        sample_rate=sample_rate,
+        channels=num_channels,
+        duration_sec=num_samples / sample_rate,
+        trimmed_duration_sec=len(trimmed) / sample_rate,
+        loudness_lufs=loudness if loudness is not None and math.isfinite(loudness) else None,
+        sample_peak_dbfs=_linear_to_db(sample_peak),
+        true_peak_dbtp=_linear_to_db(true_peak),
+        character=character.label,
+        character_confidence=character.confidence,
+        crest_factor=character.crest_factor,
+        tick_count=len(ticks.positions) if ticks.period is not None else None,
+        tick_period_ms=period_ms,
+        tick_jitter_ms=jitter_ms,
+        seam_db=seam_db
+    )
 
-        print(f"    Warning: LUFS measurement failed ({str(e)}), using peak normalization")
-        peak = np.max(np.abs(audio_data))
-        if peak > 0:
-            target_linear = 10 ** (target_lufs / 20.0)
-            gain = target_linear / peak
-            normalized = audio_data * gain
-        else:
-            normalized = audio_data
+def analyze_audio_file(
+    input_path: Path,
+    precision: str = DEFAULT_PRECISION,
+    **analysis_kwargs
+) -> AudioAnalysis:
+    """
+    Decode a file and analyze it (see analyze_audio); nothing is written.
 
-    max_peak_linear = 10 ** (max_peak_dbfs / 20.0)
-    peak_value = np.max(np.abs(normalized))
+    Args:
+        input_path: Audio file to analyze
+        precision: 'float64' or 'float32' sample type to decode into
+        **analysis_kwargs: Trim settings forwarded to analyze_audio
 
-    if peak_value > max_peak_linear:
+    Returns:
+        AudioAnalysis with file set to input_path's name and the time taken
 
-        attenuation_factor = max_peak_linear / peak_value
-        normalized = normalized * attenuation_factor
-        print(f"    Applied True Peak limiting: {peak_value:.4f} -> {max_peak_linear:.4f}")
+    Raises:
+        IOError: If the file cannot be decoded
+    """
+    start = time.perf_counter()
+    audio_data, sample_rate = load_audio_file(Path(input_path), always_2d=True, dtype=precision)
+    result = analyze_audio(audio_data, sample_rate, **analysis_kwargs)
+    result.file = Path(input_path).name
+    result.analysis_seconds = time.perf_counter() - start
+    return result
 
-    if is_mono:
-        normalized = normalized[:, 0]
+@dataclass
+class SeamAlignment:
+    """Seam offset chosen by loop stabilization (see find_seam_alignment)."""
 
-    return normalized
+    offset: int = 0  # Lag in samples of the end window against the start window
+    score: float = 0.0  # Normalized cross-correlation at that lag (-1..1)
+    applied: bool = False  # Whether the loop was circularly shifted by offset
 
-def _detect_audio_character(
-    audio_data: np.ndarray,
-    sample_rate: int
-) -> str:
+def find_seam_alignment(end_window: np.ndarray, start_window: np.ndarray, max_lag: int) -> SeamAlignment:
     """
-    Detect if audio is transient-heavy (like clock ticks) or sustained/ambient.
-    
-    Uses spectral analysis and transient detection to determine audio character.
-    
+    Find the lag that best lines the end of a loop up with its start.
+
+    Computes the normalized cross-correlation of the two windows for every lag in
+    [-max_lag, max_lag] with one FFT convolution, so windows spanning whole tick
+    periods or seconds of ambience cost O(n log n). Channels are treated as one vector
+    signal: their correlations and energies are summed before normalizing, and each
+    lag is normalized by the energy of the overlapping parts only.
+
     Args:
-        audio_data: Audio signal as numpy array (samples x channels or samples)
-        sample_rate: Sample rate in Hz
-        
+        end_window: Last samples of the loop (samples x channels)
+        start_window: First samples of the loop, same shape as end_window
+        max_lag: Largest lag to consider in samples
+
     Returns:
-        'transient' for transient-heavy material, 'sustained' for ambience/sustained textures
+        SeamAlignment with the best lag and its score (lag 0, score 0 for silent windows)
     """
-    if len(audio_data.shape) == 1:
-        mono = audio_data
-    else:
-        mono = np.mean(audio_data, axis=1)
-    
-    # Calculate RMS energy and peak statistics
-    window_samples = int(sample_rate * 0.01)  # 10ms windows
-    num_windows = len(mono) // window_samples
-    if num_windows < 10:
-        return 'sustained'  # Default for very short audio
-    
-    rms_values = []
-    peak_values = []
-    
-    for i in range(num_windows):
-        window = mono[i * window_samples:(i + 1) * window_samples]
-        rms = calculate_rms_energy(window)
-        peak = np.max(np.abs(window))
-        rms_values.append(rms)
-        peak_values.append(peak)
-    
-    rms_values = np.array(rms_values)
-    peak_values = np.array(peak_values)
-    
-    # Calculate peak-to-RMS ratio (crest factor)
-    avg_rms = np.mean(rms_values)
-    avg_peak = np.mean(peak_values)
-    
-    if avg_rms > 0:
-        crest_factor = avg_peak / (avg_rms + 1e-10)
-    else:
-        crest_factor = 0
-    
-    # High crest factor = transient-heavy (clicks, ticks, drums)
-    # Low crest factor = sustained (ambient, pads, textures)
-    return 'transient' if crest_factor > 5.0 else 'sustained'
+    window_samples = len(start_window)
+    max_lag = min(max_lag, window_samples - 1)
+    if window_samples == 0 or max_lag < 0:
+        return SeamAlignment()
+
+    # correlation[lag + n - 1] = sum(end[i + lag] * start[i]), as np.correlate(end, start, 'full')
+    correlation = signal.fftconvolve(end_window, start_window[::-1], mode='full', axes=0).sum(axis=1)
+
+    lags = np.arange(-max_lag, max_lag + 1)
+    end_energy = np.concatenate(([0.0], np.cumsum(np.sum(end_window ** 2, axis=1))))
+    start_energy = np.concatenate(([0.0], np.cumsum(np.sum(start_window ** 2, axis=1))))
+    positive = np.maximum(lags, 0)
+    negative = np.maximum(-lags, 0)
+    # Overlap at lag k: end[k:] with start[:n-k] (k >= 0), end[:n+k] with start[-k:] (k < 0)
+    overlap_end = end_energy[window_samples - negative] - end_energy[positive]
+    overlap_start = start_energy[window_samples - positive] - start_energy[negative]
+    norm = np.sqrt(np.maximum(overlap_end * overlap_start, 0.0))
+    if not np.any(norm > 0):
+        return SeamAlignment()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.where(norm > 0, correlation[lags + window_samples - 1] / norm, -np.inf)
+    best = int(np.argmax(scores))
+    return SeamAlignment(int(lags[best]), float(scores[best]))
 
 def stabilize_loop(
     audio_data: np.ndarray,
     sample_rate: int,
     target_duration_sec: Optional[float] = None,
-    comparison_window_ms: float = 50.0
-) -> np.ndarray:
+    comparison_window_ms: float = DEFAULT_LOOP_COMPARISON_WINDOW_MS,
+    max_shift_ms: float = DEFAULT_LOOP_MAX_SHIFT_MS,
+    min_correlation: float = DEFAULT_LOOP_MIN_CORRELATION,
+    analysis: Optional[AnalysisContext] = None,
+    return_alignment: bool = False
+) -> 'np.ndarray | Tuple[np.ndarray, SeamAlignment]':
     """
     Universal loop stabilization stage for perfectly seamless loops.
     
     This is the final stage of processing that ensures any audio will loop seamlessly:
     1. Forces exact target duration (padding or trimming)
-    2. Detects timing offsets by comparing start/end windows
+    2. Detects timing offsets by comparing start/end windows (see find_seam_alignment)
     3. Applies minimal circular shift if needed for alignment
     4. Applies adaptive micro-crossfade (short for transients, longer for ambience)
     
@@ -869,10 +1997,18 @@ def stabilize_loop(
         audio_data: Audio signal as numpy array (samples x channels or samples)
         sample_rate: Sample rate in Hz
         target_duration_sec: Target duration in seconds (None = use current length)
-        comparison_window_ms: Window size in ms for comparing start/end (default: 50ms)
+        comparison_window_ms: Window size in ms for comparing start/end (default: 50ms),
+                              capped at a quarter of the signal
+        max_shift_ms: Largest circular shift searched for (default: 10ms), capped at a
+                      quarter of the comparison window
+        min_correlation: Normalized correlation the best lag must reach to be applied
+                         (default: 0.5); below it the windows do not really match
+        analysis: Shared analysis of audio_data; its audio character is reused while the
+                  signal is unchanged, and it is updated to describe the returned signal
+        return_alignment: If True, also return the SeamAlignment that was found
         
     Returns:
-        Loop-stabilized audio signal
+        Loop-stabilized audio signal, or (signal, SeamAlignment) if return_alignment is True
     """
     if len(audio_data.shape) == 1:
         audio_data = audio_data[:, np.newaxis]
@@ -881,6 +2017,8 @@ def stabilize_loop(
         is_mono = False
     
     num_samples, num_channels = audio_data.shape
+    # The shared analysis stays valid until the signal is padded, trimmed or shifted
+    unchanged = True
     
     # Step 1: Force exact target duration
     if target_duration_sec is not None and target_duration_sec > 0:
@@ -908,9 +2046,11 @@ def stabilize_loop(
                     num_repeats = (padding_samples + segment_length - 1) // segment_length
                     background_sample = np.tile(segment, (num_repeats, 1))[:padding_samples]
                 audio_data = np.vstack([audio_data, background_sample])
+                unchanged = False
             else:
                 # Trim from the end
                 audio_data = audio_data[:target_samples]
+                unchanged = False
             num_samples = target_samples
     
     # Step 2: Compare start and end windows to detect timing offset
@@ -919,34 +2059,39 @@ def stabilize_loop(
     
     if num_samples < comparison_samples * 2:
         # Audio too short, skip stabilization
-        return audio_data[:, 0] if is_mono else audio_data
-    
-    # Extract windows for comparison
-    start_window = audio_data[:comparison_samples]
-    end_window = audio_data[-comparison_samples:]
-    
-    # Convert to mono for comparison
-    if num_channels > 1:
-        start_mono = np.mean(start_window, axis=1)
-        end_mono = np.mean(end_window, axis=1)
-    else:
-        start_mono = start_window[:, 0]
-        end_mono = end_window[:, 0]
+        if analysis is not None and not unchanged:
+            analysis.replace(audio_data)
+        result = audio_data[:, 0] if is_mono else audio_data
+        return (result, SeamAlignment()) if return_alignment else result
     
-    # Cross-correlate to find best alignment
-    correlation = np.correlate(end_mono, start_mono, mode='full')
-    best_offset = np.argmax(correlation) - (len(end_mono) - 1)
+    # Cross-correlate start and end windows (all channels) to find best alignment
+    max_shift = min(comparison_samples // 4, int(sample_rate * max_shift_ms / 1000.0))
+    alignment = find_seam_alignment(audio_data[-comparison_samples:], audio_data[:comparison_samples], max_shift)
     
-    # Only apply shift if there's a significant offset (more than a few samples)
-    max_shift = min(comparison_samples // 4, int(sample_rate * 0.01))  # Max 10ms shift
-    if abs(best_offset) > 3 and abs(best_offset) <= max_shift:
+    # Only apply shift if there's a significant offset (more than a few samples) the windows agree on
+    if abs(alignment.offset) > 3 and alignment.score >= min_correlation:
         # Apply circular shift
-        audio_data = np.roll(audio_data, -best_offset, axis=0)
+        audio_data = np.roll(audio_data, -alignment.offset, axis=0)
+        alignment.applied = True
+        unchanged = False
+    print(
+        f"    Seam alignment: offset {alignment.offset} samples, correlation {alignment.score:.3f}"
+        f"{'' if alignment.applied else ' (not shifted)'}"
+    )
     
     # Step 3: Detect audio character and apply adaptive micro-crossfade
-    audio_character = _detect_audio_character(audio_data, sample_rate)
+    if analysis is not None and unchanged:
+        character = analysis.character_features()
+    else:
+        character = analyze_audio_character(audio_data, sample_rate)
+    print(
+        f"    Audio character: {character.label} (confidence {character.confidence:.2f}; crest "
+        f"{character.crest_factor:.1f}, flatness {character.spectral_flatness:.2f}, "
+        f"{character.onset_density:.1f} onsets/s, floor variation {character.noise_floor_variation_db:.1f} dB, "
+        f"{character.energy_concentration:.0%} of energy in the loudest windows)"
+    )
     
-    if audio_character == 'transient':
+    if character.label == 'transient':
         # Short crossfade for transient-heavy material (preserve transients)
         xfade_ms = 10.0  # Very short, just enough to eliminate clicks
     else:
@@ -974,22 +2119,270 @@ def stabilize_loop(
         audio_data[:actual_xfade] = crossfaded
         audio_data[-actual_xfade:] = crossfaded
     
+    if analysis is not None:
+        analysis.replace(audio_data)
+
     if is_mono:
-        return audio_data[:, 0]
-    return audio_data
+        audio_data = audio_data[:, 0]
+    return (audio_data, alignment) if return_alignment else audio_data
+
+def resample_audio(
+    audio_data: np.ndarray,
+    sample_rate: int,
+    target_rate: int,
+    periodic: bool = False
+) -> np.ndarray:
+    """
+    Convert audio to another sample rate with scipy's polyphase FIR resampler.
+
+    With periodic=True the signal is treated as one period of a loop and padded with
+    its own wrapped-around ends before filtering, so the converted loop stays seamless
+    instead of ringing into silence at both boundaries.
+
+    Args:
+        audio_data: Audio signal as numpy array (samples x channels or samples)
+        sample_rate: Sample rate of audio_data in Hz
+        target_rate: Output sample rate in Hz
+        periodic: If True, filter across the loop seam
+
+    Returns:
+        Resampled audio in the input's precision
+    """
+    if target_rate == sample_rate or len(audio_data) == 0:
+        return audio_data
+    divisor = math.gcd(int(target_rate), int(sample_rate))
+    up, down = int(target_rate) // divisor, int(sample_rate) // divisor
+    if not periodic:
+        return signal.resample_poly(audio_data, up, down, axis=0).astype(audio_data.dtype, copy=False)
+
+    # resample_poly's default filter spans 10 * max(up, down) taps either side at the
+    # upsampled rate; pad by a whole number of `down` input samples covering that, so
+    # the padding maps to a whole number of output samples and can be cut off exactly
+    num_samples = len(audio_data)
+    half_taps = 10 * max(up, down) / up + 1
+    pad = down * int(math.ceil(half_taps / down))
+    padded = audio_data[np.arange(-pad, num_samples + pad) % num_samples]
+    resampled = signal.resample_poly(padded, up, down, axis=0)
+    offset = pad * up // down
+    output_samples = int(round(num_samples * up / down))
+    return resampled[offset:offset + output_samples].astype(audio_data.dtype, copy=False)
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+class PcmWavFile:
+    """
+    Zero-copy reader for plain PCM / IEEE-float RIFF WAV files.
+
+    The sample data is exposed as np.memmap views over the file, and frames are
+    converted to float only when read, one block at a time, scaled exactly as
+    libsndfile does. Each read maps only the frames it needs, so pages touched by a
+    sequential scan are released again instead of accumulating in the process's RSS.
+    Implements the subset of soundfile.SoundFile used by this script (samplerate,
+    channels, frames, seek, read, blocks, close), so analysis passes such as
+    trim-boundary detection can scan huge files without decoding them into RAM.
+
+    Use open_pcm_wav() to construct one; it returns None for anything else.
+    """
+
+    def __init__(self, file_path: Path, samplerate: int, channels: int, bits: int, is_float: bool,
+                 data_offset: int, frames: int):
+        self.name = str(file_path)
+        self.samplerate = samplerate
+        self.channels = channels
+        self.frames = frames
+        self.bits = bits
+        self.is_float = is_float
+        self._file_path = file_path
+        self._data_offset = data_offset
+        self._position = 0
+
+    @property
+    def raw(self) -> np.ndarray:
+        """Memory-mapped view of every frame in the file's storage format (samples x channels)."""
+        return self.view(0, self.frames)
+
+    def view(self, start: int, stop: int) -> np.ndarray:
+        """
+        Memory-map frames [start, stop) without converting them.
+
+        24-bit data is returned as int32 values holding each sample in their top three bytes.
+        """
+        frames = max(0, stop - start)
+        if frames == 0:
+            return np.zeros((0, self.channels), dtype=np.int32)
+        frame_bytes = self.channels * self.bits // 8
+        offset = self._data_offset + start * frame_bytes
+        if self.bits == 24:
+            # Overlapping little-endian int32 view starting one byte early: each element holds
+            # a 3-byte sample in its top bytes (the low byte belongs to the previous sample)
+            data = np.memmap(self._file_path, dtype=np.uint8, mode='r', offset=offset - 1,
+                             shape=(frames * frame_bytes + 1,))
+            return np.ndarray(shape=(frames, self.channels), dtype='<i4', buffer=data,
+                              strides=(frame_bytes, 3))
+        if self.is_float:
+            dtype = '<f4' if self.bits == 32 else '<f8'
+        else:
+            dtype = {8: 'u1', 16: '<i2', 32: '<i4'}[self.bits]
+        return np.memmap(self._file_path, dtype=dtype, mode='r', offset=offset, shape=(frames, self.channels))
+
+    def __enter__(self) -> 'PcmWavFile':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Nothing to release: each read maps and unmaps its own frames."""
+        self._position = self.frames
+
+    def seek(self, frame: int) -> int:
+        """Move the read position to the given frame."""
+        self._position = min(max(0, int(frame)), self.frames)
+        return self._position
+
+    def tell(self) -> int:
+        """Current read position in frames."""
+        return self._position
+
+    def read(self, frames: int = -1, dtype: str = 'float64', always_2d: bool = False) -> np.ndarray:
+        """
+        Convert and return the next frames from the current position.
+
+        Args:
+            frames: Number of frames to read (-1 = to the end of the file)
+            dtype: 'float64' or 'float32'
+            always_2d: If True, mono data is returned as (frames x 1) instead of 1-D
+
+        Returns:
+            Audio block scaled to [-1.0, 1.0)
+        """
+        stop = self.frames if frames < 0 else min(self.frames, self._position + int(frames))
+        data = self._convert(self.view(self._position, stop), np.dtype(dtype))
+        self._position = stop
+        if not always_2d and self.channels == 1:
+            return data[:, 0]
+        return data
+
+    def blocks(self, blocksize: int, dtype: str = 'float64', always_2d: bool = False):
+        """Yield consecutive converted blocks from the current position to the end of the file."""
+        while self._position < self.frames:
+            yield self.read(blocksize, dtype=dtype, always_2d=always_2d)
+
+    def _convert(self, raw: np.ndarray, dtype: np.dtype) -> np.ndarray:
+        """Convert a raw sample block to float32/float64 with libsndfile's scaling."""
+        if self.is_float:
+            return raw.astype(dtype)
+        if self.bits == 24:
+            data = (raw >> 8).astype(dtype)
+            data *= 1.0 / 8388608.0
+        elif self.bits == 8:
+            data = raw.astype(dtype)
+            data -= 128.0
+            data *= 1.0 / 128.0
+        else:
+            data = raw.astype(dtype)
+            data *= 1.0 / float(2 ** (self.bits - 1))
+        return data
+
+def open_pcm_wav(file_path: Path) -> Optional[PcmWavFile]:
+    """
+    Parse a RIFF/WAVE header and return a memory-mapped reader for its sample data.
+
+    Args:
+        file_path: Path to audio file
+
+    Returns:
+        PcmWavFile for 8/16/24/32-bit integer PCM or 32/64-bit float WAV (including
+        WAVE_FORMAT_EXTENSIBLE), or None if the file is anything else
+    """
+    try:
+        file_size = os.path.getsize(file_path)
+        with open(file_path, 'rb') as f:
+            header = f.read(12)
+            if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+                return None
+            fmt = None
+            offset = 12
+            while offset + 8 <= file_size:
+                f.seek(offset)
+                chunk_id, chunk_size = struct.unpack('<4sI', f.read(8))
+                if chunk_id == b'fmt ':
+                    fmt = f.read(min(chunk_size, 40))
+                elif chunk_id == b'data':
+                    break
+                offset += 8 + chunk_size + (chunk_size & 1)
+            else:
+                return None
+    except (OSError, struct.error):
+        return None
+
+    if fmt is None or len(fmt) < 16:
+        return None
+    format_tag, channels, samplerate, _, block_align, bits = struct.unpack('<HHIIHH', fmt[:16])
+    if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+        format_tag = struct.unpack('<H', fmt[24:26])[0]
+    is_float = format_tag == WAVE_FORMAT_IEEE_FLOAT
+    if not (
+        (format_tag == WAVE_FORMAT_PCM and bits in (8, 16, 24, 32))
+        or (is_float and bits in (32, 64))
+    ):
+        return None
+    if channels < 1 or samplerate < 1 or block_align != channels * bits // 8:
+        return None
+
+    data_offset = offset + 8
+    # Streaming writers may leave the data size unset; the file size bounds it either way
+    data_size = min(chunk_size, file_size - data_offset)
+    try:
+        return PcmWavFile(file_path, samplerate, channels, bits, is_float, data_offset, data_size // block_align)
+    except (OSError, ValueError):
+        return None
+
+def open_audio_source(file_path: Path):
+    """
+    Open an audio file for block-wise reading.
+
+    Plain PCM WAV files get the zero-copy PcmWavFile reader; everything else is decoded
+    through libsndfile. Both support seek/read/blocks and the context-manager protocol.
+
+    Args:
+        file_path: Path to audio file
 
-def load_audio_file(file_path: Path) -> Tuple[np.ndarray, int]:
+    Returns:
+        PcmWavFile or soundfile.SoundFile
+    """
+    reader = open_pcm_wav(file_path)
+    if reader is not None:
+        return reader
+    return sf.SoundFile(str(file_path))
+
+def load_audio_file(
+    file_path: Path,
+    always_2d: bool = False,
+    dtype: str = DEFAULT_PRECISION
+) -> Tuple[np.ndarray, int]:
     """
     Load audio file using soundfile.
 
+    Plain PCM WAV files are converted straight from a memory map of the sample data,
+    skipping libsndfile's decode copy; the result is identical.
+
     Args:
         file_path: Path to audio file
+        always_2d: If True, mono files are returned as (samples x 1) instead of 1-D
+        dtype: 'float64' or 'float32', decoded directly (never via the other type)
 
     Returns:
         Tuple of (audio_data, sample_rate)
     """
     try:
-        data, samplerate = sf.read(str(file_path), always_2d=False)
+        reader = open_pcm_wav(file_path)
+        if reader is not None:
+            with reader:
+                return reader.read(dtype=dtype, always_2d=always_2d), reader.samplerate
+        data, samplerate = sf.read(str(file_path), dtype=dtype, always_2d=always_2d)
         return data, samplerate
     except Exception as e:
         raise IOError(f"Failed to load audio file: {str(e)}")
@@ -997,22 +2390,31 @@ def load_audio_file(file_path: Path) -> Tuple[np.ndarray, int]:
 def save_audio_file(
     audio_data: np.ndarray,
     sample_rate: int,
-    output_path: Path,
+    output_path: Path | BinaryIO,
     format: str = 'WAV',
-    subtype: str = 'PCM_24'
+    subtype: str = 'PCM_24',
+    compression_level: Optional[float] = None
 ) -> None:
     """
     Save audio file using soundfile.
 
+    float32 and float64 buffers are written in their own precision, so FLOAT and DOUBLE
+    targets keep what --precision computed. Samples outside [-1.0, 1.0] are clipped
+    (on a copy, leaving the caller's buffer alone); the buffer is not copied otherwise.
+
     Args:
-        audio_data: Audio signal as numpy array
+        audio_data: Audio signal as numpy array (integer PCM is scaled, see _as_float_audio)
         sample_rate: Sample rate in Hz
-        output_path: Path to save file
+        output_path: Path to save file, or a writable binary file object (e.g. io.BytesIO)
         format: File format (default: 'WAV')
         subtype: Subtype/bit depth (default: 'PCM_24' for 24-bit)
+        compression_level: libsndfile compression level from 0 to 1 for FLAC, Vorbis and
+                           Opus (0 = fastest FLAC / best Vorbis and Opus quality; None = library default)
     """
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(output_path, Path):
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path = str(output_path)
 
     if len(audio_data.shape) == 1:
 
@@ -1021,167 +2423,3133 @@ def save_audio_file(
 
         audio_data = audio_data[:, 0]
 
-    if audio_data.dtype != np.float32:
-        audio_data = audio_data.astype(np.float32)
-
-    audio_data = np.clip(audio_data, -1.0, 1.0)
+    audio_data = _as_float_audio(audio_data)
+    if audio_data.size and (audio_data.max() > 1.0 or audio_data.min() < -1.0):
+        audio_data = np.clip(audio_data, -1.0, 1.0, out=audio_data.copy())
 
     try:
-        sf.write(str(output_path), audio_data, sample_rate, format=format, subtype=subtype)
+        with sf.SoundFile(output_path, 'w', samplerate=sample_rate,
+                          channels=1 if audio_data.ndim == 1 else audio_data.shape[1],
+                          format=format, subtype=subtype, compression_level=compression_level) as output:
+            write_frames(output, audio_data)
     except Exception as e:
         raise IOError(f"Failed to save audio file: {str(e)}")
 
-def get_audio_files(folder_path: Path) -> List[Path]:
+def write_frames(output: sf.SoundFile, audio_data: np.ndarray) -> None:
     """
-    Get all audio files from a folder.
+    Write audio to an open file in blocks of ENCODE_BLOCK_FRAMES frames.
+    """
+    for start in range(0, len(audio_data), ENCODE_BLOCK_FRAMES):
+        output.write(audio_data[start:start + ENCODE_BLOCK_FRAMES])
 
-    Supports formats readable by soundfile/libsndfile:
-    WAV, FLAC, OGG, MP3 (if libsndfile supports it)
+def score_loop_seam(tail: np.ndarray, head: np.ndarray, sample_rate: int,
+                    window_ms: float = DEFAULT_SEAM_WINDOW_MS) -> float:
+    """
+    Score how much the wrap-around of a loop stands out from the audio around it.
+
+    The energy of the first difference (a simple high-pass that makes clicks and steps
+    stand out) in the window straddling the point where the end wraps to the start is
+    compared with the median of the same measure over the neighbouring windows.
 
     Args:
-        folder_path: Path to folder containing audio files
+        tail: Last samples of the loop (samples x channels)
+        head: First samples of the loop (samples x channels)
+        sample_rate: Sample rate in Hz
+        window_ms: Window length in milliseconds
 
     Returns:
-        List of Path objects for audio files found
+        Seam energy relative to its surroundings in dB (around 0 dB for a seam that
+        sounds like the rest of the loop; clicks score well above)
     """
+    window = max(2, int(sample_rate * window_ms / 1000.0))
+    energy = np.sum(np.diff(np.concatenate([tail, head]).astype(np.float64), axis=0) ** 2, axis=1)
+    # energy[len(tail) - 1] is the step from the last sample to the first
+    seam_start = len(tail) - 1 - window // 2
+    if seam_start < 0:
+        return 0.0
+    offset = seam_start % window
+    num_windows = (len(energy) - offset) // window
+    if num_windows < 3:
+        return 0.0
+    sums = energy[offset:offset + num_windows * window].reshape(num_windows, window).sum(axis=1)
+    seam_index = seam_start // window
+    seam_energy = sums[seam_index]
+    reference = float(np.median(np.delete(sums, seam_index)))
+    return float(10.0 * np.log10((seam_energy + 1e-20) / (reference + 1e-20)))
 
-    audio_extensions = {'.wav', '.flac', '.ogg', '.mp3', '.aiff', '.aif', '.au', '.snd'}
+def seam_context_frames(sample_rate: int, num_frames: int) -> int:
+    """
+    Frames at each end of a loop that score_loop_seam needs, capped at half the loop.
+    """
+    window = max(2, int(sample_rate * DEFAULT_SEAM_WINDOW_MS / 1000.0))
+    return min((SEAM_CONTEXT_WINDOWS + 1) * window, num_frames // 2)
+
+@dataclass
+class SeamCheck:
+    """Loop seam of an encoded file compared with the buffer it was encoded from (see check_encoded_seam)."""
+
+    frames: int  # Frames the decoder returns
+    expected_frames: int  # Frames that were encoded
+    offset: int  # Lag of the decoded start against the encoded start in samples (encoder priming left in)
+    score_db: float  # score_loop_seam of the decoded file
+    rendered_score_db: float  # score_loop_seam of the buffer before encoding
+    reencoded: bool = False  # Whether the file was re-encoded at best quality after failing
+
+    def passed(self, tolerance_db: float = DEFAULT_SEAM_CHECK_TOLERANCE_DB) -> bool:
+        """Return True if the length is exact, the start is not shifted and the seam got at most tolerance_db worse."""
+        return (self.frames == self.expected_frames and self.offset == 0
+                and self.score_db <= self.rendered_score_db + tolerance_db)
+
+    def describe(self) -> str:
+        """Return a short summary such as 'seam +0.4 dB (+0.2 dB before encoding), length exact'."""
+        if self.frames == self.expected_frames:
+            length = "length exact"
+        else:
+            length = f"{self.frames - self.expected_frames:+d} frames"
+        offset = f", start shifted {self.offset:+d} samples" if self.offset else ""
+        return f"seam {self.score_db:+.1f} dB ({self.rendered_score_db:+.1f} dB before encoding), {length}{offset}"
+
+def check_encoded_seam(
+    path: Path,
+    head: np.ndarray,
+    tail: np.ndarray,
+    expected_frames: int
+) -> SeamCheck:
+    """
+    Decode the ends of a written loop and check that encoding kept the seam intact.
 
-    audio_files = []
+    Only the first and last frames are decoded, so streamed outputs of any length are
+    cheap to check. Lossy codecs add priming samples at the start and padding at the end;
+    a decoder that does not trim them changes the length or shifts the start, and
+    either breaks the loop.
 
-    for file_path in folder_path.rglob('*'):
-        if file_path.is_file() and file_path.suffix.lower() in audio_extensions:
-            audio_files.append(file_path)
+    Args:
+        path: Encoded output file
+        head: First frames of the buffer that was encoded (samples x channels, clipped as written)
+        tail: Last frames of that buffer, same length as head
+        expected_frames: Length of the encoded buffer in frames
 
-    return sorted(audio_files)
+    Returns:
+        SeamCheck with the decoded length, start offset and seam scores
+    """
+    with sf.SoundFile(str(path)) as encoded:
+        frames = encoded.frames
+        sample_rate = encoded.samplerate
+        context = min(len(head), frames // 2)
+        decoded_head = encoded.read(context, dtype='float64', always_2d=True)
+        encoded.seek(frames - context)
+        decoded_tail = encoded.read(context, dtype='float64', always_2d=True)
+    head = head[:context]
+    tail = tail[len(tail) - context:]
+    window = max(2, int(sample_rate * DEFAULT_SEAM_WINDOW_MS / 1000.0))
+    alignment = find_seam_alignment(decoded_head, head, window)
+    # Silence and noise that a lossy codec re-synthesizes correlate too weakly to locate
+    offset = alignment.offset if alignment.score >= DEFAULT_LOOP_MIN_CORRELATION else 0
+    return SeamCheck(
+        frames, expected_frames, offset,
+        score_loop_seam(decoded_tail, decoded_head, sample_rate),
+        score_loop_seam(tail, head, sample_rate)
+    )
 
-def process_audio_file(
-    input_path: Path,
-    output_path: Path,
-    trim_threshold_db: float = -60.0,
-    min_silence_ms: int = 500,
-    xfade_duration_ms: Optional[int] = None,
-    target_lufs: float = -12.0,
-    max_peak_dbfs: float = -1.0,
-    use_peak_normalization: bool = False,
-    enable_noise_reduction: bool = DEFAULT_ENABLE_NOISE_REDUCTION,
-    noise_gate_threshold_db: float = DEFAULT_NOISE_GATE_THRESHOLD_DB,
-    noise_reduction_db: float = DEFAULT_NOISE_REDUCTION_DB,
-    noise_gate_window_ms: float = DEFAULT_NOISE_GATE_WINDOW_MS,
-    noise_gate_attack_ms: float = DEFAULT_NOISE_GATE_ATTACK_MS,
-    noise_gate_release_ms: float = DEFAULT_NOISE_GATE_RELEASE_MS,
-    enforce_seamless_loop: bool = DEFAULT_ENFORCE_SEAMLESS_LOOP,
-    mirror_loop_start: bool = DEFAULT_LOOP_MIRROR_HEAD,
-    enable_loop_stabilization: bool = DEFAULT_LOOP_STABILIZATION,
-    target_duration_sec: Optional[float] = DEFAULT_TARGET_DURATION_SEC
-) -> bool:
+def seam_check_applies(subtype: str, seam_check: str = DEFAULT_SEAM_CHECK) -> bool:
     """
-    Process a single audio file through the complete HQABP pipeline.
+    Return True if the seam_check mode ('off', 'lossy' or 'all') covers files of this subtype.
+    """
+    return seam_check == 'all' or (seam_check == 'lossy' and subtype in LOSSY_SUBTYPES)
 
-    Processing sequence: Load -> Trim -> Noise reduction -> Crossfade (if enabled) -> Normalize -> Loop Stabilization (if enabled) -> Write
+@dataclass
+class OutputTarget:
+    """
+    One rendered variant of a processed file (see process_audio_file's output_targets).
+
+    All targets of a file share decode, trim, noise reduction, crossfade and loop
+    analysis; only the normalization gain, sample-rate conversion and encoding run
+    per target. Config entries are dictionaries of these fields.
+
+    Attributes:
+        suffix: Appended to the input file's stem to name the output
+        format: Container, one of OUTPUT_FORMAT_EXTENSIONS
+        subtype: soundfile subtype (None = PCM_24 where the format supports it,
+                 otherwise the format's default, e.g. VORBIS for OGG)
+        sample_rate: Output sample rate in Hz (None = keep the input's, or 48000 for OPUS,
+                     which only encodes 8, 12, 16, 24 and 48 kHz)
+        target_lufs: Loudness target (peak dBFS with peak normalization) replacing the
+                     normalize stage's target (None = use the stage's)
+        compression_level: libsndfile compression level from 0 to 1 for FLAC, Vorbis and
+                           Opus (None = library default; see save_audio_file)
+    """
 
-    Args:
-        input_path: Path to input audio file
-        output_path: Path to save processed file
-        trim_threshold_db: RMS threshold for silence detection in dBFS
-        min_silence_ms: Minimum silence duration to trim
-        xfade_duration_ms: Crossfade duration in milliseconds (None = disabled)
-        target_lufs: Target loudness in LUFS (used if use_peak_normalization=False)
-        max_peak_dbfs: Maximum allowed peak in dBFS
-        use_peak_normalization: If True, use peak normalization instead of LUFS
-                               (better for clock/timer sounds - preserves transients)
-        enable_noise_reduction: If True, apply soft noise gating/declicking before looping
-        noise_gate_threshold_db: Threshold for the noise gate envelope in dBFS
-        noise_reduction_db: Maximum attenuation applied by the noise gate
-        noise_gate_window_ms: Window size for RMS envelope used by the gate
-        noise_gate_attack_ms: Attack constant for the gate smoothing envelope
-        noise_gate_release_ms: Release constant for the gate smoothing envelope
-        enforce_seamless_loop: Forces crossfade to mirror start/end segments for perfect loops
-        mirror_loop_start: If True, writes the blended seam onto the head of the file
-        enable_loop_stabilization: If True, applies universal loop stabilization at the end (recommended)
-        target_duration_sec: Target duration in seconds for loop stabilization (None = use current length)
+    suffix: str = '_processed'
+    format: str = 'WAV'
+    subtype: Optional[str] = None
+    sample_rate: Optional[int] = None
+    target_lufs: Optional[float] = None
+    compression_level: Optional[float] = None
+
+    def __post_init__(self):
+        self.format = str(self.format).upper()
+        if self.format not in OUTPUT_FORMAT_EXTENSIONS:
+            raise ValueError(
+                f"Unknown output format '{self.format}' (expected one of: {', '.join(OUTPUT_FORMAT_EXTENSIONS)})"
+            )
+        if self.subtype is None:
+            self.subtype = 'PCM_24' if sf.check_format(self.format, 'PCM_24') else sf.default_subtype(self.format)
+        elif not sf.check_format(self.format, self.subtype):
+            raise ValueError(
+                f"Subtype '{self.subtype}' is not supported by {self.format} "
+                f"(available: {', '.join(sf.available_subtypes(self.format))})"
+            )
+        if self.sample_rate is not None and int(self.sample_rate) <= 0:
+            raise ValueError(f"Output sample rate must be positive (got {self.sample_rate})")
+        if self.subtype == 'OPUS' and self.sample_rate is None:
+            self.sample_rate = 48000
+        if self.subtype == 'OPUS' and self.sample_rate not in (8000, 12000, 16000, 24000, 48000):
+            raise ValueError(f"Opus only encodes 8, 12, 16, 24 or 48 kHz (got {self.sample_rate})")
+        if self.compression_level is not None and not 0.0 <= float(self.compression_level) <= 1.0:
+            raise ValueError(f"Compression level must be between 0 and 1 (got {self.compression_level})")
+
+    def output_file(self, output_path: Path) -> Path:
+        """Map a mirrored output path to the file this target writes (<stem><suffix>.<ext>)."""
+        return output_path.parent / f"{output_path.stem}{self.suffix}{OUTPUT_FORMAT_EXTENSIONS[self.format]}"
+
+    def describe(self) -> str:
+        """Return a short summary such as 'FLAC PCM_16, 22050 Hz, -14.0 LUFS'."""
+        parts = [f"{self.format} {self.subtype}"]
+        if self.sample_rate is not None:
+            parts.append(f"{self.sample_rate} Hz")
+        if self.target_lufs is not None:
+            parts.append(f"{self.target_lufs} LUFS")
+        if self.compression_level is not None:
+            parts.append(f"compression {self.compression_level:g}")
+        return ", ".join(parts)
+
+def _matches_any(relative_path: str, patterns: Optional[List[str]]) -> bool:
+    """
+    Check a relative POSIX path against glob patterns.
 
-    Returns:
-        True if processing was successful, False otherwise
+    Patterns containing '/' match the whole relative path, others only the name.
     """
-    try:
+    name = relative_path.rsplit('/', 1)[-1]
+    return any(
+        fnmatch.fnmatch(relative_path if '/' in pattern else name, pattern)
+        for pattern in patterns or ()
+    )
 
-        print(f"  Loading: {input_path.name}")
-        audio_data, sample_rate = load_audio_file(input_path)
-        original_shape = audio_data.shape
-        print(f"    Sample rate: {sample_rate} Hz, Shape: {original_shape}, Duration: {len(audio_data)/sample_rate:.2f}s")
+def iter_audio_files(
+    folder_path: Path,
+    include: Optional[List[str]] = DEFAULT_INCLUDE_PATTERNS,
+    exclude: Optional[List[str]] = DEFAULT_EXCLUDE_PATTERNS,
+    max_depth: Optional[int] = DEFAULT_MAX_DEPTH,
+    sort: bool = DEFAULT_SORTED_SCAN,
+    _prefix: str = '',
+    _depth: int = 0
+) -> Iterator[Path]:
+    """
+    Lazily walk a folder with os.scandir, yielding audio files as they are found.
 
-        print(f"    Trimming silence (threshold: {trim_threshold_db} dBFS)...")
-        audio_data, sample_rate = trim_silence(
-            audio_data,
-            sample_rate,
-            trim_threshold_db=trim_threshold_db,
-            min_silence_ms=min_silence_ms
-        )
-        print(f"    Trimmed duration: {len(audio_data)/sample_rate:.2f}s")
-        if enable_noise_reduction:
-            print(f"    Noise reduction (threshold {noise_gate_threshold_db} dBFS, reduction {noise_reduction_db} dB)...")
-            audio_data = apply_noise_reduction(
-                audio_data,
-                sample_rate,
-                threshold_db=noise_gate_threshold_db,
-                reduction_db=noise_reduction_db,
-                window_ms=noise_gate_window_ms,
-                attack_ms=noise_gate_attack_ms,
-                release_ms=noise_gate_release_ms
-            )
-        if xfade_duration_ms is not None and xfade_duration_ms > 0:
-            print(f"    Applying {xfade_duration_ms}ms Equal-Power Cosine Crossfade...")
-            audio_data = apply_crossfade(
-                audio_data,
-                sample_rate,
-                xfade_duration_ms,
-                pre_normalize=False,
-                enforce_seamless_loop=enforce_seamless_loop,
-                mirror_loop_start=mirror_loop_start
+    Directory entries carry their file type, so no stat call is made per entry,
+    excluded directories are never opened and symlinked directories are not followed.
+
+    Args:
+        folder_path: Path to folder containing audio files
+        include: Glob patterns a file must match (None = every audio file)
+        exclude: Glob patterns for files and directories to skip
+        max_depth: Directory levels to descend below folder_path (0 = top level only, None = unlimited)
+        sort: Visit each directory's entries by name, which yields files in the same order
+            as sorting the full list (each directory is then listed before it is walked)
+
+    Yields:
+        Path objects for audio files found
+    """
+    try:
+        with os.scandir(folder_path) as scan:
+            entries = sorted(scan, key=lambda entry: entry.name) if sort else scan
+            for entry in entries:
+                relative_path = _prefix + entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    is_audio = not is_dir and entry.is_file() and os.path.splitext(entry.name)[1].lower() in AUDIO_EXTENSIONS
+                except OSError:
+                    continue
+                if _matches_any(relative_path, exclude):
+                    continue
+                if is_dir:
+                    if max_depth is None or _depth < max_depth:
+                        yield from iter_audio_files(
+                            Path(entry.path), include, exclude, max_depth, sort, relative_path + '/', _depth + 1
+                        )
+                elif is_audio and (not include or _matches_any(relative_path, include)):
+                    yield Path(entry.path)
+    except OSError as e:
+        if _depth == 0:
+            raise
+        print(f"  Warning: cannot scan {folder_path} ({str(e)}), skipping")
+
+def get_audio_files(folder_path: Path) -> List[Path]:
+    """
+    Get all audio files from a folder.
+
+    Supports formats readable by soundfile/libsndfile:
+    WAV, FLAC, OGG, MP3 (if libsndfile supports it)
+
+    Args:
+        folder_path: Path to folder containing audio files
+
+    Returns:
+        Sorted list of Path objects for audio files found
+    """
+    return list(iter_audio_files(folder_path, include=None, exclude=None, max_depth=None, sort=True))
+
+class Stage(Protocol):
+    """
+    A single step of the processing pipeline.
+
+    Stages receive and return audio as a 2-D (samples x channels) array, so buffers
+    pass between stages without reshaping. A stage may change the sample rate.
+    Stages that set `uses_analysis = True` are passed the file's shared AnalysisContext
+    and must leave it describing the buffer they return. Other stages are called
+    without it, and the pipeline resets the context after them.
+
+    A stage may set `gain_linear = True` when scaling its input by a constant scales
+    its output by the same constant; Pipeline.render_targets then applies each output
+    target's normalization gain after it instead of running it once per target.
+
+    A stage may list in `requires` the lazily imported libraries (LAZY_MODULES keys)
+    its process() uses, so a run imports only what its stages need (see
+    Pipeline.required_modules). Stages without it are assumed to need all of them.
+    """
+
+    name: str
+
+    def describe(self) -> str:
+        """Return the one-line progress message printed before the stage runs."""
+        ...
+
+    def process(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int,
+        analysis: Optional[AnalysisContext] = None
+    ) -> Tuple[np.ndarray, int]:
+        """Process a (samples x channels) buffer and return (audio_data, sample_rate)."""
+        ...
+
+@dataclass
+class TrimStage:
+    """Leading/trailing silence trimming (see trim_silence)."""
+
+    trim_threshold_db: float = DEFAULT_TRIM_THRESHOLD_DB
+    min_silence_ms: int = DEFAULT_MIN_SILENCE_MS
+    enable_silence_collapse: bool = DEFAULT_ENABLE_SILENCE_COLLAPSE
+    silence_residual_ms: float = DEFAULT_SILENCE_RESIDUAL_MS
+    name: ClassVar[str] = 'trim'
+    gain_linear: ClassVar[bool] = False
+    uses_analysis: ClassVar[bool] = True
+    requires: ClassVar[Tuple[str, ...]] = ()
+
+    def describe(self) -> str:
+        if self.enable_silence_collapse:
+            return (
+                f"Trimming silence (threshold: {self.trim_threshold_db} dBFS, interior gaps >= "
+                f"{self.min_silence_ms} ms collapsed to {self.silence_residual_ms:g} ms)..."
             )
-        if use_peak_normalization:
-            target_peak_db = target_lufs
-            print(f"    Normalizing to {target_peak_db} dBFS peak (preserves transients)...")
-            audio_data = normalize_peak(
+        return f"Trimming silence (threshold: {self.trim_threshold_db} dBFS)..."
+
+    def process(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int,
+        analysis: Optional[AnalysisContext] = None
+    ) -> Tuple[np.ndarray, int]:
+        audio_data, sample_rate = trim_silence(
+            audio_data,
+            sample_rate,
+            trim_threshold_db=self.trim_threshold_db,
+            min_silence_ms=self.min_silence_ms,
+            collapse_silence=self.enable_silence_collapse,
+            silence_residual_ms=self.silence_residual_ms,
+            analysis=analysis
+        )
+        print(f"    Trimmed duration: {len(audio_data)/sample_rate:.2f}s")
+        return audio_data, sample_rate
+
+@dataclass
+class NoiseReductionStage:
+    """DC/high-pass filter and soft noise gate (see apply_noise_reduction)."""
+
+    threshold_db: float = DEFAULT_NOISE_GATE_THRESHOLD_DB
+    reduction_db: float = DEFAULT_NOISE_REDUCTION_DB
+    window_ms: float = DEFAULT_NOISE_GATE_WINDOW_MS
+    attack_ms: float = DEFAULT_NOISE_GATE_ATTACK_MS
+    release_ms: float = DEFAULT_NOISE_GATE_RELEASE_MS
+    name: ClassVar[str] = 'noise_reduction'
+    gain_linear: ClassVar[bool] = False
+    uses_analysis: ClassVar[bool] = True
+    requires: ClassVar[Tuple[str, ...]] = ('scipy.signal',)
+
+    def describe(self) -> str:
+        return f"Noise reduction (threshold {self.threshold_db} dBFS, reduction {self.reduction_db} dB)..."
+
+    def process(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int,
+        analysis: Optional[AnalysisContext] = None
+    ) -> Tuple[np.ndarray, int]:
+        return apply_noise_reduction(
+            audio_data,
+            sample_rate,
+            threshold_db=self.threshold_db,
+            reduction_db=self.reduction_db,
+            window_ms=self.window_ms,
+            attack_ms=self.attack_ms,
+            release_ms=self.release_ms,
+            analysis=analysis
+        ), sample_rate
+
+@dataclass
+class CrossfadeStage:
+    """Equal-Power Cosine Crossfade at the loop boundary (see apply_crossfade)."""
+
+    xfade_duration_ms: int = DEFAULT_XFADE_DURATION_MS
+    pre_normalize: bool = False
+    enforce_seamless_loop: bool = DEFAULT_ENFORCE_SEAMLESS_LOOP
+    mirror_loop_start: bool = DEFAULT_LOOP_MIRROR_HEAD
+    name: ClassVar[str] = 'crossfade'
+    gain_linear: ClassVar[bool] = True
+    uses_analysis: ClassVar[bool] = True
+
+    @property
+    def requires(self) -> Tuple[str, ...]:
+        # Tick detection for the loop gap uses scipy's peak finder
+        return ('scipy.signal',) if self.enforce_seamless_loop else ()
+
+    def describe(self) -> str:
+        return f"Applying {self.xfade_duration_ms}ms Equal-Power Cosine Crossfade..."
+
+    def process(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int,
+        analysis: Optional[AnalysisContext] = None
+    ) -> Tuple[np.ndarray, int]:
+        return apply_crossfade(
+            audio_data,
+            sample_rate,
+            self.xfade_duration_ms,
+            pre_normalize=self.pre_normalize,
+            enforce_seamless_loop=self.enforce_seamless_loop,
+            mirror_loop_start=self.mirror_loop_start,
+            analysis=analysis
+        ), sample_rate
+
+@dataclass
+class NormalizeStage:
+    """Loudness (LUFS) or peak normalization (see normalize_lufs / normalize_peak)."""
+
+    mode: str = 'peak' if DEFAULT_USE_PEAK_NORMALIZATION else 'lufs'
+    target: float = DEFAULT_TARGET_LUFS
+    max_peak_dbfs: float = DEFAULT_MAX_PEAK_DBFS
+    name: ClassVar[str] = 'normalize'
+    gain_linear: ClassVar[bool] = False
+    uses_analysis: ClassVar[bool] = True
+
+    def __post_init__(self):
+        if self.mode not in ('lufs', 'peak'):
+            raise ValueError(f"Unknown normalization mode '{self.mode}' (expected 'lufs' or 'peak')")
+
+    @property
+    def requires(self) -> Tuple[str, ...]:
+        return () if self.mode == 'peak' else ('pyloudnorm',)
+
+    def describe(self) -> str:
+        if self.mode == 'peak':
+            return f"Normalizing to {self.target} dBFS peak (preserves transients)..."
+        return f"Normalizing to {self.target} LUFS (ITU-R BS.1770)..."
+
+    def process(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int,
+        analysis: Optional[AnalysisContext] = None
+    ) -> Tuple[np.ndarray, int]:
+        if self.mode == 'peak':
+            return normalize_peak(
                 audio_data,
                 sample_rate,
-                target_dbfs=target_peak_db,
-                max_peak_dbfs=max_peak_dbfs
+                target_dbfs=self.target,
+                max_peak_dbfs=self.max_peak_dbfs,
+                analysis=analysis
+            ), sample_rate
+        return normalize_lufs(
+            audio_data,
+            sample_rate,
+            target_lufs=self.target,
+            max_peak_dbfs=self.max_peak_dbfs,
+            analysis=analysis
+        ), sample_rate
+
+    def measure(self, audio_data: np.ndarray, sample_rate: int) -> LevelMeasurement:
+        """Measure the level process() normalizes (see measure_level)."""
+        return measure_level(audio_data, sample_rate, use_lufs=self.mode == 'lufs')
+
+    def gain(self, level: LevelMeasurement, target: Optional[float] = None) -> float:
+        """Gain process() applies to a signal of this level, for its own or another target."""
+        return normalization_gain(
+            level,
+            self.target if target is None else target,
+            self.max_peak_dbfs,
+            use_lufs=self.mode == 'lufs'
+        )
+
+@dataclass
+class StabilizeStage:
+    """Universal loop stabilization (see stabilize_loop)."""
+
+    target_duration_sec: Optional[float] = DEFAULT_TARGET_DURATION_SEC
+    comparison_window_ms: float = DEFAULT_LOOP_COMPARISON_WINDOW_MS
+    max_shift_ms: float = DEFAULT_LOOP_MAX_SHIFT_MS
+    min_correlation: float = DEFAULT_LOOP_MIN_CORRELATION
+    name: ClassVar[str] = 'stabilize'
+    gain_linear: ClassVar[bool] = True
+    uses_analysis: ClassVar[bool] = True
+    requires: ClassVar[Tuple[str, ...]] = ('scipy.signal',)
+
+    def describe(self) -> str:
+        return f"Applying loop stabilization (target duration: {self.target_duration_sec or 'auto'}s)..."
+
+    def process(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int,
+        analysis: Optional[AnalysisContext] = None
+    ) -> Tuple[np.ndarray, int]:
+        return stabilize_loop(
+            audio_data,
+            sample_rate,
+            target_duration_sec=self.target_duration_sec,
+            comparison_window_ms=self.comparison_window_ms,
+            max_shift_ms=self.max_shift_ms,
+            min_correlation=self.min_correlation,
+            analysis=analysis
+        ), sample_rate
+
+STAGE_TYPES: Dict[str, type] = {
+    stage_type.name: stage_type
+    for stage_type in (TrimStage, NoiseReductionStage, CrossfadeStage, NormalizeStage, StabilizeStage)
+}
+
+@dataclass
+class StageTiming:
+    """Wall-clock and CPU time spent in one stage, plus memory high-water marks."""
+
+    name: str
+    seconds: float
+    cpu_seconds: float = 0.0
+    peak_rss_mb: Optional[float] = None
+    peak_traced_mb: Optional[float] = None
+
+def _peak_rss_mb() -> Optional[float]:
+    """
+    Return this process's peak resident set size in MB (None where unsupported).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / (1024.0 * 1024.0) if sys.platform == 'darwin' else peak / 1024.0
+
+class StageProfiler:
+    """
+    Records wall time, CPU time and memory high-water marks for named stages.
+
+    Peak RSS is the process high-water mark when the stage finishes, so within one
+    process it never decreases. With trace_memory, tracemalloc's peak is reset at the
+    start of each stage and reports the most Python/numpy memory allocated inside it.
+
+    Use either the stage() context manager or begin()/end() for code that is not
+    convenient to wrap in a with-block. kernel_cache_stats() reports the KERNEL_CACHE
+    hits and misses since the profiler was created.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.timings: List[StageTiming] = []
+        self.trace_memory = trace_memory
+        self._cache_baseline = KERNEL_CACHE.stats()
+        self._started_tracing = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._current = None
+
+    def begin(self, name: str) -> None:
+        """Start timing a stage, ending the current one first."""
+        self.end()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        self._current = (name, time.perf_counter(), time.process_time())
+
+    def end(self) -> None:
+        """Finish the current stage, if any, and record its timing."""
+        if self._current is None:
+            return
+        name, wall_start, cpu_start = self._current
+        self._current = None
+        peak_traced = tracemalloc.get_traced_memory()[1] / (1024.0 * 1024.0) if self.trace_memory else None
+        self.timings.append(StageTiming(
+            name,
+            time.perf_counter() - wall_start,
+            time.process_time() - cpu_start,
+            _peak_rss_mb(),
+            peak_traced
+        ))
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Context manager timing the enclosed block as one stage."""
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end()
+
+    def kernel_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """KERNEL_CACHE hits and misses per kernel kind since this profiler was created."""
+        stats = {}
+        for kind, counts in KERNEL_CACHE.stats().items():
+            baseline = self._cache_baseline.get(kind, {'hits': 0, 'misses': 0})
+            delta = {key: counts[key] - baseline[key] for key in ('hits', 'misses')}
+            if delta['hits'] or delta['misses']:
+                stats[kind] = delta
+        return stats
+
+    def close(self) -> None:
+        """End the current stage and stop tracemalloc if this profiler started it."""
+        self.end()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+@dataclass
+class PipelineResult:
+    """Output of Pipeline.run."""
+
+    audio_data: np.ndarray
+    sample_rate: int
+    timings: List[StageTiming] = field(default_factory=list)
+    analysis: Optional[AnalysisContext] = None
+
+class Pipeline:
+    """
+    An ordered list of stages run over one buffer.
+
+    Build one directly from Stage objects, or from a declarative config: a list of
+    dictionaries, each naming a stage type in 'stage' plus that stage's parameters:
+
+        [{"stage": "trim", "trim_threshold_db": -60.0},
+         {"stage": "normalize", "mode": "peak", "target": -3.0}]
+    """
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = list(stages)
+
+    @classmethod
+    def from_config(cls, config: List[dict]) -> 'Pipeline':
+        """
+        Build a pipeline from a declarative config.
+
+        Args:
+            config: List of stage dictionaries ({"stage": <type>, **params})
+
+        Returns:
+            Pipeline with one stage per entry, in order
+
+        Raises:
+            ValueError: If a stage type is unknown or its parameters are invalid
+        """
+        stages = []
+        for index, entry in enumerate(config):
+            params = dict(entry)
+            stage_name = params.pop('stage', None)
+            stage_type = STAGE_TYPES.get(stage_name)
+            if stage_type is None:
+                raise ValueError(
+                    f"Pipeline stage {index}: unknown stage '{stage_name}' "
+                    f"(expected one of: {', '.join(STAGE_TYPES)})"
+                )
+            try:
+                stages.append(stage_type(**params))
+            except TypeError as e:
+                raise ValueError(f"Pipeline stage {index} ('{stage_name}'): {str(e)}")
+        return cls(stages)
+
+    def required_modules(self, targets: Optional[List[OutputTarget]] = None, seam_check: str = 'off') -> List[str]:
+        """
+        List the libraries running this pipeline imports (see Stage.requires).
+
+        Args:
+            targets: Output targets rendered (None = the single default output)
+            seam_check: Seam check mode the outputs are written with
+
+        Returns:
+            LAZY_MODULES keys in import order, always including BASE_MODULES
+        """
+        modules = list(BASE_MODULES)
+        for stage in self.stages:
+            modules.extend(getattr(stage, 'requires', LAZY_MODULES))
+        # Resampling to a target rate and locating the decoded seam both use scipy.signal
+        if targets is None:
+            if seam_check == 'all':
+                modules.append('scipy.signal')
+        elif any(
+            target.sample_rate is not None or seam_check_applies(target.subtype, seam_check)
+            for target in targets
+        ):
+            modules.append('scipy.signal')
+        return list(dict.fromkeys(modules))
+
+    def run(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int,
+        profiler: Optional[StageProfiler] = None
+    ) -> PipelineResult:
+        """
+        Run every stage in order, timing each one.
+
+        Args:
+            audio_data: Audio signal as numpy array (samples x channels or samples)
+            sample_rate: Sample rate in Hz
+            profiler: Profiler to record the stages into (a plain timer is used if None)
+
+        Returns:
+            PipelineResult with the 2-D (samples x channels) output, per-stage timings and
+            the shared analysis of the output
+        """
+        if audio_data.ndim == 1:
+            audio_data = audio_data[:, np.newaxis]
+
+        if profiler is None:
+            profiler = StageProfiler()
+        first_timing = len(profiler.timings)
+        analysis = AnalysisContext(audio_data, sample_rate)
+        audio_data, sample_rate = self._run_stages(self.stages, audio_data, sample_rate, analysis, profiler)
+        return PipelineResult(audio_data, sample_rate, profiler.timings[first_timing:], analysis)
+
+    def render_targets(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int,
+        targets: List[OutputTarget],
+        profiler: Optional[StageProfiler] = None
+    ) -> Iterator[Tuple[OutputTarget, PipelineResult]]:
+        """
+        Run the pipeline once and render its output for several output targets.
+
+        Stages before the last normalize stage run once. That stage only measures the
+        level; if every later stage is gain_linear, those also run once on the
+        unnormalized signal and each target scales the result by its own normalization
+        gain, which equals normalizing first. Otherwise the normalize stage and the
+        stages after it run again per target. Each result is then converted to the
+        target's sample rate, treating the audio as a loop if a crossfade or
+        stabilize stage ran.
+
+        Results are yielded one at a time, so only one rendered variant is held
+        alongside the shared buffer.
+
+        Args:
+            audio_data: Audio signal as numpy array (samples x channels or samples)
+            sample_rate: Sample rate in Hz
+            targets: Output targets to render
+            profiler: Profiler to record the stages into (a plain timer is used if None)
+
+        Yields:
+            (target, PipelineResult) in target order; each result's timings cover the
+            shared stages plus that target's own, and it carries no analysis
+        """
+        if audio_data.ndim == 1:
+            audio_data = audio_data[:, np.newaxis]
+
+        if profiler is None:
+            profiler = StageProfiler()
+        first_timing = len(profiler.timings)
+        normalize_index = max(
+            (index for index, stage in enumerate(self.stages) if isinstance(stage, NormalizeStage)),
+            default=None
+        )
+        normalize = None if normalize_index is None else self.stages[normalize_index]
+        tail = [] if normalize_index is None else self.stages[normalize_index + 1:]
+        deferred = all(getattr(stage, 'gain_linear', False) for stage in tail)
+        periodic = any(isinstance(stage, (CrossfadeStage, StabilizeStage)) for stage in self.stages)
+
+        analysis = AnalysisContext(audio_data, sample_rate)
+        head = self.stages if normalize_index is None else self.stages[:normalize_index]
+        audio_data, sample_rate = self._run_stages(head, audio_data, sample_rate, analysis, profiler)
+        level = None
+        if normalize is not None and deferred:
+            print(f"    Measuring level for {len(targets)} output target(s), gain applied per target...")
+            with profiler.stage(normalize.name):
+                level = normalize.measure(audio_data, sample_rate)
+            audio_data, sample_rate = self._run_stages(tail, audio_data, sample_rate, analysis, profiler)
+        shared_timings = profiler.timings[first_timing:]
+
+        for target in targets:
+            target_timing = len(profiler.timings)
+            print(f"    Output target '{target.suffix}' ({target.describe()}):")
+            rendered, rendered_rate = audio_data, sample_rate
+            if normalize is None:
+                if target.target_lufs is not None:
+                    print("      (no normalize stage in the pipeline; target_lufs is ignored)")
+            elif deferred:
+                gain = normalize.gain(level, target.target_lufs)
+                print(f"      Normalization gain: {20.0 * math.log10(gain):+.2f} dB")
+                rendered = _apply_gain(rendered, gain)
+            else:
+                stage = normalize if target.target_lufs is None else replace(normalize, target=target.target_lufs)
+                rendered = audio_data.copy()
+                rendered, rendered_rate = self._run_stages(
+                    [stage] + tail, rendered, sample_rate, AnalysisContext(rendered, sample_rate), profiler
+                )
+            if target.sample_rate is not None and target.sample_rate != rendered_rate:
+                print(f"      Resampling {rendered_rate} Hz -> {target.sample_rate} Hz{' (loop)' if periodic else ''}")
+                with profiler.stage('resample'):
+                    rendered = resample_audio(rendered, rendered_rate, target.sample_rate, periodic=periodic)
+                rendered_rate = target.sample_rate
+            yield target, PipelineResult(rendered, rendered_rate, shared_timings + profiler.timings[target_timing:])
+
+    @staticmethod
+    def _run_stages(
+        stages: List[Stage],
+        audio_data: np.ndarray,
+        sample_rate: int,
+        analysis: AnalysisContext,
+        profiler: StageProfiler
+    ) -> Tuple[np.ndarray, int]:
+        """Run stages in order on a 2-D buffer, timing each one and keeping analysis current."""
+        for stage in stages:
+            print(f"    {stage.describe()}")
+            with profiler.stage(stage.name):
+                if getattr(stage, 'uses_analysis', False):
+                    audio_data, sample_rate = stage.process(audio_data, sample_rate, analysis=analysis)
+                else:
+                    audio_data, sample_rate = stage.process(audio_data, sample_rate)
+                    analysis.replace(audio_data, sample_rate)
+        return audio_data, sample_rate
+
+def build_pipeline_config(
+    trim_threshold_db: float = -60.0,
+    min_silence_ms: int = 500,
+    enable_silence_collapse: bool = DEFAULT_ENABLE_SILENCE_COLLAPSE,
+    silence_residual_ms: float = DEFAULT_SILENCE_RESIDUAL_MS,
+    xfade_duration_ms: Optional[int] = None,
+    target_lufs: float = -12.0,
+    max_peak_dbfs: float = -1.0,
+    use_peak_normalization: bool = False,
+    enable_noise_reduction: bool = DEFAULT_ENABLE_NOISE_REDUCTION,
+    noise_gate_threshold_db: float = DEFAULT_NOISE_GATE_THRESHOLD_DB,
+    noise_reduction_db: float = DEFAULT_NOISE_REDUCTION_DB,
+    noise_gate_window_ms: float = DEFAULT_NOISE_GATE_WINDOW_MS,
+    noise_gate_attack_ms: float = DEFAULT_NOISE_GATE_ATTACK_MS,
+    noise_gate_release_ms: float = DEFAULT_NOISE_GATE_RELEASE_MS,
+    enforce_seamless_loop: bool = DEFAULT_ENFORCE_SEAMLESS_LOOP,
+    mirror_loop_start: bool = DEFAULT_LOOP_MIRROR_HEAD,
+    enable_loop_stabilization: bool = DEFAULT_LOOP_STABILIZATION,
+    target_duration_sec: Optional[float] = DEFAULT_TARGET_DURATION_SEC,
+    loop_comparison_window_ms: float = DEFAULT_LOOP_COMPARISON_WINDOW_MS,
+    loop_max_shift_ms: float = DEFAULT_LOOP_MAX_SHIFT_MS,
+    loop_min_correlation: float = DEFAULT_LOOP_MIN_CORRELATION
+) -> List[dict]:
+    """
+    Build the standard pipeline config from process_audio_file's flat parameters.
+
+    Order: Trim -> Noise reduction (if enabled) -> Crossfade (if enabled) -> Normalize
+    -> Loop Stabilization (if enabled). The result can be saved as JSON, edited and passed
+    back via --pipeline_config to reorder, drop or repeat stages.
+    """
+    config = [{
+        'stage': 'trim',
+        'trim_threshold_db': trim_threshold_db,
+        'min_silence_ms': min_silence_ms,
+        'enable_silence_collapse': enable_silence_collapse,
+        'silence_residual_ms': silence_residual_ms
+    }]
+    if enable_noise_reduction:
+        config.append({
+            'stage': 'noise_reduction',
+            'threshold_db': noise_gate_threshold_db,
+            'reduction_db': noise_reduction_db,
+            'window_ms': noise_gate_window_ms,
+            'attack_ms': noise_gate_attack_ms,
+            'release_ms': noise_gate_release_ms
+        })
+    if xfade_duration_ms is not None and xfade_duration_ms > 0:
+        config.append({
+            'stage': 'crossfade',
+            'xfade_duration_ms': xfade_duration_ms,
+            'pre_normalize': False,
+            'enforce_seamless_loop': enforce_seamless_loop,
+            'mirror_loop_start': mirror_loop_start
+        })
+    config.append({
+        'stage': 'normalize',
+        'mode': 'peak' if use_peak_normalization else 'lufs',
+        'target': target_lufs,
+        'max_peak_dbfs': max_peak_dbfs
+    })
+    if enable_loop_stabilization:
+        config.append({
+            'stage': 'stabilize',
+            'target_duration_sec': target_duration_sec,
+            'comparison_window_ms': loop_comparison_window_ms,
+            'max_shift_ms': loop_max_shift_ms,
+            'min_correlation': loop_min_correlation
+        })
+    return config
+
+def _find_trim_bounds_streaming(
+    sound_file: 'sf.SoundFile | PcmWavFile',
+    trim_threshold_db: float,
+    block_frames: int,
+    hop_size_ms: float = 25.0,
+    fine_grain_ms: float = 5.0,
+    dtype: str = DEFAULT_PRECISION
+) -> Tuple[int, int]:
+    """
+    Find the trim_silence boundaries of a file without loading it into memory.
+
+    Scans the file once in blocks for the coarse RMS boundaries, then reads only the
+    small windows around them for the 1ms refinement. Matches trim_silence exactly.
+
+    Args:
+        sound_file: Open soundfile.SoundFile or PcmWavFile to scan (position is not preserved)
+        trim_threshold_db: RMS energy threshold in dBFS
+        block_frames: Number of frames read per block (rounded to whole hops)
+        hop_size_ms: Coarse detection block size in milliseconds (default: 25.0)
+        fine_grain_ms: Fine-grained search window in milliseconds (default: 5.0)
+        dtype: Precision the samples are read in ('float64' or 'float32')
+
+    Returns:
+        Tuple of (start_sample, end_sample) of the audio to keep
+    """
+    sample_rate = sound_file.samplerate
+    num_samples = sound_file.frames
+    trim_threshold_linear = 10 ** (trim_threshold_db / 20.0)
+    hop_size_samples = int(sample_rate * hop_size_ms / 1000.0)
+
+    num_blocks = num_samples // hop_size_samples if hop_size_samples > 0 else 0
+    if num_blocks == 0:
+        return 0, num_samples
+
+    def detection_signal(data: np.ndarray) -> np.ndarray:
+        return np.max(np.abs(data), axis=1) if data.shape[1] > 1 else data[:, 0]
+
+    read_frames = max(1, block_frames // hop_size_samples) * hop_size_samples
+    first_sound_block = None
+    last_sound_block = None
+    block_index = 0
+    sound_file.seek(0)
+    while block_index < num_blocks:
+        blocks_to_read = min(read_frames // hop_size_samples, num_blocks - block_index)
+        data = sound_file.read(blocks_to_read * hop_size_samples, dtype=dtype, always_2d=True)
+        if len(data) < blocks_to_read * hop_size_samples:
+            blocks_to_read = len(data) // hop_size_samples
+            if blocks_to_read == 0:
+                break
+        mono = detection_signal(data[:blocks_to_read * hop_size_samples])
+        rms_values = np.sqrt(np.mean(mono.reshape(blocks_to_read, hop_size_samples) ** 2, axis=1))
+        with np.errstate(divide='ignore'):
+            rms_dbfs = np.where(rms_values > 0, 20.0 * np.log10(np.maximum(rms_values, 1e-300)), -np.inf)
+        loud = np.flatnonzero(rms_dbfs > trim_threshold_db)
+        if len(loud) > 0:
+            if first_sound_block is None:
+                first_sound_block = block_index + int(loud[0])
+            last_sound_block = block_index + int(loud[-1])
+        block_index += blocks_to_read
+
+    if first_sound_block is None:
+        return 0, min(int(sample_rate * 0.1), num_samples)
+
+    coarse_start = first_sound_block * hop_size_samples
+    coarse_end = num_samples
+    if last_sound_block < num_blocks - 1:
+        coarse_end = min((last_sound_block + 1) * hop_size_samples, num_samples)
+
+    fine_grain_samples = int(sample_rate * fine_grain_ms / 1000.0)
+    fine_hop = max(1, int(sample_rate * 0.001))
+
+    def read_detection(start: int, stop: int) -> np.ndarray:
+        sound_file.seek(start)
+        return detection_signal(sound_file.read(max(0, stop - start), dtype=dtype, always_2d=True))
+
+    search_start = max(0, coarse_start - fine_grain_samples)
+    search_end = min(num_samples, coarse_start + fine_grain_samples)
+    refined_start = _refine_trim_start(
+        read_detection(search_start, search_end), search_start, coarse_start, fine_hop, trim_threshold_linear
+    )
+
+    search_start = max(0, coarse_end - fine_grain_samples)
+    refined_end = _refine_trim_end(
+        read_detection(search_start, coarse_end), search_start, coarse_end, fine_hop, trim_threshold_linear
+    )
+
+    if refined_start >= refined_end:
+        return coarse_start, coarse_end
+    return refined_start, refined_end
+
+class _StreamingLoudnessMeter:
+    """
+    Block-wise ITU-R BS.1770 integrated loudness, equivalent to pyloudnorm.Meter.
+
+    Applies the K-weighting (see _k_weighting_sos) with carried-over filter state and
+    keeps one mean-square value per 100ms gating step, so memory is independent of the
+    number of samples held at once.
+    """
+
+    def __init__(self, sample_rate: int, num_channels: int, block_size: float = 0.400, overlap: float = 0.75):
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+        self.block_size = block_size
+        self.step = 1.0 - overlap
+        self.sos = np.array(_k_weighting_sos(sample_rate))  # sosfilt needs a writable copy of the cached sections
+        self.filter_state = np.zeros((len(self.sos), 2, num_channels))
+        self.step_energies = []
+        self.pending_energy = np.zeros(num_channels)
+        self.samples_seen = 0
+        self.next_boundary = self._step_boundary(1)
+
+    def _step_boundary(self, index: int) -> int:
+        return int(self.block_size * (index * self.step) * self.sample_rate)
+
+    def add(self, data: np.ndarray) -> None:
+        """Feed the next block of (samples x channels) audio."""
+        weighted, self.filter_state = signal.sosfilt(self.sos, data.astype(np.float64), axis=0, zi=self.filter_state)
+        squared = weighted ** 2
+
+        position = 0
+        while position < len(squared):
+            take = min(len(squared) - position, self.next_boundary - self.samples_seen)
+            self.pending_energy += np.sum(squared[position:position + take], axis=0)
+            position += take
+            self.samples_seen += take
+            if self.samples_seen == self.next_boundary:
+                self.step_energies.append(self.pending_energy)
+                self.pending_energy = np.zeros(self.num_channels)
+                self.next_boundary = self._step_boundary(len(self.step_energies) + 1)
+
+    def integrated_loudness(self) -> float:
+        """Return the gated integrated loudness in LUFS (raises ValueError if shorter than one block)."""
+        if self.samples_seen < self.block_size * self.sample_rate:
+            raise ValueError("Audio must have length greater than the block size.")
+
+        steps = np.array(self.step_energies + [self.pending_energy])
+        return _gated_loudness(steps, self.samples_seen, self.sample_rate, self.block_size, self.step)
+
+def _gated_loudness(steps: np.ndarray, num_samples: int, sample_rate: int, block_size: float, step: float) -> float:
+    """
+    BS.1770 gated integrated loudness from the K-weighted energy of each gating step.
+
+    Args:
+        steps: (steps x channels) sums of squared K-weighted samples per gating step,
+               the last row holding the samples after the last full step
+        num_samples: Samples measured
+        sample_rate: Sample rate in Hz
+        block_size: Gating block length in seconds
+        step: Gating step as a fraction of the block (1 - overlap)
+
+    Returns:
+        Integrated loudness in LUFS (-inf for silence)
+    """
+    num_channels = steps.shape[1]
+    steps_per_block = int(round(1.0 / step))
+    duration = num_samples / sample_rate
+    num_blocks = int(np.round((duration - block_size) / (block_size * step))) + 1
+    padded = np.vstack([steps, np.zeros((num_blocks + steps_per_block, num_channels))])
+    cumulative = np.vstack([np.zeros((1, num_channels)), np.cumsum(padded, axis=0)])
+    z = (cumulative[steps_per_block:steps_per_block + num_blocks] - cumulative[:num_blocks])
+    z = z / (block_size * sample_rate)
+
+    channel_gains = np.array([1.0, 1.0, 1.0, 1.41, 1.41])[:num_channels]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        block_loudness = -0.691 + 10.0 * np.log10(np.sum(z * channel_gains, axis=1))
+        gated = z[block_loudness >= -70.0]
+        relative_threshold = -0.691 + 10.0 * np.log10(np.sum(np.mean(gated, axis=0) * channel_gains)) - 10.0
+        gated = z[(block_loudness > relative_threshold) & (block_loudness > -70.0)]
+        z_avg = np.nan_to_num(np.mean(gated, axis=0)) if len(gated) > 0 else np.zeros(num_channels)
+        return -0.691 + 10.0 * np.log10(np.sum(z_avg * channel_gains))
+
+def _k_weighting_sos(sample_rate: int) -> np.ndarray:
+    """
+    ITU-R BS.1770 K-weighting as two second-order sections for this sample rate (cached).
+
+    BS.1770 tabulates the coefficients for 48 kHz only. Both biquads are therefore designed
+    from K_WEIGHTING_SHELF and K_WEIGHTING_HIGH_PASS with the bilinear (RBJ cookbook)
+    formulas, which is also how pyloudnorm.Meter designs them: loudness measured with these
+    sections equals the meter's at every sample rate, without reading its private filters.
+    """
+    def build() -> np.ndarray:
+        gain_db, shelf_q, shelf_hz = K_WEIGHTING_SHELF
+        amplitude = 10.0 ** (gain_db / 40.0)
+        w0 = 2.0 * np.pi * shelf_hz / sample_rate
+        alpha = np.sin(w0) / (2.0 * shelf_q)
+        cos_w0, root = np.cos(w0), 2.0 * np.sqrt(amplitude) * alpha
+        shelf = [
+            amplitude * ((amplitude + 1) + (amplitude - 1) * cos_w0 + root),
+            -2.0 * amplitude * ((amplitude - 1) + (amplitude + 1) * cos_w0),
+            amplitude * ((amplitude + 1) + (amplitude - 1) * cos_w0 - root),
+            (amplitude + 1) - (amplitude - 1) * cos_w0 + root,
+            2.0 * ((amplitude - 1) - (amplitude + 1) * cos_w0),
+            (amplitude + 1) - (amplitude - 1) * cos_w0 - root,
+        ]
+
+        high_pass_q, high_pass_hz = K_WEIGHTING_HIGH_PASS
+        w0 = 2.0 * np.pi * high_pass_hz / sample_rate
+        alpha = np.sin(w0) / (2.0 * high_pass_q)
+        cos_w0 = np.cos(w0)
+        high_pass = [(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2, 1 + alpha, -2.0 * cos_w0, 1 - alpha]
+
+        sos = np.array([shelf, high_pass], dtype=np.float64)
+        return sos / sos[:, 3:4]  # Normalize each section to a0 = 1
+    return KERNEL_CACHE.get('k_weighting_sos', (sample_rate,), build)
+
+def measure_integrated_loudness(
+    audio_data: np.ndarray,
+    sample_rate: int,
+    block_size: float = 0.400,
+    overlap: float = 0.75
+) -> float:
+    """
+    Integrated loudness (ITU-R BS.1770) in one vectorized pass.
+
+    Equal to pyloudnorm.Meter.integrated_loudness to within rounding, but the two
+    K-weighting filters run as one cascade and the gating blocks are summed from
+    per-step energies (as _StreamingLoudnessMeter does) instead of block by block.
+
+    Args:
+        audio_data: Audio signal as numpy array (samples x channels or samples)
+        sample_rate: Sample rate in Hz
+        block_size: Gating block length in seconds
+        overlap: Overlap of consecutive gating blocks
+
+    Returns:
+        Integrated loudness in LUFS (-inf for silence)
+
+    Raises:
+        ValueError: If the audio is shorter than one gating block
+    """
+    if audio_data.ndim == 1:
+        audio_data = audio_data[:, np.newaxis]
+    num_samples = len(audio_data)
+    if num_samples < block_size * sample_rate:
+        raise ValueError("Audio must have length greater than the block size.")
+    sos = np.array(_k_weighting_sos(sample_rate))  # sosfilt needs a writable copy of the cached sections
+    energy = signal.sosfilt(sos, _as_float_audio(audio_data).astype(np.float64), axis=0)
+    energy *= energy
+
+    # Step boundaries as _StreamingLoudnessMeter._step_boundary computes them
+    step = 1.0 - overlap
+    boundaries = (block_size * (np.arange(1, int(num_samples / (block_size * step * sample_rate)) + 2) * step)
+                  * sample_rate).astype(np.int64)
+    starts = np.concatenate(([0], boundaries[boundaries < num_samples]))
+    steps = np.add.reduceat(energy, starts, axis=0)
+    if np.count_nonzero(boundaries <= num_samples) == len(starts):
+        steps = np.vstack([steps, np.zeros((1, steps.shape[1]))])  # Ends on a step boundary: no partial step
+    return _gated_loudness(steps, num_samples, sample_rate, block_size, step)
+
+def _true_peak_interpolator(oversampling: int = TRUE_PEAK_OVERSAMPLING,
+                            taps_per_phase: int = TRUE_PEAK_TAPS_PER_PHASE) -> np.ndarray:
+    """
+    Polyphase interpolation matrix for the true-peak meter (cached).
+
+    Column p - 1 holds the weights of samples n - taps_per_phase/2 + 1 ... n + taps_per_phase/2
+    that give the value at n + p/oversampling, from a Kaiser-windowed sinc low-pass at the
+    original Nyquist frequency. Phase 0 is the sample itself and has no column.
+    """
+    def build() -> np.ndarray:
+        length = oversampling * taps_per_phase + 1
+        taps = oversampling * signal.firwin(length, 1.0 / oversampling, window=('kaiser', 8.0))
+        delay = (length - 1) // 2
+        half = taps_per_phase // 2
+        matrix = np.zeros((taps_per_phase, oversampling - 1))
+        for phase in range(1, oversampling):
+            for offset in range(-half + 1, half + 1):
+                index = delay - oversampling * offset + phase
+                if 0 <= index < length:
+                    matrix[offset + half - 1, phase - 1] = taps[index]
+        return matrix
+    return KERNEL_CACHE.get('true_peak_interpolator', (oversampling, taps_per_phase), build)
+
+def measure_true_peak(
+    audio_data: np.ndarray,
+    sample_rate: int,
+    analysis: Optional[AnalysisContext] = None,
+    block_frames: int = TRUE_PEAK_BLOCK_FRAMES
+) -> float:
+    """
+    True (inter-sample) peak, as the maximum of the signal oversampled TRUE_PEAK_OVERSAMPLING times.
+
+    An interpolated value can exceed the largest sample near it by at most the sum of
+    the interpolator's absolute weights. Blocks are therefore oversampled loudest first,
+    and the search stops once no remaining block can beat the peak found so far, so
+    usually only the few blocks around the loudest moments are interpolated. The result
+    is exactly the peak of the fully oversampled signal. Each block is interpolated
+    by one matrix product over its sliding windows.
+
+    Args:
+        audio_data: Audio signal as numpy array (samples x channels or samples)
+        sample_rate: Sample rate in Hz
+        analysis: Shared analysis of audio_data; its detection downmix is reused
+        block_frames: Frames per oversampled block
+
+    Returns:
+        True peak as a linear amplitude (at least the sample peak; 0 for silence)
+    """
+    if analysis is None:
+        analysis = AnalysisContext(audio_data, sample_rate)
+    audio_data = analysis.audio_data
+    envelope = analysis.detection_mono() if audio_data.shape[1] > 1 else np.abs(audio_data[:, 0])
+    num_samples = len(envelope)
+    if num_samples == 0:
+        return 0.0
+    interpolator = _true_peak_interpolator().astype(audio_data.dtype)
+    taps = interpolator.shape[0]
+    before, after = taps // 2 - 1, taps // 2
+    bound_gain = float(np.max(np.sum(np.abs(interpolator), axis=0)))
+
+    block_peaks = np.maximum.reduceat(envelope, np.arange(0, num_samples, block_frames))
+    # Interpolated values near a block edge also depend on the neighbouring block
+    reach = block_peaks.copy()
+    reach[1:] = np.maximum(reach[1:], block_peaks[:-1])
+    reach[:-1] = np.maximum(reach[:-1], block_peaks[1:])
+    bounds = reach * bound_gain
+
+    peak = float(np.max(block_peaks))
+    padded = np.zeros((before + block_frames + after, audio_data.shape[1]), dtype=audio_data.dtype)
+    for block in np.argsort(-bounds, kind='stable'):
+        if bounds[block] <= peak:
+            break
+        start = block * block_frames
+        stop = min(num_samples, start + block_frames)
+        # Samples outside the signal count as silence, as for a zero-padded filter
+        source_start, source_stop = max(0, start - before), min(num_samples, stop + after)
+        segment = padded[:before + (stop - start) + after]
+        segment[:] = 0.0
+        segment[source_start - (start - before):source_stop - (start - before)] = audio_data[source_start:source_stop]
+        for channel in range(audio_data.shape[1]):
+            windows = np.lib.stride_tricks.sliding_window_view(segment[:, channel], taps)
+            peak = max(peak, float(np.max(np.abs(windows @ interpolator))))
+    return peak
+
+def process_audio_file_streaming(
+    input_path: Path,
+    output_wav_path: Path,
+    trim_threshold_db: float = -60.0,
+    xfade_duration_ms: Optional[int] = None,
+    target_lufs: float = -12.0,
+    max_peak_dbfs: float = -1.0,
+    use_peak_normalization: bool = False,
+    enable_noise_reduction: bool = DEFAULT_ENABLE_NOISE_REDUCTION,
+    noise_gate_threshold_db: float = DEFAULT_NOISE_GATE_THRESHOLD_DB,
+    noise_reduction_db: float = DEFAULT_NOISE_REDUCTION_DB,
+    noise_gate_window_ms: float = DEFAULT_NOISE_GATE_WINDOW_MS,
+    noise_gate_attack_ms: float = DEFAULT_NOISE_GATE_ATTACK_MS,
+    noise_gate_release_ms: float = DEFAULT_NOISE_GATE_RELEASE_MS,
+    enforce_seamless_loop: bool = DEFAULT_ENFORCE_SEAMLESS_LOOP,
+    mirror_loop_start: bool = DEFAULT_LOOP_MIRROR_HEAD,
+    enable_loop_stabilization: bool = DEFAULT_LOOP_STABILIZATION,
+    target_duration_sec: Optional[float] = DEFAULT_TARGET_DURATION_SEC,
+    loop_comparison_window_ms: float = DEFAULT_LOOP_COMPARISON_WINDOW_MS,
+    loop_max_shift_ms: float = DEFAULT_LOOP_MAX_SHIFT_MS,
+    loop_min_correlation: float = DEFAULT_LOOP_MIN_CORRELATION,
+    block_sec: float = DEFAULT_STREAM_BLOCK_SEC,
+    precision: str = DEFAULT_PRECISION,
+    output_targets: Optional[List[Tuple[OutputTarget, Path]]] = None,
+    encode_threads: int = DEFAULT_ENCODE_THREADS,
+    seam_check: str = DEFAULT_SEAM_CHECK,
+    profiler: Optional[StageProfiler] = None
+) -> None:
+    """
+    Process a long audio file block by block with constant memory use.
+
+    Mirrors process_audio_file stage for stage, but never holds more than one block
+    (plus filter overlap) of audio in memory:
+      1. Scan for trim boundaries and the DC offset of the kept region
+      2. DC/high-pass filter and noise gate per block with overlap, applying the seam
+         crossfade while writing a float intermediate file
+      3. Measure peak, integrated loudness and audio character from the intermediate
+      4. Apply normalization gain and loop stabilization while writing the output
+         (one gain and file per output target)
+
+    Tick spacing adjustment (part of the seamless crossfade in memory) needs every tick
+    position at once and is skipped; it only matters for short clock/timer loops.
+
+    Args:
+        input_path: Path to input audio file
+        output_wav_path: Path of the processed WAV to write
+        block_sec: Block length in seconds
+        precision: Sample type of every block and of the intermediate file ('float64' or 'float32')
+        output_targets: (target, path) pairs to write instead of output_wav_path; targets
+                        must keep the input sample rate
+        encode_threads: Threads writing each block to the output targets in parallel
+        seam_check: Which outputs to decode and seam-check after writing (see
+                    seam_check_applies; streamed files are checked but not re-encoded)
+        profiler: Records each pass as a stage (stream_scan, stream_filter, stream_measure, stream_render)
+        (remaining arguments as in process_audio_file)
+    """
+    if output_targets is None:
+        output_targets = [(OutputTarget(), output_wav_path)]
+    if profiler is None:
+        profiler = StageProfiler()
+    profiler.begin('stream_scan')
+    with open_audio_source(input_path) as source:
+        sample_rate = source.samplerate
+        num_channels = source.channels
+        for target, _ in output_targets:
+            if target.sample_rate not in (None, sample_rate):
+                raise ValueError(f"Output target '{target.suffix}' changes the sample rate, which streaming mode cannot do")
+
+        block_frames = max(1, int(sample_rate * block_sec))
+        window_samples = max(1, int(sample_rate * 0.01))
+        block_frames = ((block_frames + window_samples - 1) // window_samples) * window_samples
+
+        print(f"    Trimming silence (threshold: {trim_threshold_db} dBFS)...")
+        trim_start, trim_end = _find_trim_bounds_streaming(source, trim_threshold_db, block_frames, dtype=precision)
+        num_samples = trim_end - trim_start
+        print(f"    Trimmed duration: {num_samples/sample_rate:.2f}s")
+
+        def read_source(start: int, stop: int) -> np.ndarray:
+            source.seek(trim_start + start)
+            return source.read(stop - start, dtype=precision, always_2d=True)
+
+        xfade_samples = 0
+        if xfade_duration_ms is not None and xfade_duration_ms > 0:
+            print(f"    Applying {xfade_duration_ms}ms Equal-Power Cosine Crossfade...")
+            if enforce_seamless_loop:
+                print("    (tick spacing adjustment is skipped in streaming mode)")
+            xfade_samples = min(int(sample_rate * xfade_duration_ms / 1000.0), num_samples // 2)
+        if xfade_samples > 0:
+            xfade_out, xfade_in = generate_epcf_gains(xfade_samples)
+
+        output_wav_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_fd, temp_name = tempfile.mkstemp(
+            prefix=f".{output_wav_path.stem}.", suffix='.w64', dir=str(output_wav_path.parent)
+        )
+        os.close(temp_fd)
+        temp_path = Path(temp_name)
+        try:
+            # Pass 1: DC offset of the kept region (noise reduction only)
+            if enable_noise_reduction:
+                print(f"    Noise reduction (threshold {noise_gate_threshold_db} dBFS, reduction {noise_reduction_db} dB)...")
+                channel_sums = np.zeros(num_channels)
+                for start in range(0, num_samples, block_frames):
+                    channel_sums += np.sum(read_source(start, min(num_samples, start + block_frames)), axis=0, dtype=np.float64)
+                dc_offset = (channel_sums / max(1, num_samples)).astype(precision)
+
+                sos_hp = _highpass_sos(sample_rate)
+                gate_window = max(1, int(sample_rate * noise_gate_window_ms / 1000.0))
+                kernel = _box_kernel(gate_window)
+                threshold_linear = 10 ** (noise_gate_threshold_db / 20.0)
+                reduction_linear = 10 ** (-abs(noise_reduction_db) / 20.0)
+                # Overlap read on each side of a block so the zero-phase filter and the
+                # envelope window see the same neighbourhood as in a full-file pass
+                halo = max(gate_window, int(sample_rate * 0.5))
+
+            # Pass 2: filter, gate and seam crossfade, written to a float intermediate
+            profiler.begin('stream_filter')
+            head_segment = None
+            gain_state = None
+            with sf.SoundFile(str(temp_path), 'w+', samplerate=sample_rate, channels=num_channels,
+                              format='W64', subtype='FLOAT' if precision == 'float32' else 'DOUBLE') as intermediate:
+                for start in range(0, num_samples, block_frames):
+                    stop = min(num_samples, start + block_frames)
+                    if enable_noise_reduction:
+                        read_start = max(0, start - halo)
+                        read_stop = min(num_samples, stop + halo)
+                        chunk = read_source(read_start, read_stop) - dc_offset
+                        filtered = _sosfiltfilt(sos_hp, chunk)
+                        if not np.isfinite(filtered).all():
+                            filtered = np.nan_to_num(filtered, nan=0.0, posinf=0.0, neginf=0.0)
+                        mono_signal = np.mean(filtered, axis=1, dtype=np.float64)
+                        rms_envelope = np.sqrt(
+                            np.maximum(signal.convolve(mono_signal ** 2, kernel, mode='same'), 0.0) + 1e-12
+                        )
+                        core = slice(start - read_start, stop - read_start)
+                        ratio = np.clip(rms_envelope[core] / (threshold_linear + 1e-12), 0.0, 1.0)
+                        target_gain = reduction_linear + (1.0 - reduction_linear) * ratio
+                        smoothed_gain = _smooth_gain_curve(
+                            target_gain, sample_rate, noise_gate_attack_ms, noise_gate_release_ms,
+                            initial_value=gain_state
+                        )
+                        gain_state = smoothed_gain[-1]
+                        block = filtered[core] * smoothed_gain.astype(precision, copy=False)[:, np.newaxis]
+                    else:
+                        block = read_source(start, stop)
+
+                    if xfade_samples > 0:
+                        if start == 0:
+                            head_segment = block[:xfade_samples].astype(np.float64)
+                            if not enforce_seamless_loop:
+                                block[:xfade_samples] *= xfade_in[:, np.newaxis]
+                        tail_start = num_samples - xfade_samples
+                        if stop > tail_start:
+                            local = max(0, tail_start - start)
+                            index = np.arange(start + local, stop) - tail_start
+                            if enforce_seamless_loop:
+                                block[local:] = (block[local:] * xfade_out[index, np.newaxis]
+                                                 + head_segment[index] * xfade_in[index, np.newaxis])
+                            else:
+                                block[local:] *= xfade_out[index, np.newaxis]
+                    intermediate.write(block)
+
+                if xfade_samples > 0 and enforce_seamless_loop and mirror_loop_start:
+                    intermediate.seek(num_samples - xfade_samples)
+                    crossfaded = intermediate.read(xfade_samples, dtype=precision, always_2d=True)
+                    intermediate.seek(0)
+                    intermediate.write(crossfaded)
+
+            # Pass 3: measure the intermediate for normalization and loop stabilization
+            profiler.begin('stream_measure')
+            print_target = (f"{target_lufs} dBFS peak (preserves transients)" if use_peak_normalization
+                            else f"{target_lufs} LUFS (ITU-R BS.1770)")
+            print(f"    Normalizing to {print_target}...")
+            peak_value = 0.0
+            loudness_meter = None if use_peak_normalization else _StreamingLoudnessMeter(sample_rate, num_channels)
+            window_rms, window_peak, window_flatness = [], [], []
+            with sf.SoundFile(str(temp_path)) as intermediate:
+                for block in intermediate.blocks(blocksize=block_frames, dtype=precision, always_2d=True):
+                    peak_value = max(peak_value, float(np.max(np.abs(block))) if len(block) else 0.0)
+                    if loudness_meter is not None:
+                        loudness_meter.add(block)
+                    mono = np.mean(block, axis=1) if num_channels > 1 else block[:, 0]
+                    full_windows = len(mono) // window_samples
+                    if full_windows > 0:
+                        windows = mono[:full_windows * window_samples].reshape(full_windows, window_samples)
+                        window_rms.append(np.sqrt(np.mean(windows ** 2, axis=1)))
+                        window_peak.append(np.max(np.abs(windows), axis=1))
+                        window_flatness.append(_window_flatness(windows))
+            character = AudioCharacter()
+            if window_rms:
+                character = _summarize_character(
+                    np.concatenate(window_rms), np.concatenate(window_peak), np.concatenate(window_flatness),
+                    window_samples, sample_rate
+                )
+
+            level = LevelMeasurement(peak_value)
+            if loudness_meter is not None and peak_value > 0:
+                try:
+                    level.loudness = loudness_meter.integrated_loudness()
+                except ValueError as e:
+                    print(f"    Warning: LUFS measurement failed ({str(e)}), using peak normalization")
+            gains = []
+            for target, _ in output_targets:
+                if len(output_targets) > 1:
+                    print(f"    Output target '{target.suffix}' ({target.describe()}):")
+                target_level = target_lufs if target.target_lufs is None else target.target_lufs
+                gains.append(normalization_gain(level, target_level, max_peak_dbfs, use_lufs=not use_peak_normalization))
+
+            # Pass 4: loop stabilization and gain, written to the final output
+            profiler.begin('stream_render')
+            with sf.SoundFile(str(temp_path)) as intermediate:
+                def read_intermediate(start: int, stop: int) -> np.ndarray:
+                    intermediate.seek(start)
+                    return intermediate.read(stop - start, dtype=precision, always_2d=True)
+
+                output_samples = num_samples
+                pad_segment = None
+                if enable_loop_stabilization:
+                    print(f"    Applying loop stabilization (target duration: {target_duration_sec or 'auto'}s)...")
+                    if target_duration_sec is not None and target_duration_sec > 0:
+                        output_samples = int(target_duration_sec * sample_rate)
+                        padding_samples = output_samples - num_samples
+                        if padding_samples > 0:
+                            segment_start = max(0, num_samples - min(padding_samples * 2, int(sample_rate * 0.2)))
+                            segment_length = min(padding_samples, num_samples - segment_start)
+                            if segment_length <= 0:
+                                segment_start = num_samples // 2
+                                segment_length = min(padding_samples, int(sample_rate * 0.1))
+                            pad_segment = read_intermediate(segment_start, segment_start + segment_length)
+
+                def read_virtual(start: int, stop: int) -> np.ndarray:
+                    # Duration-adjusted signal: intermediate followed by tiled background padding
+                    parts = []
+                    if start < min(stop, num_samples):
+                        parts.append(read_intermediate(start, min(stop, num_samples)))
+                    if stop > num_samples and pad_segment is not None:
+                        index = np.arange(max(start, num_samples), stop) - num_samples
+                        parts.append(pad_segment[index % len(pad_segment)])
+                    return np.vstack(parts) if parts else np.zeros((0, num_channels))
+
+                shift = 0
+                seam = None
+                comparison_samples = min(int(sample_rate * loop_comparison_window_ms / 1000.0), output_samples // 4)
+                stabilize = enable_loop_stabilization and comparison_samples > 0 and output_samples >= comparison_samples * 2
+                if stabilize:
+                    max_shift = min(comparison_samples // 4, int(sample_rate * loop_max_shift_ms / 1000.0))
+                    alignment = find_seam_alignment(
+                        read_virtual(output_samples - comparison_samples, output_samples),
+                        read_virtual(0, comparison_samples),
+                        max_shift
+                    )
+                    if abs(alignment.offset) > 3 and alignment.score >= loop_min_correlation:
+                        shift = alignment.offset % output_samples
+                        alignment.applied = True
+                    print(
+                        f"    Seam alignment: offset {alignment.offset} samples, correlation {alignment.score:.3f}"
+                        f"{'' if alignment.applied else ' (not shifted)'}"
+                    )
+
+                def read_rolled(start: int, stop: int) -> np.ndarray:
+                    # Equivalent of np.roll(signal, -shift) without materializing the signal
+                    first_start = (start + shift) % output_samples
+                    first_stop = min(output_samples, first_start + (stop - start))
+                    data = read_virtual(first_start, first_stop)
+                    if len(data) < stop - start:
+                        data = np.vstack([data, read_virtual(0, stop - start - len(data))])
+                    return data
+
+                if stabilize:
+                    micro_xfade_ms = 10.0 if character.label == 'transient' else 50.0
+                    micro_xfade = min(int(sample_rate * micro_xfade_ms / 1000.0), output_samples // 2)
+                    if micro_xfade > 1:
+                        seam_out, seam_in = generate_epcf_gains(micro_xfade)
+                        seam = (read_rolled(output_samples - micro_xfade, output_samples) * seam_out[:, np.newaxis]
+                                + read_rolled(0, micro_xfade) * seam_in[:, np.newaxis])
+
+                def render_block(start: int, stop: int) -> np.ndarray:
+                    block = read_rolled(start, stop)
+                    if seam is not None:
+                        micro_xfade = len(seam)
+                        if start < micro_xfade:
+                            block[:min(stop, micro_xfade) - start] = seam[start:min(stop, micro_xfade)]
+                        tail_start = output_samples - micro_xfade
+                        if stop > tail_start:
+                            local = max(0, tail_start - start)
+                            block[local:] = seam[start + local - tail_start:stop - tail_start]
+                    return block
+
+                def write_block(output: sf.SoundFile, block: np.ndarray, gain: float) -> None:
+                    scaled = block * gain  # Stays in the working precision, as save_audio_file
+                    write_frames(output, np.clip(scaled, -1.0, 1.0, out=scaled))
+
+                with contextlib.ExitStack() as outputs:
+                    files = [
+                        outputs.enter_context(sf.SoundFile(str(target_path), 'w', samplerate=sample_rate, channels=num_channels,
+                                                           format=target.format, subtype=target.subtype,
+                                                           compression_level=target.compression_level))
+                        for target, target_path in output_targets
+                    ]
+                    # Entered last, so its pending writes finish before the files are closed.
+                    # Each block's writes to the targets run in parallel with reading the next block.
+                    encoder = outputs.enter_context(ThreadPoolExecutor(max_workers=encode_threads))
+                    writes = []
+                    for start in range(0, output_samples, block_frames):
+                        block = render_block(start, min(output_samples, start + block_frames))
+                        for write in writes:
+                            write.result()
+                        writes = [encoder.submit(write_block, output, block, gain) for output, gain in zip(files, gains)]
+                    for write in writes:
+                        write.result()
+
+                context = seam_context_frames(sample_rate, output_samples)
+                for (target, target_path), gain in zip(output_targets, gains):
+                    check = None
+                    if seam_check_applies(target.subtype, seam_check) and context > 0:
+                        head = np.clip(render_block(0, context) * gain, -1.0, 1.0)
+                        tail = np.clip(render_block(output_samples - context, output_samples) * gain, -1.0, 1.0)
+                        check = check_encoded_seam(target_path, head, tail, output_samples)
+                    print(describe_seam_check(target_path.name, check))
+        finally:
+            profiler.end()
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+
+def get_processed_output_path(output_path: Path) -> Path:
+    """
+    Map a mirrored output path to the file name process_audio_file writes (<stem>_processed.wav).
+    """
+    return output_path.parent / f"{output_path.stem}_processed.wav"
+
+def parse_output_targets(config: List[dict]) -> List[OutputTarget]:
+    """
+    Build output targets from a declarative config.
+
+    Args:
+        config: List of target dictionaries (fields of OutputTarget)
+
+    Returns:
+        One OutputTarget per entry, in order
+
+    Raises:
+        ValueError: If an entry is invalid or two targets would write the same file
+    """
+    if not config:
+        raise ValueError("expected at least one output target")
+    targets = []
+    file_names = set()
+    for index, entry in enumerate(config):
+        try:
+            target = OutputTarget(**entry)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Output target {index}: {str(e)}")
+        file_name = target.output_file(Path('file')).name
+        if file_name in file_names:
+            raise ValueError(f"Output target {index}: another target already writes <name>{target.suffix} as {target.format}")
+        file_names.add(file_name)
+        targets.append(target)
+    return targets
+
+def get_output_files(output_path: Path, output_targets: Optional[List[dict]] = None) -> List[Path]:
+    """
+    Map a mirrored output path to every file process_audio_file writes for it.
+    """
+    if not output_targets:
+        return [get_processed_output_path(output_path)]
+    return [target.output_file(output_path) for target in parse_output_targets(output_targets)]
+
+def describe_decoded_audio(audio_data: np.ndarray, sample_rate: int) -> str:
+    """
+    Return the log line process_audio_file prints after decoding a (samples x channels) buffer.
+    """
+    original_shape = audio_data.shape if audio_data.shape[1] > 1 else (len(audio_data),)
+    return f"    Sample rate: {sample_rate} Hz, Shape: {original_shape}, Duration: {len(audio_data)/sample_rate:.2f}s"
+
+@dataclass
+class RenderedOutput:
+    """One processed buffer ready to be encoded to its output file (see render_audio)."""
+
+    path: Path
+    audio_data: np.ndarray
+    sample_rate: int
+    format: str = 'WAV'
+    subtype: str = 'PCM_24'
+    compression_level: Optional[float] = None
+
+def render_audio(
+    audio_data: np.ndarray,
+    sample_rate: int,
+    output_path: Path,
+    pipeline_config: List[dict],
+    output_targets: Optional[List[dict]] = None,
+    profiler: Optional[StageProfiler] = None
+) -> Iterator[RenderedOutput]:
+    """
+    Run the DSP part of process_audio_file on a decoded buffer.
+
+    Args:
+        audio_data: Decoded audio as (samples x channels)
+        sample_rate: Sample rate in Hz
+        output_path: Mirrored output path the output file names derive from
+        pipeline_config: Declarative stage list (see Pipeline.from_config)
+        output_targets: Output target dictionaries (None = one <name>_processed.wav)
+        profiler: Records each pipeline stage (a plain timer is used if None)
+
+    Yields:
+        One RenderedOutput per output file, so each can be encoded before the next
+        target is rendered
+    """
+    if profiler is None:
+        profiler = StageProfiler()
+    pipeline = Pipeline.from_config(pipeline_config)
+    if not output_targets:
+        result = pipeline.run(audio_data, sample_rate, profiler)
+        print("    Stage timings: " + ", ".join(f"{t.name} {t.seconds:.3f}s" for t in result.timings))
+        yield RenderedOutput(get_processed_output_path(output_path), result.audio_data, result.sample_rate)
+        return
+
+    first_timing = len(profiler.timings)
+    for target, result in pipeline.render_targets(audio_data, sample_rate, parse_output_targets(output_targets), profiler):
+        yield RenderedOutput(target.output_file(output_path), result.audio_data, result.sample_rate,
+                             target.format, target.subtype, target.compression_level)
+    print("    Stage timings: " + ", ".join(f"{t.name} {t.seconds:.3f}s" for t in profiler.timings[first_timing:]))
+
+def save_rendered_output(
+    rendered: RenderedOutput,
+    seam_check: str = DEFAULT_SEAM_CHECK,
+    tolerance_db: float = DEFAULT_SEAM_CHECK_TOLERANCE_DB
+) -> Optional[SeamCheck]:
+    """
+    Encode a RenderedOutput to its file (see save_audio_file) and check its loop seam.
+
+    A lossy file that fails the check is re-encoded once at the best quality
+    (compression level 0) next to it, and the encode with the cleaner seam is kept.
+
+    Args:
+        rendered: Buffer and encoding settings
+        seam_check: 'off', 'lossy' or 'all' (see seam_check_applies)
+        tolerance_db: Seam score increase that fails the check
+
+    Returns:
+        The final SeamCheck, or None if the file was not checked
+    """
+    save_audio_file(rendered.audio_data, rendered.sample_rate, rendered.path,
+                    format=rendered.format, subtype=rendered.subtype,
+                    compression_level=rendered.compression_level)
+    if not seam_check_applies(rendered.subtype, seam_check):
+        return None
+
+    audio_data = rendered.audio_data if rendered.audio_data.ndim == 2 else rendered.audio_data[:, np.newaxis]
+    context = seam_context_frames(rendered.sample_rate, len(audio_data))
+    head = np.clip(audio_data[:context], -1.0, 1.0)
+    tail = np.clip(audio_data[len(audio_data) - context:], -1.0, 1.0)
+    check = check_encoded_seam(rendered.path, head, tail, len(audio_data))
+    if not check.passed(tolerance_db) and rendered.subtype in LOSSY_SUBTYPES and rendered.compression_level != 0.0:
+        retry_path = rendered.path.with_name(f".{rendered.path.name}.reencode")
+        try:
+            save_audio_file(rendered.audio_data, rendered.sample_rate, retry_path,
+                            format=rendered.format, subtype=rendered.subtype, compression_level=0.0)
+            retry = check_encoded_seam(retry_path, head, tail, len(audio_data))
+            if retry.passed(tolerance_db) or retry.score_db < check.score_db:
+                os.replace(retry_path, rendered.path)
+                check = retry
+                check.reencoded = True
+        finally:
+            if retry_path.exists():
+                retry_path.unlink()
+    return check
+
+def describe_seam_check(name: str, check: Optional[SeamCheck], tolerance_db: float = DEFAULT_SEAM_CHECK_TOLERANCE_DB) -> str:
+    """
+    Return the log lines for one saved output file and its seam check.
+    """
+    lines = [f"    [OK] Saved: {name}"]
+    if check is not None:
+        reencoded = " after re-encoding at best quality" if check.reencoded else ""
+        lines.append(f"    Seam check: {check.describe()}{reencoded}")
+        if not check.passed(tolerance_db):
+            lines.append(f"    Warning: encoding disturbed the loop seam of {name}")
+    return "\n".join(lines)
+
+def _encode_rendered_output(rendered: RenderedOutput, seam_check: str) -> Tuple[Optional[SeamCheck], StageTiming]:
+    """
+    Encode-thread body: save_rendered_output timed as an 'encode' stage.
+    """
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    check = save_rendered_output(rendered, seam_check)
+    return check, StageTiming('encode', time.perf_counter() - wall_start, time.thread_time() - cpu_start, _peak_rss_mb())
+
+def _finish_encode(encode: Tuple[str, Future], profiler: StageProfiler) -> None:
+    """
+    Wait for one background encode, record its timing and print its log lines.
+    """
+    name, future = encode
+    check, timing = future.result()
+    profiler.timings.append(timing)
+    print(describe_seam_check(name, check))
+
+def process_audio_file(
+    input_path: Path,
+    output_path: Path,
+    trim_threshold_db: float = -60.0,
+    min_silence_ms: int = 500,
+    enable_silence_collapse: bool = DEFAULT_ENABLE_SILENCE_COLLAPSE,
+    silence_residual_ms: float = DEFAULT_SILENCE_RESIDUAL_MS,
+    xfade_duration_ms: Optional[int] = None,
+    target_lufs: float = -12.0,
+    max_peak_dbfs: float = -1.0,
+    use_peak_normalization: bool = False,
+    enable_noise_reduction: bool = DEFAULT_ENABLE_NOISE_REDUCTION,
+    noise_gate_threshold_db: float = DEFAULT_NOISE_GATE_THRESHOLD_DB,
+    noise_reduction_db: float = DEFAULT_NOISE_REDUCTION_DB,
+    noise_gate_window_ms: float = DEFAULT_NOISE_GATE_WINDOW_MS,
+    noise_gate_attack_ms: float = DEFAULT_NOISE_GATE_ATTACK_MS,
+    noise_gate_release_ms: float = DEFAULT_NOISE_GATE_RELEASE_MS,
+    enforce_seamless_loop: bool = DEFAULT_ENFORCE_SEAMLESS_LOOP,
+    mirror_loop_start: bool = DEFAULT_LOOP_MIRROR_HEAD,
+    enable_loop_stabilization: bool = DEFAULT_LOOP_STABILIZATION,
+    target_duration_sec: Optional[float] = DEFAULT_TARGET_DURATION_SEC,
+    loop_comparison_window_ms: float = DEFAULT_LOOP_COMPARISON_WINDOW_MS,
+    loop_max_shift_ms: float = DEFAULT_LOOP_MAX_SHIFT_MS,
+    loop_min_correlation: float = DEFAULT_LOOP_MIN_CORRELATION,
+    streaming_threshold_sec: Optional[float] = DEFAULT_STREAMING_THRESHOLD_SEC,
+    stream_block_sec: float = DEFAULT_STREAM_BLOCK_SEC,
+    precision: str = DEFAULT_PRECISION,
+    output_targets: Optional[List[dict]] = DEFAULT_OUTPUT_TARGETS,
+    encode_threads: int = DEFAULT_ENCODE_THREADS,
+    seam_check: str = DEFAULT_SEAM_CHECK,
+    pipeline_config: Optional[List[dict]] = None,
+    profiler: Optional[StageProfiler] = None
+) -> bool:
+    """
+    Process a single audio file through the complete HQABP pipeline.
+
+    Processing sequence: Load -> Trim -> Noise reduction -> Crossfade (if enabled) -> Normalize -> Loop Stabilization (if enabled) -> Write
+    (or the stages listed in pipeline_config)
+
+    Args:
+        input_path: Path to input audio file
+        output_path: Path to save processed file
+        trim_threshold_db: RMS threshold for silence detection in dBFS
+        min_silence_ms: Minimum length of an interior silence to collapse
+        enable_silence_collapse: If True, shorten interior silences of at least min_silence_ms
+                                 (not applied in streaming mode)
+        silence_residual_ms: Length a collapsed interior silence is shortened to
+        xfade_duration_ms: Crossfade duration in milliseconds (None = disabled)
+        target_lufs: Target loudness in LUFS (used if use_peak_normalization=False)
+        max_peak_dbfs: Maximum allowed peak in dBFS
+        use_peak_normalization: If True, use peak normalization instead of LUFS
+                               (better for clock/timer sounds - preserves transients)
+        enable_noise_reduction: If True, apply soft noise gating/declicking before looping
+        noise_gate_threshold_db: Threshold for the noise gate envelope in dBFS
+        noise_reduction_db: Maximum attenuation applied by the noise gate
+        noise_gate_window_ms: Window size for RMS envelope used by the gate
+        noise_gate_attack_ms: Attack constant for the gate smoothing envelope
+        noise_gate_release_ms: Release constant for the gate smoothing envelope
+        enforce_seamless_loop: Forces crossfade to mirror start/end segments for perfect loops
+        mirror_loop_start: If True, writes the blended seam onto the head of the file
+        enable_loop_stabilization: If True, applies universal loop stabilization at the end (recommended)
+        target_duration_sec: Target duration in seconds for loop stabilization (None = use current length)
+        loop_comparison_window_ms: Start/end window compared when aligning the loop seam
+        loop_max_shift_ms: Largest seam realignment searched for
+        loop_min_correlation: Normalized correlation the seam must reach before it is shifted
+        streaming_threshold_sec: Files at least this long are processed block by block with
+                                 constant memory (None = always load the whole file)
+        stream_block_sec: Block length in seconds for streaming mode
+        precision: Sample type ('float64' or 'float32') the file is decoded to and every
+                   stage works in; float32 halves the memory of each buffer
+        output_targets: Variants to write instead of <name>_processed.wav, as a list of
+                        OutputTarget dictionaries. The file is decoded and processed once;
+                        only normalization, resampling and encoding run per target
+        encode_threads: Output files encoded in the background while the next target is
+                        rendered (streamed files write each target's blocks in parallel)
+        seam_check: Decode written files and compare their loop seam with the rendered
+                    buffer: 'off', 'lossy' (Vorbis/Opus targets, re-encoded once at best
+                    quality if the seam got worse) or 'all'
+        pipeline_config: Declarative stage list (see Pipeline.from_config). When given it
+                         replaces the stage parameters above and streaming mode is not used
+        profiler: If given, records decode, each pipeline stage and encode into it
+
+    Returns:
+        True if processing was successful, False otherwise
+    """
+    if profiler is None:
+        profiler = StageProfiler()
+    try:
+
+        print(f"  Loading: {input_path.name}")
+        output_wav_path = get_processed_output_path(output_path)
+        targets = parse_output_targets(output_targets) if output_targets else None
+        if streaming_threshold_sec is not None and pipeline_config is None:
+            try:
+                info = sf.info(str(input_path))
+            except Exception as e:
+                raise IOError(f"Failed to load audio file: {str(e)}")
+            resampled = targets is not None and any(
+                target.sample_rate not in (None, info.samplerate) for target in targets
             )
-        else:
-            print(f"    Normalizing to {target_lufs} LUFS (ITU-R BS.1770)...")
-            audio_data = normalize_lufs(
-                audio_data,
-                sample_rate,
+            if info.frames >= streaming_threshold_sec * info.samplerate and resampled:
+                print("    (output targets change the sample rate; loading the whole file instead of streaming)")
+            elif info.frames >= streaming_threshold_sec * info.samplerate:
+                print(f"    Sample rate: {info.samplerate} Hz, Channels: {info.channels}, Duration: {info.frames/info.samplerate:.2f}s")
+                print(f"    Streaming mode ({stream_block_sec:g}s blocks, constant memory)")
+                if enable_silence_collapse:
+                    print("    (interior silence collapsing is skipped in streaming mode)")
+                process_audio_file_streaming(
+                    input_path,
+                    output_wav_path,
+                    trim_threshold_db=trim_threshold_db,
+                    xfade_duration_ms=xfade_duration_ms,
+                    target_lufs=target_lufs,
+                    max_peak_dbfs=max_peak_dbfs,
+                    use_peak_normalization=use_peak_normalization,
+                    enable_noise_reduction=enable_noise_reduction,
+                    noise_gate_threshold_db=noise_gate_threshold_db,
+                    noise_reduction_db=noise_reduction_db,
+                    noise_gate_window_ms=noise_gate_window_ms,
+                    noise_gate_attack_ms=noise_gate_attack_ms,
+                    noise_gate_release_ms=noise_gate_release_ms,
+                    enforce_seamless_loop=enforce_seamless_loop,
+                    mirror_loop_start=mirror_loop_start,
+                    enable_loop_stabilization=enable_loop_stabilization,
+                    target_duration_sec=target_duration_sec,
+                    loop_comparison_window_ms=loop_comparison_window_ms,
+                    loop_max_shift_ms=loop_max_shift_ms,
+                    loop_min_correlation=loop_min_correlation,
+                    block_sec=stream_block_sec,
+                    precision=precision,
+                    output_targets=None if targets is None else [
+                        (target, target.output_file(output_path)) for target in targets
+                    ],
+                    encode_threads=encode_threads,
+                    seam_check=seam_check,
+                    profiler=profiler
+                )
+                return True
+
+        with profiler.stage('decode'):
+            audio_data, sample_rate = load_audio_file(input_path, always_2d=True, dtype=precision)
+        print(describe_decoded_audio(audio_data, sample_rate))
+
+        if pipeline_config is None:
+            pipeline_config = build_pipeline_config(
+                trim_threshold_db=trim_threshold_db,
+                min_silence_ms=min_silence_ms,
+                enable_silence_collapse=enable_silence_collapse,
+                silence_residual_ms=silence_residual_ms,
+                xfade_duration_ms=xfade_duration_ms,
                 target_lufs=target_lufs,
-                max_peak_dbfs=max_peak_dbfs
+                max_peak_dbfs=max_peak_dbfs,
+                use_peak_normalization=use_peak_normalization,
+                enable_noise_reduction=enable_noise_reduction,
+                noise_gate_threshold_db=noise_gate_threshold_db,
+                noise_reduction_db=noise_reduction_db,
+                noise_gate_window_ms=noise_gate_window_ms,
+                noise_gate_attack_ms=noise_gate_attack_ms,
+                noise_gate_release_ms=noise_gate_release_ms,
+                enforce_seamless_loop=enforce_seamless_loop,
+                mirror_loop_start=mirror_loop_start,
+                enable_loop_stabilization=enable_loop_stabilization,
+                target_duration_sec=target_duration_sec,
+                loop_comparison_window_ms=loop_comparison_window_ms,
+                loop_max_shift_ms=loop_max_shift_ms,
+                loop_min_correlation=loop_min_correlation
             )
+        # Each output is encoded on a background thread (libsndfile releases the GIL) while
+        # the next target renders; at most encode_threads rendered buffers wait at once.
+        with ThreadPoolExecutor(max_workers=encode_threads) as encoder:
+            encodes = []
+            for rendered in render_audio(audio_data, sample_rate, output_path, pipeline_config, output_targets, profiler):
+                while len(encodes) >= encode_threads:
+                    _finish_encode(encodes.pop(0), profiler)
+                encodes.append((rendered.path.name, encoder.submit(_encode_rendered_output, rendered, seam_check)))
+            while encodes:
+                _finish_encode(encodes.pop(0), profiler)
+        return True
+
+    except Exception as e:
+        print(f"    [ERROR] Error processing {input_path.name}: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+@dataclass
+class ProcessorConfig:
+    """
+    Typed processing parameters for AudioProcessor.
+
+    Fields match process_audio_file's arguments of the same name (see its docstring).
+    Defaults come from the CONFIGURATION section, as on the command line.
+    """
+
+    trim_threshold_db: float = DEFAULT_TRIM_THRESHOLD_DB
+    min_silence_ms: int = DEFAULT_MIN_SILENCE_MS
+    enable_silence_collapse: bool = DEFAULT_ENABLE_SILENCE_COLLAPSE
+    silence_residual_ms: float = DEFAULT_SILENCE_RESIDUAL_MS
+    xfade_duration_ms: Optional[int] = DEFAULT_XFADE_DURATION_MS
+    target_lufs: float = DEFAULT_TARGET_LUFS
+    max_peak_dbfs: float = DEFAULT_MAX_PEAK_DBFS
+    use_peak_normalization: bool = DEFAULT_USE_PEAK_NORMALIZATION
+    enable_noise_reduction: bool = DEFAULT_ENABLE_NOISE_REDUCTION
+    noise_gate_threshold_db: float = DEFAULT_NOISE_GATE_THRESHOLD_DB
+    noise_reduction_db: float = DEFAULT_NOISE_REDUCTION_DB
+    noise_gate_window_ms: float = DEFAULT_NOISE_GATE_WINDOW_MS
+    noise_gate_attack_ms: float = DEFAULT_NOISE_GATE_ATTACK_MS
+    noise_gate_release_ms: float = DEFAULT_NOISE_GATE_RELEASE_MS
+    enforce_seamless_loop: bool = DEFAULT_ENFORCE_SEAMLESS_LOOP
+    mirror_loop_start: bool = DEFAULT_LOOP_MIRROR_HEAD
+    enable_loop_stabilization: bool = DEFAULT_LOOP_STABILIZATION
+    target_duration_sec: Optional[float] = DEFAULT_TARGET_DURATION_SEC
+    loop_comparison_window_ms: float = DEFAULT_LOOP_COMPARISON_WINDOW_MS
+    loop_max_shift_ms: float = DEFAULT_LOOP_MAX_SHIFT_MS
+    loop_min_correlation: float = DEFAULT_LOOP_MIN_CORRELATION
+    streaming_threshold_sec: Optional[float] = DEFAULT_STREAMING_THRESHOLD_SEC
+    stream_block_sec: float = DEFAULT_STREAM_BLOCK_SEC
+    precision: str = DEFAULT_PRECISION
+    output_targets: Optional[List[dict]] = DEFAULT_OUTPUT_TARGETS
+    encode_threads: int = DEFAULT_ENCODE_THREADS
+    seam_check: str = DEFAULT_SEAM_CHECK
+    pipeline_config: Optional[List[dict]] = None
+
+    def __post_init__(self):
+        if self.precision not in PRECISION_CHOICES:
+            raise ValueError(f"Unknown precision '{self.precision}' (expected one of: {', '.join(PRECISION_CHOICES)})")
+        if self.seam_check not in SEAM_CHECK_CHOICES:
+            raise ValueError(f"Unknown seam check '{self.seam_check}' (expected one of: {', '.join(SEAM_CHECK_CHOICES)})")
+        if self.encode_threads < 1:
+            raise ValueError(f"encode_threads must be at least 1 (got {self.encode_threads})")
+        if self.output_targets:
+            parse_output_targets(self.output_targets)
+
+    def process_kwargs(self) -> dict:
+        """Return the keyword arguments for process_audio_file (and get_effective_parameters)."""
+        return asdict(self)
+
+    def stage_config(self) -> List[dict]:
+        """Return pipeline_config, or the standard stage list built from the flat parameters."""
+        if self.pipeline_config is not None:
+            return self.pipeline_config
+        return build_pipeline_config(
+            **{name: getattr(self, name) for name in inspect.signature(build_pipeline_config).parameters}
+        )
+
+    def required_modules(self) -> List[str]:
+        """Return the libraries a run with this config imports (see Pipeline.required_modules)."""
+        targets = parse_output_targets(self.output_targets) if self.output_targets else None
+        return Pipeline.from_config(self.stage_config()).required_modules(targets, self.seam_check)
+
+@dataclass
+class ProcessedOutput:
+    """One output of AudioProcessor: the default render or one output target."""
+
+    audio_data: np.ndarray  # (samples x channels), or 1-D if the input was 1-D
+    sample_rate: int
+    target: Optional[OutputTarget] = None  # None for the default <name>_processed.wav output
+    peak_dbfs: float = -math.inf
+    loudness_lufs: Optional[float] = None  # Integrated loudness (None if too short to measure)
+    path: Optional[Path] = None  # File written by process_file with an output_path
+    seam_check: Optional[SeamCheck] = None
+
+@dataclass
+class ProcessResult:
+    """Outputs and metrics of one AudioProcessor call."""
+
+    outputs: List[ProcessedOutput]
+    input_seconds: float  # Duration of the input audio
+    processing_seconds: float  # Wall time of the call, including decode and encode
+    timings: List[StageTiming] = field(default_factory=list)
+    character: Optional[AudioCharacter] = None  # Measured on the first output
+    log: str = ''  # What the processing functions printed
+
+    @property
+    def audio_data(self) -> np.ndarray:
+        """Audio of the first output."""
+        return self.outputs[0].audio_data
+
+    @property
+    def sample_rate(self) -> int:
+        """Sample rate of the first output."""
+        return self.outputs[0].sample_rate
+
+class AudioProcessor:
+    """
+    Importable processing API that keeps its state warm across calls.
+
+    The pipeline is built from the config once, and the filter designs, kernels,
+    loudness meters and crossfade tables in KERNEL_CACHE stay in this process, so
+    after the first clip of a given sample rate (or warm_up()) only the DSP itself
+    runs per call. Nothing is printed: the log lines of the processing functions are
+    captured into ProcessResult.log unless verbose is set. The capture redirects the
+    process-wide stdout, so call a processor from one thread at a time.
+
+    Example:
+        processor = AudioProcessor(ProcessorConfig(target_lufs=-16.0))
+        processor.warm_up(48000)
+        result = processor.process(audio, 48000)
+        audio_out, lufs = result.audio_data, result.outputs[0].loudness_lufs
+
+    Args:
+        config: Processing parameters (None = the configured defaults)
+        verbose: Print the processing log instead of capturing it
+        **overrides: ProcessorConfig fields replacing those of config
+    """
+
+    def __init__(self, config: Optional[ProcessorConfig] = None, verbose: bool = False, **overrides):
+        config = config if config is not None else ProcessorConfig()
+        self.config = replace(config, **overrides) if overrides else config
+        self.pipeline = Pipeline.from_config(self.config.stage_config())
+        self.targets = parse_output_targets(self.config.output_targets) if self.config.output_targets else None
+        self.verbose = verbose
+        # Import what the stages need now so a missing library fails here, not mid-clip;
+        # every output's loudness is measured, so pyloudnorm is always needed
+        load_modules(self.pipeline.required_modules(self.targets, self.config.seam_check) + ['pyloudnorm'])
+
+    @contextlib.contextmanager
+    def _capture(self) -> Iterator[io.StringIO]:
+        log_buffer = io.StringIO()
+        if self.verbose:
+            yield log_buffer
+            return
+        with contextlib.redirect_stdout(log_buffer):
+            yield log_buffer
+
+    def warm_up(self, sample_rate: int = 48000, channels: int = 2, seconds: float = 2.0) -> float:
+        """
+        Process a short synthetic clip so the first real call does not pay for kernel setup.
+
+        Args:
+            sample_rate: Sample rate of the clips that will follow
+            channels: Number of channels of those clips
+            seconds: Length of the warm-up clip
+
+        Returns:
+            Wall time of the warm-up call in seconds
+        """
+        num_samples = max(1, int(sample_rate * seconds))
+        rng = np.random.default_rng(0)
+        clip = 0.05 * rng.standard_normal((num_samples, channels))
+        clip[::max(1, sample_rate // 2)] += 0.5
+        return self.process(clip, sample_rate).processing_seconds
+
+    def process(self, audio_data: np.ndarray, sample_rate: int) -> ProcessResult:
+        """
+        Process an in-memory clip.
+
+        Args:
+            audio_data: Audio as (samples x channels) or 1-D mono; it is not modified
+            sample_rate: Sample rate in Hz
+
+        Returns:
+            ProcessResult with one ProcessedOutput per output target (one without targets)
+        """
+        start = time.perf_counter()
+        audio_data = np.array(audio_data, dtype=self.config.precision)
+        return self._process(audio_data, sample_rate, start)
+
+    def process_file(self, input_path: Path, output_path: Optional[Path] = None) -> ProcessResult:
+        """
+        Decode, process and optionally write one file.
+
+        The whole file is decoded: use process_audio_file for streaming very long files.
+
+        Args:
+            input_path: Audio file to process
+            output_path: If given, write the outputs as process_audio_file would for this
+                         path (<stem>_processed.wav, or one file per output target), each
+                         with its seam check
+
+        Returns:
+            ProcessResult whose outputs carry their path and seam check when written
+        """
+        start = time.perf_counter()
+        profiler = StageProfiler()
+        with profiler.stage('decode'):
+            audio_data, sample_rate = load_audio_file(Path(input_path), always_2d=True, dtype=self.config.precision)
+        result = self._process(audio_data, sample_rate, start, profiler)
+        if output_path is not None:
+            output_path = Path(output_path)
+            with self._capture() as log_buffer:
+                for output in result.outputs:
+                    target = output.target if output.target is not None else OutputTarget()
+                    output.path = (get_processed_output_path(output_path) if output.target is None
+                                   else target.output_file(output_path))
+                    rendered = RenderedOutput(output.path, output.audio_data, output.sample_rate,
+                                              target.format, target.subtype, target.compression_level)
+                    with profiler.stage('encode'):
+                        output.seam_check = save_rendered_output(rendered, self.config.seam_check)
+                    print(describe_seam_check(output.path.name, output.seam_check))
+            result.log += log_buffer.getvalue()
+            result.timings = profiler.timings
+            result.processing_seconds = time.perf_counter() - start
+        return result
+
+    def _process(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int,
+        start: float,
+        profiler: Optional[StageProfiler] = None
+    ) -> ProcessResult:
+        squeeze = audio_data.ndim == 1
+        if squeeze:
+            audio_data = audio_data[:, np.newaxis]
+        if profiler is None:
+            profiler = StageProfiler()
+        input_seconds = len(audio_data) / sample_rate
+        with self._capture() as log_buffer:
+            if self.targets is None:
+                rendered = [(None, self.pipeline.run(audio_data, sample_rate, profiler))]
+            else:
+                rendered = list(self.pipeline.render_targets(audio_data, sample_rate, self.targets, profiler))
+            outputs = []
+            for target, pipeline_result in rendered:
+                level = measure_level(pipeline_result.audio_data, pipeline_result.sample_rate)
+                output_audio = pipeline_result.audio_data
+                if squeeze and output_audio.shape[1] == 1:
+                    output_audio = output_audio[:, 0]
+                outputs.append(ProcessedOutput(
+                    output_audio, pipeline_result.sample_rate, target,
+                    20.0 * np.log10(level.peak) if level.peak > 0 else -np.inf, level.loudness
+                ))
+            character = rendered[0][1].analysis.character_features() if rendered[0][1].analysis is not None else None
+        return ProcessResult(outputs, input_seconds, time.perf_counter() - start, profiler.timings,
+                             character, log_buffer.getvalue())
+
+def _hash_file(file_path: Path, chunk_size: int = 1 << 20) -> str:
+    """
+    Compute the SHA-256 content hash of a file without loading it into memory at once.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def get_effective_parameters(process_kwargs: dict) -> dict:
+    """
+    Resolve the full parameter set process_audio_file will run with.
+
+    Parameters not given explicitly are filled in from the function defaults, so
+    changing a default in the CONFIGURATION section also invalidates cached results.
+
+    Args:
+        process_kwargs: Keyword arguments that will be passed to process_audio_file
+
+    Returns:
+        Dictionary of every processing parameter (paths excluded)
+    """
+    bound = inspect.signature(process_audio_file).bind(None, None, **process_kwargs)
+    bound.apply_defaults()
+    params = dict(bound.arguments)
+    params.pop('input_path', None)
+    params.pop('output_path', None)
+    params.pop('profiler', None)
+    params.pop('encode_threads', None)  # Only changes how fast outputs are written
+    return params
+
+def load_cache_manifest(output_dir: Path) -> dict:
+    """
+    Load the incremental-processing manifest from the output directory.
+
+    Returns an empty manifest if none exists or it cannot be parsed.
+    """
+    manifest_path = output_dir / CACHE_MANIFEST_NAME
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if isinstance(manifest, dict) and isinstance(manifest.get('entries'), dict):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'entries': {}}
+
+def save_cache_manifest(output_dir: Path, manifest: dict) -> None:
+    """
+    Atomically write the incremental-processing manifest to the output directory.
+    """
+    manifest_path = output_dir / CACHE_MANIFEST_NAME
+    temp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+
+def compute_cache_key(input_path: Path, params: dict, entry: Optional[dict] = None) -> Tuple[str, str, os.stat_result]:
+    """
+    Compute the cache key for one input file.
+
+    The key covers the input content hash, the effective processing parameters and
+    PIPELINE_VERSION. If the input's size and mtime match the previous manifest entry
+    the stored content hash is reused instead of re-reading the file. The input is
+    stat-ed before it is hashed, and that stat is what make_cache_entry records: an input
+    rewritten while it renders then no longer matches the entry and is hashed again.
+
+    Args:
+        input_path: Path to input audio file
+        params: Effective processing parameters (see get_effective_parameters)
+        entry: Previous manifest entry for this file, if any
+
+    Returns:
+        Tuple of (cache_key, input_content_hash, input_stat)
+    """
+    stat = input_path.stat()
+    if (
+        entry is not None
+        and entry.get('input_size') == stat.st_size
+        and entry.get('input_mtime_ns') == stat.st_mtime_ns
+        and entry.get('input_sha256')
+    ):
+        content_hash = entry['input_sha256']
+    else:
+        content_hash = _hash_file(input_path)
+
+    key_material = json.dumps(
+        {'input': content_hash, 'params': params, 'pipeline_version': PIPELINE_VERSION},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(key_material.encode('utf-8')).hexdigest(), content_hash, stat
+
+def is_cache_hit(entry: Optional[dict], cache_key: str, processed_paths: List[Path]) -> bool:
+    """
+    Check whether a manifest entry matches the key and every processed output is still intact.
+    """
+    if entry is None or entry.get('key') != cache_key:
+        return False
+    outputs = entry.get('outputs') or {}
+    for processed_path in processed_paths:
+        recorded = outputs.get(processed_path.name)
+        try:
+            stat = processed_path.stat()
+        except OSError:
+            return False
+        if recorded is None or recorded.get('size') != stat.st_size or recorded.get('mtime_ns') != stat.st_mtime_ns:
+            return False
+    return True
+
+def make_cache_entry(
+    input_stat: os.stat_result,
+    processed_paths: List[Path],
+    cache_key: str,
+    content_hash: str
+) -> dict:
+    """
+    Build the manifest entry recorded after a file was processed successfully.
+
+    input_stat must be the stat compute_cache_key hashed the input under, not a fresh
+    one, so that the recorded size and mtime always belong to the recorded hash.
+    """
+    outputs = {}
+    for processed_path in processed_paths:
+        output_stat = processed_path.stat()
+        outputs[processed_path.name] = {'size': output_stat.st_size, 'mtime_ns': output_stat.st_mtime_ns}
+    return {
+        'key': cache_key,
+        'input_sha256': content_hash,
+        'input_size': input_stat.st_size,
+        'input_mtime_ns': input_stat.st_mtime_ns,
+        'outputs': outputs
+    }
+
+def _ignore_interrupts() -> None:
+    """
+    Pool worker initializer for watch mode: leave Ctrl+C to the parent, which stops
+    watching and shuts the pool down, instead of every idle worker printing a traceback.
+    """
+    import signal as os_signal  # The module-level `signal` is scipy.signal
+    os_signal.signal(os_signal.SIGINT, os_signal.SIG_IGN)
+
+def _process_file_task(
+    input_path: Path,
+    output_path: Path,
+    process_kwargs: dict,
+    profile: bool = False
+) -> Tuple[bool, str, List[StageTiming], Dict[str, Dict[str, int]]]:
+    """
+    Worker entry point for parallel batch processing.
+
+    Runs process_audio_file in a pool worker and captures everything it prints
+    (including tracebacks) so the parent can emit each file's log as one block.
+
+    Args:
+        input_path: Path to input audio file
+        output_path: Path to save processed file
+        process_kwargs: Keyword arguments forwarded to process_audio_file
+        profile: If True, trace memory allocations for the profile report
+
+    Returns:
+        Tuple of (success, captured_log, stage_timings, kernel_cache_stats)
+    """
+    log_buffer = io.StringIO()
+    profiler = StageProfiler(trace_memory=profile)
+    with contextlib.redirect_stdout(log_buffer), contextlib.redirect_stderr(log_buffer):
+        try:
+            success = process_audio_file(input_path, output_path, profiler=profiler, **process_kwargs)
+        except BaseException as e:
+            print(f"    [ERROR] Worker failed on {input_path.name}: {str(e)}")
+            success = False
+        finally:
+            profiler.close()
+    return success, log_buffer.getvalue(), profiler.timings, profiler.kernel_cache_stats()
+
+def _render_file_task(
+    input_path: Path,
+    output_path: Path,
+    audio_data: np.ndarray,
+    sample_rate: int,
+    process_kwargs: dict,
+    profile: bool = False
+) -> Tuple[bool, str, List[RenderedOutput], List[StageTiming], Dict[str, Dict[str, int]]]:
+    """
+    Pool worker entry point for the DSP stage of the pipelined executor.
+
+    Runs the pipeline process_audio_file would run on an already decoded buffer and
+    returns the rendered outputs for the parent's encode threads, with the captured log.
+
+    Returns:
+        Tuple of (success, captured_log, rendered_outputs, stage_timings, kernel_cache_stats)
+    """
+    log_buffer = io.StringIO()
+    profiler = StageProfiler(trace_memory=profile)
+    outputs = []
+    with contextlib.redirect_stdout(log_buffer), contextlib.redirect_stderr(log_buffer):
+        try:
+            params = get_effective_parameters(process_kwargs)
+            pipeline_config = params['pipeline_config']
+            if pipeline_config is None:
+                pipeline_config = build_pipeline_config(
+                    **{name: params[name] for name in inspect.signature(build_pipeline_config).parameters}
+                )
+            outputs = list(render_audio(
+                audio_data, sample_rate, output_path, pipeline_config, params['output_targets'], profiler
+            ))
+            success = True
+        except BaseException as e:
+            print(f"    [ERROR] Error processing {input_path.name}: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            success = False
+        finally:
+            profiler.close()
+    return success, log_buffer.getvalue(), outputs, profiler.timings, profiler.kernel_cache_stats()
+
+@dataclass
+class BatchFileResult:
+    """Outcome of one file processed by PipelinedExecutor."""
+
+    index: int
+    input_path: Path
+    output_path: Path
+    success: bool = True
+    log: str = ''
+    timings: List[StageTiming] = field(default_factory=list)
+    kernel_cache: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    audio_data: Optional[np.ndarray] = None
+    sample_rate: int = 0
+    outputs: List[RenderedOutput] = field(default_factory=list)
+    whole_file: bool = False
+
+class PipelinedExecutor:
+    """
+    Batch executor that overlaps decode, DSP and encode across files.
+
+    Decode and encode run in I/O threads of this process (libsndfile releases the GIL
+    while it reads and writes) and DSP runs in a pool of worker processes. Bounded
+    queues connect the three stages. Decode threads prefetch the next files until
+    `prefetch` decoded buffers are waiting for a DSP worker. DSP results wait in a
+    queue of the same size for an encode thread. So at most about
+    jobs + 2 * (prefetch + io_threads) files are held in memory, whatever the batch size.
+
+    Files long enough to be streamed go to the pool whole: process_audio_file decodes
+    and encodes them block by block itself.
+
+    Use run() to process work items, then report() for throughput and how busy each
+    stage was. Pass a pool to reuse its warm worker processes across runs (watch
+    mode); otherwise each run starts and stops its own.
+    """
+
+    def __init__(
+        self,
+        process_kwargs: dict,
+        jobs: int,
+        io_threads: int = DEFAULT_IO_THREADS,
+        prefetch: Optional[int] = DEFAULT_PREFETCH,
+        profile: bool = False,
+        pool: Optional[ProcessPoolExecutor] = None
+    ):
+        self.process_kwargs = process_kwargs
+        self.params = get_effective_parameters(process_kwargs)
+        self.jobs = max(1, jobs)
+        self.io_threads = max(1, io_threads)
+        self.prefetch = max(1, prefetch if prefetch is not None else self.jobs)
+        self.profile = profile
+        self.pool = pool
+        self.busy_seconds = {'decode': 0.0, 'dsp': 0.0, 'encode': 0.0}
+        self.wall_seconds = 0.0
+        self.files_done = 0
+        self._busy_lock = threading.Lock()
+
+    def run(self, work_items: Iterable[Tuple[int, Path, Path]]) -> Iterator[BatchFileResult]:
+        """
+        Process (index, input_path, output_path) work items.
+
+        work_items may be a lazy iterator (such as a running directory scan); the decode
+        threads pull from it under a lock of its own as they need more files, so a slow
+        scan (or cache hashing) never holds up the DSP and encode threads.
+
+        Yields:
+            One BatchFileResult per file, in completion order
+
+        Raises:
+            Exception: Whatever work_items raised, once the files already taken from it
+                       have been yielded
+        """
+        pending = iter(work_items)
+        pending_lock = threading.Lock()
+        scan_errors: List[Exception] = []
+        decoded = queue.Queue(maxsize=self.prefetch)
+        rendered = queue.Queue(maxsize=self.prefetch)
+        finished = queue.Queue()
+        start = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            pool = self.pool if self.pool is not None else stack.enter_context(ProcessPoolExecutor(max_workers=self.jobs))
+            self._start_stage(lambda: self._decode_loop(pending, pending_lock, scan_errors, decoded),
+                              self.io_threads, decoded, self.jobs)
+            self._start_stage(lambda: self._dsp_loop(pool, decoded, rendered), self.jobs, rendered, self.io_threads)
+            self._start_stage(lambda: self._encode_loop(rendered, finished), self.io_threads, finished, 1)
+            while True:
+                result = finished.get()
+                if result is None:
+                    break
+                self.files_done += 1
+                yield result
+        self.wall_seconds += time.perf_counter() - start
+        if scan_errors:
+            raise scan_errors[0]
+
+    def report(self) -> None:
+        """Print throughput and the share of time each stage's workers were busy."""
+        if self.wall_seconds <= 0:
+            return
+        workers = {'decode': (self.io_threads, 'I/O thread(s)'), 'dsp': (self.jobs, 'worker(s)'),
+                   'encode': (self.io_threads, 'I/O thread(s)')}
+        print(f"  Throughput: {self.files_done} file(s) in {self.wall_seconds:.2f}s "
+              f"({self.files_done / self.wall_seconds:.2f} files/s)")
+        print("  Stage utilization: " + ", ".join(
+            f"{stage} {self.busy_seconds[stage] / (self.wall_seconds * count):.0%} ({count} {label})"
+            for stage, (count, label) in workers.items()
+        ))
+
+    @staticmethod
+    def _start_stage(loop: Callable[[], None], count: int, downstream: queue.Queue, consumers: int) -> None:
+        """Run `count` threads of a stage loop; once all finish, send one end marker per downstream consumer."""
+        threads = [threading.Thread(target=loop, daemon=True) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+
+        def close() -> None:
+            for thread in threads:
+                thread.join()
+            for _ in range(consumers):
+                downstream.put(None)
+
+        threading.Thread(target=close, daemon=True).start()
+
+    def _add_busy(self, stage: str, seconds: float) -> None:
+        with self._busy_lock:
+            self.busy_seconds[stage] += seconds
+
+    def _decode_loop(
+        self,
+        pending: Iterator[Tuple[int, Path, Path]],
+        pending_lock: threading.Lock,
+        scan_errors: List[Exception],
+        decoded: queue.Queue
+    ) -> None:
+        while True:
+            with pending_lock:
+                if scan_errors:
+                    return  # The scan failed in another decode thread
+                try:
+                    work_item = next(pending, None)
+                except Exception as e:
+                    # run() re-raises it once the files already in flight are done
+                    scan_errors.append(e)
+                    return
+            if work_item is None:
+                return
+            item = BatchFileResult(*work_item)
+            wall_start, cpu_start = time.perf_counter(), time.thread_time()
+            item.log = f"  Loading: {item.input_path.name}\n"
+            try:
+                threshold = self.params['streaming_threshold_sec']
+                if threshold is not None and self.params['pipeline_config'] is None:
+                    info = sf.info(str(item.input_path))
+                    item.whole_file = info.frames >= threshold * info.samplerate
+                if item.whole_file:
+                    item.log = ''  # process_audio_file logs the whole file in the worker
+                else:
+                    item.audio_data, item.sample_rate = load_audio_file(
+                        item.input_path, always_2d=True, dtype=self.params['precision']
+                    )
+                    item.log += describe_decoded_audio(item.audio_data, item.sample_rate) + "\n"
+            except Exception as e:
+                item.log += f"    [ERROR] Error processing {item.input_path.name}: {str(e)}\n"
+                item.success = False
+            seconds = time.perf_counter() - wall_start
+            if not item.whole_file:
+                item.timings.append(StageTiming('decode', seconds, time.thread_time() - cpu_start, _peak_rss_mb()))
+            self._add_busy('decode', seconds)
+            decoded.put(item)
+
+    def _dsp_loop(self, pool: ProcessPoolExecutor, decoded: queue.Queue, rendered: queue.Queue) -> None:
+        while True:
+            item = decoded.get()
+            if item is None:
+                return
+            if item.success:
+                wall_start = time.perf_counter()
+                try:
+                    if item.whole_file:
+                        future = pool.submit(
+                            _process_file_task, item.input_path, item.output_path, self.process_kwargs, self.profile
+                        )
+                        item.success, log, timings, item.kernel_cache = future.result()
+                    else:
+                        future = pool.submit(
+                            _render_file_task, item.input_path, item.output_path, item.audio_data,
+                            item.sample_rate, self.process_kwargs, self.profile
+                        )
+                        item.audio_data = None
+                        item.success, log, item.outputs, timings, item.kernel_cache = future.result()
+                    item.log += log
+                    item.timings.extend(timings)
+                except Exception as e:
+                    item.log += f"    [ERROR] Worker process failed on {item.input_path.name}: {str(e)}\n"
+                    item.success = False
+                item.audio_data = None
+                self._add_busy('dsp', time.perf_counter() - wall_start)
+            rendered.put(item)
+
+    def _encode_loop(self, rendered: queue.Queue, finished: queue.Queue) -> None:
+        while True:
+            item = rendered.get()
+            if item is None:
+                return
+            for output in item.outputs:
+                if not item.success:
+                    break
+                wall_start, cpu_start = time.perf_counter(), time.thread_time()
+                try:
+                    check = save_rendered_output(output, self.params['seam_check'])
+                    item.log += describe_seam_check(output.path.name, check) + "\n"
+                except Exception as e:
+                    item.log += f"    [ERROR] Error processing {item.input_path.name}: {str(e)}\n"
+                    item.success = False
+                seconds = time.perf_counter() - wall_start
+                item.timings.append(StageTiming('encode', seconds, time.thread_time() - cpu_start, _peak_rss_mb()))
+                self._add_busy('encode', seconds)
+            item.outputs = []
+            finished.put(item)
+
+def write_profile_report(
+    report_path: Path,
+    file_profiles: List[dict]
+) -> Tuple[List[dict], Dict[str, Dict[str, int]]]:
+    """
+    Write the per-file, per-stage profile report and compute the per-stage totals.
+
+    A .csv path gets one row per file and stage; anything else is written as JSON
+    with the per-file records, the per-stage summary and the kernel cache totals.
+
+    Args:
+        report_path: Destination file (.json or .csv)
+        file_profiles: One {"file", "success", "stages": [StageTiming, ...], "kernel_cache": {...}}
+                       record per processed file
+
+    Returns:
+        Tuple of (per-stage summary rows sorted by total wall time, kernel cache hits/misses per kind)
+    """
+    totals = {}
+    for record in file_profiles:
+        for timing in record['stages']:
+            row = totals.setdefault(timing.name, {
+                'stage': timing.name, 'count': 0, 'total_seconds': 0.0, 'total_cpu_seconds': 0.0,
+                'max_seconds': 0.0, 'max_peak_rss_mb': None, 'max_peak_traced_mb': None
+            })
+            row['count'] += 1
+            row['total_seconds'] += timing.seconds
+            row['total_cpu_seconds'] += timing.cpu_seconds
+            row['max_seconds'] = max(row['max_seconds'], timing.seconds)
+            for key, value in (('max_peak_rss_mb', timing.peak_rss_mb), ('max_peak_traced_mb', timing.peak_traced_mb)):
+                if value is not None:
+                    row[key] = value if row[key] is None else max(row[key], value)
+    summary = sorted(totals.values(), key=lambda row: row['total_seconds'], reverse=True)
+
+    cache_totals = {}
+    for record in file_profiles:
+        for kind, counts in record['kernel_cache'].items():
+            total = cache_totals.setdefault(kind, {'hits': 0, 'misses': 0})
+            total['hits'] += counts['hits']
+            total['misses'] += counts['misses']
+
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    if report_path.suffix.lower() == '.csv':
+        with open(report_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['file', 'success', 'stage', 'seconds', 'cpu_seconds', 'peak_rss_mb', 'peak_traced_mb'])
+            for record in file_profiles:
+                for timing in record['stages']:
+                    writer.writerow([record['file'], record['success'], timing.name, f"{timing.seconds:.6f}",
+                                     f"{timing.cpu_seconds:.6f}", timing.peak_rss_mb, timing.peak_traced_mb])
+    else:
+        report = {
+            'files': [
+                {
+                    'file': record['file'],
+                    'success': record['success'],
+                    'total_seconds': sum(t.seconds for t in record['stages']),
+                    'stages': [asdict(t) for t in record['stages']],
+                    'kernel_cache': record['kernel_cache']
+                }
+                for record in file_profiles
+            ],
+            'summary': summary,
+            'kernel_cache': cache_totals
+        }
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return summary, cache_totals
+
+def profile_single_file(input_path: Path, stats_path: Path, process_kwargs: dict, top: int = 25) -> None:
+    """
+    Re-run one file under cProfile, dump the stats and print the top functions.
+
+    The file is rendered into a temporary directory so the real output and its cache
+    entry are left untouched.
+
+    Args:
+        input_path: Path to input audio file
+        stats_path: Destination of the pstats dump (open with `python -m pstats`)
+        process_kwargs: Keyword arguments forwarded to process_audio_file
+        top: Number of functions to print, by cumulative time
+    """
+    with tempfile.TemporaryDirectory(prefix='hqabp_profile_') as temp_dir:
+        profile = cProfile.Profile()
+        with contextlib.redirect_stdout(io.StringIO()):
+            profile.runcall(process_audio_file, input_path, Path(temp_dir) / input_path.name, **process_kwargs)
+    stats_path.parent.mkdir(parents=True, exist_ok=True)
+    profile.dump_stats(str(stats_path))
+    stats = pstats.Stats(profile)
+    stats.sort_stats('cumulative').print_stats(top)
+
+def _analyze_file_task(input_path: Path, name: str, analysis_kwargs: dict) -> AudioAnalysis:
+    """
+    Worker entry point for --analyze: analyze one file, recording a failure instead of raising it.
+    """
+    start = time.perf_counter()
+    try:
+        result = analyze_audio_file(input_path, **analysis_kwargs)
+    except Exception as e:
+        result = AudioAnalysis(error=str(e) or type(e).__name__, analysis_seconds=time.perf_counter() - start)
+    result.file = name
+    return result
+
+def write_analysis_report(report_path: Path, analyses: List[AudioAnalysis]) -> dict:
+    """
+    Write the --analyze report and return its summary.
+
+    A .csv path gets one row per file; anything else is written as JSON with the
+    per-file records and the summary.
+
+    Args:
+        report_path: Destination file (.json or .csv)
+        analyses: One AudioAnalysis per file, in report order
+
+    Returns:
+        Summary with the file and failure counts, files per character label, the
+        total audio duration and the total analysis time
+    """
+    analyzed = [analysis for analysis in analyses if analysis.error is None]
+    labels = sorted({analysis.character for analysis in analyzed})
+    summary = {
+        'files': len(analyses),
+        'failed': len(analyses) - len(analyzed),
+        'characters': {label: sum(analysis.character == label for analysis in analyzed) for label in labels},
+        'total_duration_sec': sum(analysis.duration_sec for analysis in analyzed),
+        'total_analysis_seconds': sum(analysis.analysis_seconds for analysis in analyses)
+    }
+
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    if report_path.suffix.lower() == '.csv':
+        columns = [analysis_field.name for analysis_field in fields(AudioAnalysis)]
+        with open(report_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for analysis in analyses:
+                writer.writerow(['' if value is None else value for value in (getattr(analysis, name) for name in columns)])
+    else:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': [asdict(analysis) for analysis in analyses], 'summary': summary}, f, indent=2)
+    return summary
+
+def run_analysis(
+    input_files: Iterable[Path],
+    input_dir: Path,
+    report_path: Path,
+    analysis_kwargs: dict,
+    jobs: int
+) -> Tuple[int, int]:
+    """
+    Analyze files as they are found (in a process pool if jobs > 1) and write the report.
+
+    Each file prints one summary line as it completes; the report lists the files in
+    the order they were found.
+
+    Args:
+        input_files: Audio files to analyze
+        input_dir: Directory the report's file names are relative to
+        report_path: Report destination (.json or .csv)
+        analysis_kwargs: Keyword arguments for analyze_audio_file (precision and trim settings)
+        jobs: Worker processes
+
+    Returns:
+        Tuple of (files found, files that failed)
+    """
+    start = time.perf_counter()
+    results: Dict[int, AudioAnalysis] = {}
+
+    def report(index: int, analysis: AudioAnalysis) -> None:
+        results[index] = analysis
+        print(f"[{index}] {analysis.file}: {analysis.describe()}")
+
+    def report_completed(future: Future, index: int, name: str) -> None:
+        try:
+            analysis = future.result()
+        except Exception as e:
+            # A crashed worker (e.g. killed for running out of memory) fails its file, not the report
+            analysis = AudioAnalysis(file=name, error=f"Worker process failed: {str(e) or type(e).__name__}")
+        report(index, analysis)
+
+    work_items = (
+        (index, input_file, input_file.relative_to(input_dir).as_posix())
+        for index, input_file in enumerate(input_files, start=1)
+    )
+    if jobs == 1:
+        for index, input_file, name in work_items:
+            report(index, _analyze_file_task(input_file, name, analysis_kwargs))
+    else:
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        try:
+            futures = {}
+            for index, input_file, name in work_items:
+                try:
+                    future = pool.submit(_analyze_file_task, input_file, name, analysis_kwargs)
+                except BrokenProcessPool:
+                    # The files in flight when a worker died have failed; fresh workers take the rest
+                    pool.shutdown(wait=False)
+                    pool = ProcessPoolExecutor(max_workers=jobs)
+                    future = pool.submit(_analyze_file_task, input_file, name, analysis_kwargs)
+                futures[future] = (index, name)
+                if len(futures) >= 2 * jobs:
+                    for future in wait(futures, return_when=FIRST_COMPLETED).done:
+                        report_completed(future, *futures.pop(future))
+            for future in as_completed(list(futures)):
+                report_completed(future, *futures.pop(future))
+        finally:
+            pool.shutdown()
+
+    if not results:
+        return 0, 0
+    analyses = [results[index] for index in sorted(results)]
+    summary = write_analysis_report(report_path, analyses)
+    wall_seconds = time.perf_counter() - start
+    print("\n" + "=" * 70)
+    print("Analysis complete!")
+    print(f"  Files: {summary['files']}")
+    print(f"  Failed: {summary['failed']}")
+    if summary['characters']:
+        print("  Character: " + ", ".join(f"{count} {label}" for label, count in summary['characters'].items()))
+    print(f"  Audio: {summary['total_duration_sec']:.1f} s analyzed in {wall_seconds:.2f} s"
+          + (f" ({summary['total_duration_sec'] / wall_seconds:.0f}x realtime)" if wall_seconds > 0 else ""))
+    print(f"  Report: {report_path}")
+    print("=" * 70)
+    return summary['files'], summary['failed']
 
-        # Universal loop stabilization stage (final step before saving)
-        if enable_loop_stabilization:
-            print(f"    Applying loop stabilization (target duration: {target_duration_sec or 'auto'}s)...")
-            audio_data = stabilize_loop(
-                audio_data,
-                sample_rate,
-                target_duration_sec=target_duration_sec
-            )
-        stem = output_path.stem
-        output_wav_path = output_path.parent / f"{stem}_processed.wav"
-        save_audio_file(audio_data, sample_rate, output_wav_path)
+class BatchRunner:
+    """
+    Renders batches of files for the command line and keeps the run's totals.
 
-        print(f"    [OK] Saved: {output_wav_path.name}")
-        return True
+    One runner serves the initial scan and, in watch mode, every later batch of
+    changes: it holds the success/failure counters, the cache manifest and a single
+    worker pool, so watch mode keeps the same warm workers between batches. Files run
+    in a PipelinedExecutor with pipelined_io, in the pool with several jobs, or in this
+    process otherwise.
 
-    except Exception as e:
-        print(f"    [ERROR] Error processing {input_path.name}: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return False
+    Args:
+        input_dir: Directory the inputs (and the cache manifest's entry names) are relative to
+        output_dir: Directory the outputs mirror the input tree into
+        process_kwargs: Keyword arguments for process_audio_file
+        jobs: Worker processes
+        use_cache: Skip files the cache manifest says are up to date
+        pipelined_io: Overlap decode, DSP and encode (see PipelinedExecutor)
+        io_threads: Decode and encode threads of the pipelined executor
+        prefetch: Files decoded ahead of the DSP workers (None = one per worker)
+        profile: Record per-stage timings of every file
+        watch: Leave Ctrl+C to this process (the pool is kept alive between batches)
+    """
 
-def main():
+    def __init__(
+        self,
+        input_dir: Path,
+        output_dir: Path,
+        process_kwargs: dict,
+        jobs: int,
+        use_cache: bool = DEFAULT_USE_CACHE,
+        pipelined_io: bool = DEFAULT_PIPELINED_IO,
+        io_threads: int = DEFAULT_IO_THREADS,
+        prefetch: Optional[int] = DEFAULT_PREFETCH,
+        profile: bool = False,
+        watch: bool = False
+    ):
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.process_kwargs = process_kwargs
+        self.output_targets = process_kwargs.get('output_targets')
+        self.jobs = jobs
+        self.use_cache = use_cache
+        self.profile = profile
+        self.found = 0
+        self.successful = 0
+        self.failed = 0
+        self.skipped = 0
+        self.scan_complete = False
+        self.file_profiles = []
+        self._cache_keys = {}
+        self.manifest = load_cache_manifest(output_dir) if use_cache else {'entries': {}}
+        self._effective_params = get_effective_parameters(process_kwargs) if use_cache else None
+        self.pool = None
+        if pipelined_io or jobs > 1:
+            self.pool = ProcessPoolExecutor(max_workers=jobs, initializer=_ignore_interrupts if watch else None)
+        self.executor = None
+        if pipelined_io:
+            # Decode/encode overlap in I/O threads here; worker processes only run DSP
+            self.executor = PipelinedExecutor(process_kwargs, jobs, io_threads, prefetch, profile, pool=self.pool)
+
+    def discover(self, input_files: Iterable[Path]) -> Iterator[Tuple[int, Path, Path]]:
+        """Yield (index, input, output) work items as input_files are found, dropping files the cache says are up to date."""
+        for input_file in input_files:
+            self.found += 1
+            i = self.found
+            relative_path = input_file.relative_to(self.input_dir)
+            output_file = self.output_dir / relative_path
+            if self.use_cache:
+                entry_name = relative_path.as_posix()
+                entry = self.manifest['entries'].get(entry_name)
+                try:
+                    cache_key, content_hash, input_stat = compute_cache_key(input_file, self._effective_params, entry)
+                except OSError as e:
+                    print(f"  Warning: could not hash {input_file.name} ({str(e)}), processing without cache")
+                else:
+                    if is_cache_hit(entry, cache_key, get_output_files(output_file, self.output_targets)):
+                        self.skipped += 1
+                        continue
+                    self._cache_keys[i] = (entry_name, cache_key, content_hash, input_stat)
+            yield i, input_file, output_file
+        self.scan_complete = True
+
+    def run(self, work_items: Iterable[Tuple[int, Path, Path]]) -> None:
+        """Process work items (see discover), printing each file's log as it completes."""
+        if self.executor is not None:
+            for result in self.executor.run(work_items):
+                print(f"\n{self._progress(result.index)} Processing: {result.input_path.name}")
+                print(result.log, end='')
+                self._record_result(result.index, result.input_path, result.output_path, result.success,
+                                    result.timings, result.kernel_cache)
+        elif self.pool is None:
+            for i, input_file, output_file in work_items:
+                print(f"\n{self._progress(i)} Processing: {input_file.name}")
+                profiler = StageProfiler(trace_memory=self.profile)
+                try:
+                    success = process_audio_file(input_file, output_file, profiler=profiler, **self.process_kwargs)
+                finally:
+                    profiler.close()
+                self._record_result(i, input_file, output_file, success, profiler.timings,
+                                    profiler.kernel_cache_stats())
+        else:
+            # Each worker process imports numpy/scipy/pyloudnorm once and is reused for
+            # many files. Logs are captured per file and printed as one block on completion.
+            # Submission keeps a few files per worker in flight so results print while the scan continues.
+            futures = {}
+
+            def report_completed(done) -> None:
+                for future in done:
+                    i, input_file, output_file = futures.pop(future)
+                    print(f"\n{self._progress(i)} Processing: {input_file.name}")
+                    try:
+                        success, log_output, timings, cache_stats = future.result()
+                    except Exception as e:
+                        success, log_output = False, f"    [ERROR] Worker process failed on {input_file.name}: {str(e)}\n"
+                        timings, cache_stats = [], {}
+                    print(log_output, end='')
+                    self._record_result(i, input_file, output_file, success, timings, cache_stats)
+
+            for i, input_file, output_file in work_items:
+                future = self.pool.submit(_process_file_task, input_file, output_file, self.process_kwargs, self.profile)
+                futures[future] = (i, input_file, output_file)
+                if len(futures) >= 2 * self.jobs:
+                    report_completed(wait(futures, return_when=FIRST_COMPLETED).done)
+            report_completed(as_completed(list(futures)))
+
+    def save_manifest(self) -> None:
+        """Write the cache manifest (if the cache is enabled)."""
+        if self.use_cache:
+            save_cache_manifest(self.output_dir, self.manifest)
+
+    def close(self, cancel: bool = False) -> None:
+        """Shut the worker pool down, cancelling queued files if cancel is True."""
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=cancel)
+            self.pool = None
+
+    def print_summary(self) -> None:
+        """Print the batch totals."""
+        print("\n" + "=" * 70)
+        print(f"Batch processing complete!")
+        print(f"  Found: {self.found}")
+        print(f"  Successful: {self.successful}")
+        print(f"  Failed: {self.failed}")
+        if self.use_cache:
+            print(f"  Skipped (unchanged): {self.skipped}")
+        if self.executor is not None:
+            self.executor.report()
+        print(f"  Output directory: {self.output_dir}")
+        print("=" * 70)
+
+    def report_profile(self, report_path: Path, profile_slowest: bool = False) -> None:
+        """Write the --profile report, print its top stages and optionally cProfile the slowest file."""
+        if not self.file_profiles:
+            return
+        summary, cache_totals = write_profile_report(report_path, self.file_profiles)
+        batch_seconds = sum(row['total_seconds'] for row in summary)
+        print("\nTop stages by total time:")
+        print(f"  {'Stage':<16} {'Total':>9} {'Share':>6} {'CPU':>9} {'Max/file':>9} {'Peak RSS':>10} {'Peak alloc':>11}")
+        for row in summary[:10]:
+            share = row['total_seconds'] / batch_seconds if batch_seconds > 0 else 0.0
+            rss = f"{row['max_peak_rss_mb']:.0f} MB" if row['max_peak_rss_mb'] is not None else "n/a"
+            traced = f"{row['max_peak_traced_mb']:.0f} MB" if row['max_peak_traced_mb'] is not None else "n/a"
+            print(f"  {row['stage']:<16} {row['total_seconds']:8.2f}s {share:6.1%} {row['total_cpu_seconds']:8.2f}s "
+                  f"{row['max_seconds']:8.2f}s {rss:>10} {traced:>11}")
+        if cache_totals:
+            print("Kernel cache: " + ", ".join(
+                f"{kind} {counts['hits']} hit(s) / {counts['misses']} miss(es)"
+                for kind, counts in sorted(cache_totals.items())
+            ))
+        print(f"Profile report: {report_path}")
+
+        if profile_slowest:
+            slowest = max(self.file_profiles, key=lambda record: sum(t.seconds for t in record['stages']))
+            stats_path = report_path.with_suffix('.prof')
+            print(f"\ncProfile of slowest file: {slowest['file']}")
+            profile_single_file(slowest['path'], stats_path, self.process_kwargs)
+            print(f"cProfile stats: {stats_path} (view with: python -m pstats {stats_path})")
+
+    def _progress(self, i: int) -> str:
+        # The total is only known once the scan has finished
+        return f"[{i}/{self.found}]" if self.scan_complete else f"[{i}]"
+
+    def _record_result(
+        self,
+        i: int,
+        input_file: Path,
+        output_file: Path,
+        success: bool,
+        timings: List[StageTiming],
+        cache_stats: Dict[str, Dict[str, int]]
+    ) -> None:
+        if self.profile:
+            self.file_profiles.append({
+                'file': input_file.relative_to(self.input_dir).as_posix(),
+                'path': input_file,
+                'success': success,
+                'stages': timings,
+                'kernel_cache': cache_stats
+            })
+        if success:
+            self.successful += 1
+            if i in self._cache_keys:
+                entry_name, cache_key, content_hash, input_stat = self._cache_keys[i]
+                try:
+                    self.manifest['entries'][entry_name] = make_cache_entry(
+                        input_stat, get_output_files(output_file, self.output_targets), cache_key, content_hash
+                    )
+                except OSError:
+                    self.manifest['entries'].pop(entry_name, None)
+        else:
+            self.failed += 1
+
+def run_watch(runner: BatchRunner, watcher: 'DirectoryWatcher') -> None:
+    """
+    Process new or changed files as the watcher reports them, until Ctrl+C.
+
+    Each batch of changes goes through the runner's cache check and warm worker pool.
+    The watcher, the pool and the manifest are closed and saved on the way out.
+    """
+    print(f"\nWatching {runner.input_dir} for new or changed audio files (Ctrl+C to stop)...")
+    try:
+        while True:
+            changed = watcher.wait_for_changes()
+            counts = (runner.successful, runner.failed, runner.skipped)
+            # Hash the batch up front so its progress counter shows the total
+            runner.run(list(runner.discover(changed)))
+            runner.save_manifest()
+            print(
+                f"\n  Watch: {runner.successful - counts[0]} processed, {runner.failed - counts[1]} failed"
+                + (f", {runner.skipped - counts[2]} unchanged" if runner.use_cache else "")
+                + f" ({time.strftime('%H:%M:%S')}); waiting for changes..."
+            )
+    except KeyboardInterrupt:
+        print(f"\nStopped watching. Total: {runner.successful} successful, {runner.failed} failed"
+              + (f", {runner.skipped} skipped (unchanged)" if runner.use_cache else ""))
+    finally:
+        watcher.close()
+        runner.close(cancel=True)
+        runner.save_manifest()
+
+def print_batch_configuration(
+    args: argparse.Namespace,
+    input_dir: Path,
+    output_dir: Path,
+    jobs: int,
+    pipeline_config: Optional[List[dict]],
+    output_targets: Optional[List[dict]],
+    profile_report_path: Optional[Path]
+) -> None:
+    """
+    Print the settings of a batch run before its first file.
+    """
+    print(f"Scanning for audio files in: {input_dir} (processing starts as files are found)")
+    print(f"Output directory: {output_dir}")
+    print(f"Configuration:")
+    if pipeline_config is not None:
+        print(f"  Pipeline: {' -> '.join(entry.get('stage', '?') for entry in pipeline_config)} (from {args.pipeline_config})")
+    print(f"  Trim threshold: {args.trim_threshold_db} dBFS")
+    if args.enable_silence_collapse:
+        print(f"  Interior silence: gaps >= {args.min_silence_ms} ms collapsed to {args.silence_residual_ms:g} ms")
+    else:
+        print("  Interior silence: Kept")
+    if args.xfade_duration_ms:
+        print(f"  Crossfade: {args.xfade_duration_ms} ms (EPCF, pre-normalize disabled)")
+    else:
+        print(f"  Crossfade: Disabled")
+    if args.use_peak_normalization:
+        print(f"  Normalization: Peak to {args.target_lufs} dBFS (preserves transients)")
+    else:
+        print(f"  Normalization: LUFS to {args.target_lufs} (ITU-R BS.1770)")
+    print(f"  Max peak: {args.max_peak_dbfs} dBFS (True Peak limit)")
+    if args.enable_noise_reduction:
+        print(f"  Noise reduction: threshold {args.noise_gate_threshold_db} dBFS, reduction {args.noise_reduction_db} dB, window {args.noise_gate_window_ms} ms")
+    else:
+        print("  Noise reduction: Disabled")
+    print(f"  Seamless loop enforcement: {'Enabled' if args.enforce_seamless_loop else 'Disabled'}")
+    if args.enforce_seamless_loop:
+        print(f"  Mirror blended seam onto start: {'Yes' if args.mirror_loop_start else 'No'}")
+    print(f"  Loop stabilization: {'Enabled' if args.enable_loop_stabilization else 'Disabled'}")
+    if args.enable_loop_stabilization:
+        print(f"  Target duration: {args.target_duration_sec or 'auto'} seconds")
+        print(
+            f"  Seam alignment: {args.loop_comparison_window_ms:g} ms window, shifts up to "
+            f"{args.loop_max_shift_ms:g} ms at correlation >= {args.loop_min_correlation:g}"
+        )
+    if args.streaming_threshold_sec is not None:
+        print(f"  Streaming: files >= {args.streaming_threshold_sec:g} s ({args.stream_block_sec:g} s blocks)")
+    else:
+        print("  Streaming: Disabled")
+    print(f"  Precision: {args.precision}")
+    if output_targets:
+        print("  Output targets: " + "; ".join(
+            f"<name>{target.suffix}{OUTPUT_FORMAT_EXTENSIONS[target.format]} ({target.describe()})"
+            for target in parse_output_targets(output_targets)
+        ))
+    print(f"  Encoding: {args.encode_threads} background thread(s), seam check {args.seam_check}")
+    scan_filters = [f"{'sorted' if args.sorted_scan else 'directory'} order"]
+    if args.include:
+        scan_filters.append(f"include {', '.join(args.include)}")
+    if args.exclude:
+        scan_filters.append(f"exclude {', '.join(args.exclude)}")
+    if args.max_depth is not None:
+        scan_filters.append(f"max depth {args.max_depth}")
+    print(f"  Scan: {'; '.join(scan_filters)}")
+    if profile_report_path is not None:
+        print(f"  Profiling: report to {profile_report_path}")
+    print(f"  Worker processes: {jobs}")
+    if args.pipelined_io:
+        print(f"  Pipelined I/O: {args.io_threads} decode + {args.io_threads} encode thread(s), "
+              f"prefetch {args.prefetch or jobs} file(s)")
+    if args.use_cache:
+        print("  Cache: Enabled (unchanged files are skipped as they are found)")
+
+def _resolve_jobs(jobs: Optional[int], num_files: Optional[int] = None) -> int:
     """
-    Main execution block: CLI argument parsing and batch processing orchestration.
+    Resolve the requested worker count (None = CPU count), capped by the number of files if known.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if num_files is not None:
+        jobs = min(jobs, num_files)
+    return max(1, jobs)
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    """
+    Build the command-line parser; every default comes from the CONFIGURATION section.
     """
     parser = argparse.ArgumentParser(
         description='High-Quality Audio Batch Processor (HQABP) - Broadcast-quality DSP',
@@ -1232,7 +5600,27 @@ Examples:
         type=int,
         default=DEFAULT_MIN_SILENCE_MS,
         metavar='MS',
-        help=f'Minimum silence duration to trim in milliseconds (default from config: {DEFAULT_MIN_SILENCE_MS})'
+        help=f'Minimum length of an interior silence to collapse in milliseconds (default from config: {DEFAULT_MIN_SILENCE_MS})'
+    )
+    parser.set_defaults(enable_silence_collapse=DEFAULT_ENABLE_SILENCE_COLLAPSE)
+    parser.add_argument(
+        '--enable_silence_collapse',
+        dest='enable_silence_collapse',
+        action='store_true',
+        help=f'Shorten interior silences of at least --min_silence_ms (default from config: {DEFAULT_ENABLE_SILENCE_COLLAPSE})'
+    )
+    parser.add_argument(
+        '--disable_silence_collapse',
+        dest='enable_silence_collapse',
+        action='store_false',
+        help='Keep interior silences at their original length'
+    )
+    parser.add_argument(
+        '--silence_residual_ms',
+        type=float,
+        default=DEFAULT_SILENCE_RESIDUAL_MS,
+        metavar='MS',
+        help=f'Length a collapsed interior silence is shortened to in milliseconds (default from config: {DEFAULT_SILENCE_RESIDUAL_MS})'
     )
 
     parser.add_argument(
@@ -1338,6 +5726,27 @@ Examples:
         metavar='SECONDS',
         help=f'Target duration in seconds for loop stabilization (use "none" for auto/current length) (default from config: {DEFAULT_TARGET_DURATION_SEC})'
     )
+    parser.add_argument(
+        '--loop_comparison_window_ms',
+        type=float,
+        default=DEFAULT_LOOP_COMPARISON_WINDOW_MS,
+        metavar='MS',
+        help=f'Start/end window compared when aligning the loop seam; can span whole tick periods or seconds of ambience (default from config: {DEFAULT_LOOP_COMPARISON_WINDOW_MS})'
+    )
+    parser.add_argument(
+        '--loop_max_shift_ms',
+        type=float,
+        default=DEFAULT_LOOP_MAX_SHIFT_MS,
+        metavar='MS',
+        help=f'Largest seam realignment searched for, at most a quarter of the comparison window (default from config: {DEFAULT_LOOP_MAX_SHIFT_MS})'
+    )
+    parser.add_argument(
+        '--loop_min_correlation',
+        type=float,
+        default=DEFAULT_LOOP_MIN_CORRELATION,
+        metavar='R',
+        help=f'Normalized correlation (-1..1) the seam must reach before it is shifted (default from config: {DEFAULT_LOOP_MIN_CORRELATION})'
+    )
 
     parser.add_argument(
         '--target_lufs',
@@ -1362,7 +5771,392 @@ Examples:
         help=f'Use peak normalization instead of LUFS (better for clock/timer sounds - preserves transients) (default: {DEFAULT_USE_PEAK_NORMALIZATION})'
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        '--pipeline_config',
+        type=str,
+        default=None,
+        metavar='JSON',
+        help='JSON file with a list of stages ({"stage": <trim|noise_reduction|crossfade|normalize|stabilize>, ...params}) '
+             'that replaces the stage options above'
+    )
+    parser.add_argument(
+        '--output_targets',
+        type=str,
+        default=None,
+        metavar='JSON',
+        help='JSON file with a list of output variants ({"suffix", "format", "subtype", "sample_rate", "target_lufs", '
+             '"compression_level"}) rendered from one decode and analysis pass (default from config: one <name>_processed.wav)'
+    )
+    parser.add_argument(
+        '--output_format',
+        type=str.upper,
+        choices=list(OUTPUT_FORMAT_EXTENSIONS),
+        default=DEFAULT_OUTPUT_FORMAT,
+        help=f'Format of the single <name>_processed file when no output targets are given; FLAC is lossless, '
+             f'OGG is Vorbis (default from config: {DEFAULT_OUTPUT_FORMAT})'
+    )
+    parser.add_argument(
+        '--seam_check',
+        choices=SEAM_CHECK_CHOICES,
+        default=DEFAULT_SEAM_CHECK,
+        help='Decode each written file and compare its loop seam with the rendered audio; lossy files that fail are '
+             f're-encoded once at best quality (default from config: {DEFAULT_SEAM_CHECK})'
+    )
+
+    parser.add_argument(
+        '--streaming_threshold_sec',
+        type=lambda x: None if x.lower() == 'none' else float(x),
+        default=DEFAULT_STREAMING_THRESHOLD_SEC,
+        metavar='SECONDS',
+        help=f'Process files at least this long block by block with constant memory (use "none" to disable) (default from config: {DEFAULT_STREAMING_THRESHOLD_SEC})'
+    )
+    parser.add_argument(
+        '--streaming',
+        action='store_true',
+        help='Stream every file regardless of length (same as --streaming_threshold_sec 0)'
+    )
+    parser.add_argument(
+        '--stream_block_sec',
+        type=float,
+        default=DEFAULT_STREAM_BLOCK_SEC,
+        metavar='SECONDS',
+        help=f'Block length for streaming mode in seconds (default from config: {DEFAULT_STREAM_BLOCK_SEC})'
+    )
+    parser.add_argument(
+        '--precision',
+        choices=PRECISION_CHOICES,
+        default=DEFAULT_PRECISION,
+        help=f'Sample type every buffer is decoded to and processed in; float32 halves memory use (default from config: {DEFAULT_PRECISION})'
+    )
+
+    parser.add_argument(
+        '--include',
+        action='append',
+        default=DEFAULT_INCLUDE_PATTERNS,
+        metavar='GLOB',
+        help='Only process audio files matching this glob; patterns containing / match the path relative to the '
+             f'input directory, others the file name (repeatable, default from config: {DEFAULT_INCLUDE_PATTERNS})'
+    )
+    parser.add_argument(
+        '--exclude',
+        action='append',
+        default=DEFAULT_EXCLUDE_PATTERNS,
+        metavar='GLOB',
+        help=f'Skip files and whole directories matching this glob, matched like --include (repeatable, default from config: {DEFAULT_EXCLUDE_PATTERNS})'
+    )
+    parser.add_argument(
+        '--max_depth',
+        type=int,
+        default=DEFAULT_MAX_DEPTH,
+        metavar='N',
+        help=f'Directory levels scanned below the input directory, 0 = top level only (default from config: {DEFAULT_MAX_DEPTH or "unlimited"})'
+    )
+    parser.set_defaults(sorted_scan=DEFAULT_SORTED_SCAN)
+    parser.add_argument(
+        '--enable_sorted_scan',
+        dest='sorted_scan',
+        action='store_true',
+        help=f'Walk directories in sorted order so files are numbered and processed deterministically (default from config: {DEFAULT_SORTED_SCAN})'
+    )
+    parser.add_argument(
+        '--disable_sorted_scan',
+        dest='sorted_scan',
+        action='store_false',
+        help='Process files in the order the file system lists them, which is fastest on large trees'
+    )
+
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=DEFAULT_JOBS,
+        metavar='N',
+        help=f'Number of worker processes for batch processing (default from config: {DEFAULT_JOBS or "CPU count"}; 1 = sequential)'
+    )
+
+    parser.set_defaults(pipelined_io=DEFAULT_PIPELINED_IO)
+    parser.add_argument(
+        '--enable_pipelined_io',
+        dest='pipelined_io',
+        action='store_true',
+        help=f'Decode and encode in I/O threads, prefetching the next files, while worker processes run only DSP (default from config: {DEFAULT_PIPELINED_IO})'
+    )
+    parser.add_argument(
+        '--disable_pipelined_io',
+        dest='pipelined_io',
+        action='store_false',
+        help='Let each worker process decode, process and encode its own files'
+    )
+    parser.add_argument(
+        '--io_threads',
+        type=int,
+        default=DEFAULT_IO_THREADS,
+        metavar='N',
+        help=f'Decode threads and encode threads (N each) for --enable_pipelined_io (default from config: {DEFAULT_IO_THREADS})'
+    )
+    parser.add_argument(
+        '--encode_threads',
+        type=int,
+        default=DEFAULT_ENCODE_THREADS,
+        metavar='N',
+        help=f'Output files encoded in the background while the next one is rendered (default from config: {DEFAULT_ENCODE_THREADS})'
+    )
+    parser.add_argument(
+        '--prefetch',
+        type=int,
+        default=DEFAULT_PREFETCH,
+        metavar='N',
+        help=f'Decoded files queued ahead of the DSP workers with --enable_pipelined_io (default from config: {DEFAULT_PREFETCH or "one per worker"})'
+    )
+
+    parser.set_defaults(use_cache=DEFAULT_USE_CACHE)
+    parser.add_argument(
+        '--enable_cache',
+        dest='use_cache',
+        action='store_true',
+        help=f'Skip files whose input content and parameters are unchanged since the last run (default from config: {DEFAULT_USE_CACHE})'
+    )
+    parser.add_argument(
+        '--disable_cache',
+        dest='use_cache',
+        action='store_false',
+        help=f'Re-render every file and leave the {CACHE_MANIFEST_NAME} manifest untouched'
+    )
+
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        default=DEFAULT_WATCH,
+        help='After the batch, keep the worker pool running and process audio files that are added to or '
+             f'changed in the input directory until Ctrl+C (default from config: {DEFAULT_WATCH})'
+    )
+    parser.add_argument(
+        '--watch_settle_sec',
+        type=float,
+        default=DEFAULT_WATCH_SETTLE_SEC,
+        metavar='SECONDS',
+        help='Seconds a new or changed file must keep its size and modification time before it is '
+             f'processed, so files still being written are skipped (default from config: {DEFAULT_WATCH_SETTLE_SEC})'
+    )
+    parser.set_defaults(watch_use_inotify=DEFAULT_WATCH_USE_INOTIFY)
+    parser.add_argument(
+        '--enable_inotify',
+        dest='watch_use_inotify',
+        action='store_true',
+        help=f'Notice changes through Linux inotify, polling where it is unavailable (default from config: {DEFAULT_WATCH_USE_INOTIFY})'
+    )
+    parser.add_argument(
+        '--disable_inotify',
+        dest='watch_use_inotify',
+        action='store_false',
+        help='Always poll, e.g. for network shares whose remote changes inotify does not see'
+    )
+    parser.add_argument(
+        '--watch_poll_sec',
+        type=float,
+        default=DEFAULT_WATCH_POLL_SEC,
+        metavar='SECONDS',
+        help=f'Rescan interval when polling (default from config: {DEFAULT_WATCH_POLL_SEC})'
+    )
+
+    parser.add_argument(
+        '--analyze',
+        action='store_true',
+        default=DEFAULT_ANALYZE,
+        help='Only measure each file (loudness, sample and true peak, trimmed duration, tick period and jitter, '
+             'character, loop seam) and write a report; no audio is written '
+             f'(default from config: {DEFAULT_ANALYZE})'
+    )
+    parser.add_argument(
+        '--analysis_report',
+        type=str,
+        default=None,
+        metavar='PATH',
+        help=f'Analysis report file, .json or .csv (default: <output_dir>/{DEFAULT_ANALYSIS_REPORT_NAME}; implies --analyze)'
+    )
+
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        default=DEFAULT_SERVE,
+        help='Instead of processing a directory, run a local HTTP service: POST an audio file to /process '
+             '(query parameters override the options given here) and get the processed file back; '
+             f'GET /metrics for latency histograms (default from config: {DEFAULT_SERVE})'
+    )
+    parser.add_argument(
+        '--serve_host',
+        type=str,
+        default=DEFAULT_SERVE_HOST,
+        help=f'Interface the service listens on (default from config: {DEFAULT_SERVE_HOST})'
+    )
+    parser.add_argument(
+        '--serve_port',
+        type=int,
+        default=DEFAULT_SERVE_PORT,
+        help=f'Port the service listens on, 0 for any free port (default from config: {DEFAULT_SERVE_PORT})'
+    )
+    parser.add_argument(
+        '--serve_queue_size',
+        type=int,
+        default=DEFAULT_SERVE_QUEUE_SIZE,
+        help='Requests admitted beyond one per worker; further requests are refused with 429 '
+             f'(default from config: {DEFAULT_SERVE_QUEUE_SIZE})'
+    )
+    parser.add_argument(
+        '--serve_timeout_sec',
+        type=float,
+        default=DEFAULT_SERVE_TIMEOUT_SEC,
+        metavar='SECONDS',
+        help='Time a request may take from admission to its processed result before it gets 504 '
+             f'(default from config: {DEFAULT_SERVE_TIMEOUT_SEC})'
+    )
+    parser.add_argument(
+        '--serve_max_upload_mb',
+        type=float,
+        default=DEFAULT_SERVE_MAX_UPLOAD_MB,
+        metavar='MB',
+        help=f'Largest accepted upload; larger ones get 413 (default from config: {DEFAULT_SERVE_MAX_UPLOAD_MB})'
+    )
+
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Record wall time, CPU time, peak RSS and tracemalloc peak for every stage of every file '
+             '(decode, DSP stages, encode) and print the slowest stages at the end'
+    )
+    parser.add_argument(
+        '--profile_report',
+        type=str,
+        default=None,
+        metavar='PATH',
+        help=f'Profile report file, .json or .csv (default: <output_dir>/{DEFAULT_PROFILE_REPORT_NAME}; implies --profile)'
+    )
+    parser.add_argument(
+        '--profile_slowest',
+        action='store_true',
+        help='After the batch, re-run the slowest file under cProfile and dump its stats next to the report (implies --profile)'
+    )
+    return parser
+
+def main():
+    """
+    Main execution block: parse and validate the arguments, then run the service, the
+    analysis or the batch (and watch mode) they ask for.
+    """
+    args = build_argument_parser().parse_args()
+
+    if args.profile_report or args.profile_slowest:
+        args.profile = True
+    if args.analysis_report:
+        args.analyze = True
+
+    if args.streaming:
+        args.streaming_threshold_sec = 0.0
+
+    pipeline_config = None
+    if args.pipeline_config:
+        try:
+            with open(args.pipeline_config, 'r', encoding='utf-8') as f:
+                pipeline_config = json.load(f)
+            if not isinstance(pipeline_config, list):
+                raise ValueError("expected a JSON list of stage objects")
+            Pipeline.from_config(pipeline_config)
+        except (OSError, ValueError) as e:
+            print(f"Error: Invalid pipeline config {args.pipeline_config}: {str(e)}")
+            sys.exit(1)
+
+    output_targets = DEFAULT_OUTPUT_TARGETS
+    if args.output_targets:
+        try:
+            with open(args.output_targets, 'r', encoding='utf-8') as f:
+                output_targets = json.load(f)
+            if not isinstance(output_targets, list):
+                raise ValueError("expected a JSON list of output target objects")
+        except (OSError, ValueError) as e:
+            print(f"Error: Invalid output targets {args.output_targets}: {str(e)}")
+            sys.exit(1)
+    if not output_targets and args.output_format != 'WAV':
+        output_targets = [{'format': args.output_format}]
+    if output_targets:
+        try:
+            parse_output_targets(output_targets)
+        except ValueError as e:
+            print(f"Error: Invalid output targets: {str(e)}")
+            sys.exit(1)
+
+    if args.jobs is not None and args.jobs < 1:
+        print(f"Error: --jobs must be at least 1 (got {args.jobs})")
+        sys.exit(1)
+    if args.max_depth is not None and args.max_depth < 0:
+        print(f"Error: --max_depth must be at least 0 (got {args.max_depth})")
+        sys.exit(1)
+    if args.watch_settle_sec < 0 or args.watch_poll_sec <= 0:
+        print("Error: --watch_settle_sec must be at least 0 and --watch_poll_sec greater than 0")
+        sys.exit(1)
+    if args.analyze and (args.watch or args.serve):
+        print("Error: --analyze cannot be combined with --watch or --serve")
+        sys.exit(1)
+    if args.serve and (args.serve_queue_size < 0 or args.serve_timeout_sec <= 0 or args.serve_max_upload_mb <= 0
+                       or not 0 <= args.serve_port <= 65535):
+        print("Error: --serve_queue_size must be at least 0, --serve_timeout_sec and --serve_max_upload_mb "
+              "greater than 0 and --serve_port between 0 and 65535")
+        sys.exit(1)
+    if args.encode_threads < 1:
+        print(f"Error: --encode_threads must be at least 1 (got {args.encode_threads})")
+        sys.exit(1)
+    if args.io_threads < 1 or (args.prefetch is not None and args.prefetch < 1):
+        print("Error: --io_threads and --prefetch must be at least 1")
+        sys.exit(1)
+
+    process_kwargs = dict(
+        trim_threshold_db=args.trim_threshold_db,
+        min_silence_ms=args.min_silence_ms,
+        enable_silence_collapse=args.enable_silence_collapse,
+        silence_residual_ms=args.silence_residual_ms,
+        xfade_duration_ms=args.xfade_duration_ms,
+        target_lufs=args.target_lufs,
+        max_peak_dbfs=args.max_peak_dbfs,
+        use_peak_normalization=args.use_peak_normalization,
+        enable_noise_reduction=args.enable_noise_reduction,
+        noise_gate_threshold_db=args.noise_gate_threshold_db,
+        noise_reduction_db=args.noise_reduction_db,
+        noise_gate_window_ms=args.noise_gate_window_ms,
+        noise_gate_attack_ms=args.noise_gate_attack_ms,
+        noise_gate_release_ms=args.noise_gate_release_ms,
+        enforce_seamless_loop=args.enforce_seamless_loop,
+        mirror_loop_start=args.mirror_loop_start,
+        enable_loop_stabilization=args.enable_loop_stabilization,
+        target_duration_sec=args.target_duration_sec,
+        loop_comparison_window_ms=args.loop_comparison_window_ms,
+        loop_max_shift_ms=args.loop_max_shift_ms,
+        loop_min_correlation=args.loop_min_correlation,
+        streaming_threshold_sec=args.streaming_threshold_sec,
+        stream_block_sec=args.stream_block_sec,
+        precision=args.precision,
+        output_targets=output_targets,
+        encode_threads=args.encode_threads,
+        seam_check=args.seam_check,
+        pipeline_config=pipeline_config
+    )
+
+    # Import only the libraries this run's stages use (before any worker processes start)
+    try:
+        load_modules(ANALYSIS_MODULES if args.analyze else ProcessorConfig(**process_kwargs).required_modules())
+    except ImportError as e:
+        print("Error: Required libraries are not installed.")
+        print("Please run: pip install -r requirements.txt")
+        print(f"Missing: {e.name}")
+        sys.exit(1)
+
+    if args.serve:
+        from audio_service import run_service
+        # Requests pick their own format and subtype, so the service ignores output targets
+        service_config = replace(ProcessorConfig(**process_kwargs), output_targets=None)
+        jobs = _resolve_jobs(args.jobs)
+        print(f"Processing service: {jobs} worker(s), {args.serve_queue_size} queued request(s), "
+              f"{args.serve_timeout_sec:g} s timeout, uploads up to {args.serve_max_upload_mb:g} MB")
+        run_service(service_config, args.serve_host, args.serve_port, jobs, args.serve_queue_size,
+                    args.serve_timeout_sec, args.serve_max_upload_mb)
+        return
 
     if args.input_dir is None:
         print("Error: Input directory not specified.")
@@ -1385,81 +6179,89 @@ Examples:
     else:
         output_dir = input_dir.parent / f"{input_dir.name}_processed"
 
+    # The scan runs while files are processed, so never walk into this run's own outputs
+    scan_exclude = list(args.exclude or [])
+    try:
+        output_subdir = output_dir.resolve().relative_to(input_dir.resolve())
+    except ValueError:
+        output_subdir = None
+    if output_subdir is not None and output_subdir.parts:
+        scan_exclude.append(glob.escape(output_subdir.as_posix()))
+
+    if args.analyze:
+        report_path = Path(args.analysis_report) if args.analysis_report else output_dir / DEFAULT_ANALYSIS_REPORT_NAME
+        jobs = _resolve_jobs(args.jobs)
+        print(f"Analyzing audio files in: {input_dir} (no audio is written)")
+        print(f"  Trim threshold: {args.trim_threshold_db} dBFS"
+              + (f", interior silences >= {args.min_silence_ms} ms collapsed" if args.enable_silence_collapse else ""))
+        print(f"  Worker processes: {jobs}")
+        print(f"  Report: {report_path}")
+        print("-" * 70)
+        analysis_kwargs = dict(
+            precision=args.precision,
+            trim_threshold_db=args.trim_threshold_db,
+            min_silence_ms=args.min_silence_ms,
+            collapse_silence=args.enable_silence_collapse,
+            silence_residual_ms=args.silence_residual_ms
+        )
+        found, failed = run_analysis(
+            iter_audio_files(input_dir, args.include, scan_exclude, args.max_depth, args.sorted_scan),
+            input_dir, report_path, analysis_kwargs, jobs
+        )
+        if not found:
+            print(f"No audio files found in: {input_dir}")
+            print("Supported formats: WAV, FLAC, OGG, MP3 (if libsndfile supports it)")
+        if not found or failed:
+            sys.exit(1)
+        return
+
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    print(f"Scanning for audio files in: {input_dir}")
-    audio_files = get_audio_files(input_dir)
+    jobs = _resolve_jobs(args.jobs)
+    profile_report_path = None
+    if args.profile:
+        profile_report_path = Path(args.profile_report) if args.profile_report else output_dir / DEFAULT_PROFILE_REPORT_NAME
+    print_batch_configuration(args, input_dir, output_dir, jobs, pipeline_config, output_targets, profile_report_path)
+    watcher = None
+    if args.watch:
+        from audio_watcher import DirectoryWatcher
+        # Started before the batch scan so files written during the batch are picked up after it
+        watcher = DirectoryWatcher(
+            input_dir, args.include, scan_exclude, args.max_depth,
+            args.watch_settle_sec, args.watch_use_inotify, args.watch_poll_sec
+        )
+        print(f"  Watch: {watcher.describe()}")
+    print("-" * 70)
 
-    if not audio_files:
+    runner = BatchRunner(input_dir, output_dir, process_kwargs, jobs, args.use_cache, args.pipelined_io,
+                         args.io_threads, args.prefetch, args.profile, watch=watcher is not None)
+    try:
+        runner.run(runner.discover(iter_audio_files(input_dir, args.include, scan_exclude, args.max_depth, args.sorted_scan)))
+    except BaseException:
+        if watcher is not None:
+            watcher.close()
+        runner.close(cancel=True)
+        raise
+    finally:
+        runner.save_manifest()
+    if watcher is None:
+        runner.close()
+
+    if not runner.found:
         print(f"No audio files found in: {input_dir}")
         print("Supported formats: WAV, FLAC, OGG, MP3 (if libsndfile supports it)")
-        sys.exit(1)
-
-    print(f"Found {len(audio_files)} audio file(s)")
-    print(f"Output directory: {output_dir}")
-    print(f"Configuration:")
-    print(f"  Trim threshold: {args.trim_threshold_db} dBFS")
-    print(f"  Min silence: {args.min_silence_ms} ms")
-    if args.xfade_duration_ms:
-        print(f"  Crossfade: {args.xfade_duration_ms} ms (EPCF, pre-normalize disabled)")
-    else:
-        print(f"  Crossfade: Disabled")
-    if args.use_peak_normalization:
-        print(f"  Normalization: Peak to {args.target_lufs} dBFS (preserves transients)")
-    else:
-        print(f"  Normalization: LUFS to {args.target_lufs} (ITU-R BS.1770)")
-    print(f"  Max peak: {args.max_peak_dbfs} dBFS (True Peak limit)")
-    if args.enable_noise_reduction:
-        print(f"  Noise reduction: threshold {args.noise_gate_threshold_db} dBFS, reduction {args.noise_reduction_db} dB, window {args.noise_gate_window_ms} ms")
-    else:
-        print("  Noise reduction: Disabled")
-    print(f"  Seamless loop enforcement: {'Enabled' if args.enforce_seamless_loop else 'Disabled'}")
-    if args.enforce_seamless_loop:
-        print(f"  Mirror blended seam onto start: {'Yes' if args.mirror_loop_start else 'No'}")
-    print(f"  Loop stabilization: {'Enabled' if args.enable_loop_stabilization else 'Disabled'}")
-    if args.enable_loop_stabilization:
-        print(f"  Target duration: {args.target_duration_sec or 'auto'} seconds")
-    print("-" * 70)
-
-    successful = 0
-    failed = 0
+        if watcher is None:
+            sys.exit(1)
 
-    for i, input_file in enumerate(audio_files, 1):
-        print(f"\n[{i}/{len(audio_files)}] Processing: {input_file.name}")
+    runner.print_summary()
+    if profile_report_path is not None:
+        runner.report_profile(profile_report_path, args.profile_slowest)
 
-        relative_path = input_file.relative_to(input_dir)
-        output_file = output_dir / relative_path
-
-        if process_audio_file(
-            input_file,
-            output_file,
-            trim_threshold_db=args.trim_threshold_db,
-            min_silence_ms=args.min_silence_ms,
-            xfade_duration_ms=args.xfade_duration_ms,
-            target_lufs=args.target_lufs,
-            max_peak_dbfs=args.max_peak_dbfs,
-            use_peak_normalization=args.use_peak_normalization,
-            enable_noise_reduction=args.enable_noise_reduction,
-            noise_gate_threshold_db=args.noise_gate_threshold_db,
-            noise_reduction_db=args.noise_reduction_db,
-            noise_gate_window_ms=args.noise_gate_window_ms,
-            noise_gate_attack_ms=args.noise_gate_attack_ms,
-            noise_gate_release_ms=args.noise_gate_release_ms,
-            enforce_seamless_loop=args.enforce_seamless_loop,
-            mirror_loop_start=args.mirror_loop_start,
-            enable_loop_stabilization=args.enable_loop_stabilization,
-            target_duration_sec=args.target_duration_sec
-        ):
-            successful += 1
-        else:
-            failed += 1
-
-    print("\n" + "=" * 70)
-    print(f"Batch processing complete!")
-    print(f"  Successful: {successful}")
-    print(f"  Failed: {failed}")
-    print(f"  Output directory: {output_dir}")
-    print("=" * 70)
+    if watcher is not None:
+        run_watch(runner, watcher)
 
 if __name__ == '__main__':
+    # audio_service and audio_watcher import audio_processor: let them share this module
+    # instead of loading a second copy of it
+    sys.modules.setdefault('audio_processor', sys.modules[__name__])
     main()
@@ -0,0 +1,468 @@
+"""
+Local HTTP processing service for `audio_processor.py --serve`.
+
+ProcessingService accepts uploads on POST /process, renders them with a warm
+AudioProcessor in a pool of worker processes and streams the result back. It also
+serves Prometheus metrics on GET /metrics and a liveness check on GET /health.
+audio_processor imports this module only for --serve.
+"""
+
+from __future__ import annotations
+
+import io
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, fields, replace
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import soundfile as sf
+
+from audio_processor import (
+    DEFAULT_SERVE_HOST,
+    DEFAULT_SERVE_MAX_UPLOAD_MB,
+    DEFAULT_SERVE_PORT,
+    DEFAULT_SERVE_QUEUE_SIZE,
+    DEFAULT_SERVE_TIMEOUT_SEC,
+    OUTPUT_FORMAT_EXTENSIONS,
+    AudioProcessor,
+    Pipeline,
+    ProcessorConfig,
+    _ignore_interrupts,
+    save_audio_file,
+)
+
+SERVE_OUTPUT_FORMATS = ('WAV', 'FLAC')
+SERVE_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SERVE_HEADER_TIMEOUT_SEC = 30.0  # Time a client gets to send its request line and headers
+SERVE_CHUNK_BYTES = 1 << 16  # Responses are written (and flow-controlled) in chunks of this size
+# ProcessorConfig fields a request cannot set: the service always returns one file
+SERVICE_FIXED_FIELDS = ('output_targets', 'encode_threads', 'seam_check', 'streaming_threshold_sec', 'stream_block_sec')
+SERVICE_PROCESSOR_CACHE_SIZE = 8  # Warm AudioProcessors (one per parameter set) kept by each service worker
+HTTP_REASONS = {
+    100: 'Continue', 200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    408: 'Request Timeout', 411: 'Length Required', 413: 'Content Too Large', 422: 'Unprocessable Content',
+    429: 'Too Many Requests', 500: 'Internal Server Error', 504: 'Gateway Timeout'
+}
+
+def _parse_field_value(text: str, field_type: str) -> object:
+    """
+    Parse a query-string value for a ProcessorConfig field of the given annotation.
+
+    Raises:
+        ValueError: If the text is not a valid value of that type
+    """
+    optional = field_type.startswith('Optional[')
+    base_type = field_type[len('Optional['):-1] if optional else field_type
+    if optional and text.lower() in ('', 'none', 'null'):
+        return None
+    if base_type == 'bool':
+        if text.lower() in ('1', 'true', 'yes', 'on'):
+            return True
+        if text.lower() in ('0', 'false', 'no', 'off'):
+            return False
+        raise ValueError("expected true or false")
+    if base_type == 'int':
+        return int(text)
+    if base_type == 'float':
+        value = float(text)
+        if not math.isfinite(value):
+            raise ValueError("expected a finite number")
+        return value
+    if base_type == 'str':
+        return text
+    return json.loads(text)
+
+def parse_service_query(base: ProcessorConfig, query: Dict[str, List[str]]) -> Tuple[ProcessorConfig, str, str]:
+    """
+    Apply the query parameters of a POST /process request to the service's config.
+
+    Parameters are ProcessorConfig field names, plus `format` (WAV or FLAC) and
+    `subtype` (default PCM_24) of the returned file. Numbers and booleans (true/false,
+    1/0) are given as text, 'none' clears an optional field and pipeline_config takes
+    a JSON list.
+
+    Args:
+        base: The service's config, which the parameters override
+        query: Parsed query string (see urllib.parse.parse_qs); the last value of a repeated parameter wins
+
+    Returns:
+        Tuple of (config, output_format, subtype)
+
+    Raises:
+        ValueError: If a parameter is unknown, fixed by the service or invalid
+    """
+    field_types = {config_field.name: str(config_field.type) for config_field in fields(ProcessorConfig)}
+    overrides = {}
+    output_format = 'WAV'
+    subtype = 'PCM_24'
+    for name, values in query.items():
+        value = values[-1]
+        if name == 'format':
+            output_format = value.upper()
+        elif name == 'subtype':
+            subtype = value.upper()
+        elif name in SERVICE_FIXED_FIELDS:
+            raise ValueError(f"'{name}' cannot be set per request")
+        elif name not in field_types:
+            raise ValueError(f"unknown parameter '{name}'")
+        else:
+            try:
+                overrides[name] = _parse_field_value(value, field_types[name])
+            except ValueError as e:
+                raise ValueError(f"invalid {name}={value!r} ({str(e)})")
+    if output_format not in SERVE_OUTPUT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(SERVE_OUTPUT_FORMATS)}")
+    if not sf.check_format(output_format, subtype):
+        raise ValueError(f"subtype {subtype} cannot be written as {output_format}")
+    config = replace(base, **overrides)
+    Pipeline.from_config(config.stage_config())
+    return config, output_format, subtype
+
+_SERVICE_PROCESSORS: 'OrderedDict[str, AudioProcessor]' = OrderedDict()
+
+def _service_task(audio_bytes: bytes, config: ProcessorConfig, output_format: str, subtype: str) -> dict:
+    """
+    Worker entry point of the HTTP service: decode an upload, process it and encode the result.
+
+    Each worker keeps an AudioProcessor per parameter set (up to SERVICE_PROCESSOR_CACHE_SIZE),
+    so repeated requests reuse the pipeline and warm kernels, as the batch workers do.
+
+    Returns:
+        Dictionary with the encoded 'body' and its level and timing, or an 'error'
+        message if the upload could not be decoded or processed
+    """
+    started = time.time()
+    try:
+        key = json.dumps(asdict(config), sort_keys=True)
+        processor = _SERVICE_PROCESSORS.pop(key, None) or AudioProcessor(config)
+        _SERVICE_PROCESSORS[key] = processor
+        while len(_SERVICE_PROCESSORS) > SERVICE_PROCESSOR_CACHE_SIZE:
+            _SERVICE_PROCESSORS.popitem(last=False)
+
+        audio_data, sample_rate = sf.read(io.BytesIO(audio_bytes), dtype=config.precision, always_2d=True)
+        if len(audio_data) == 0:
+            raise ValueError("the upload contains no audio")
+        result = processor.process(audio_data, sample_rate)
+        output = result.outputs[0]
+        encoded = io.BytesIO()
+        save_audio_file(output.audio_data, output.sample_rate, encoded, output_format, subtype)
+    except Exception as e:
+        return {'error': str(e) or type(e).__name__, 'started': started, 'processing_seconds': time.time() - started}
+    return {
+        'body': encoded.getvalue(),
+        'started': started,
+        'processing_seconds': time.time() - started,
+        'sample_rate': output.sample_rate,
+        'duration': len(output.audio_data) / output.sample_rate,
+        'peak_dbfs': output.peak_dbfs,
+        'loudness_lufs': output.loudness_lufs,
+        'character': result.character.label if result.character is not None else None
+    }
+
+class LatencyHistogram:
+    """
+    Cumulative latency histogram rendered in the Prometheus text format.
+
+    Args:
+        name: Metric name
+        description: HELP text
+        buckets: Upper bounds of the buckets in seconds, ascending
+    """
+
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...] = SERVE_LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.sum += seconds
+        for index, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.bucket_counts[index] += 1
+
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        lines.extend(
+            f'{self.name}_bucket{{le="{bound:g}"}} {count}' for bound, count in zip(self.buckets, self.bucket_counts)
+        )
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {self.sum:.6f}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+class ProcessingService:
+    """
+    Local HTTP service that processes uploaded audio in a pool of worker processes (see --serve).
+
+    Endpoints:
+        POST /process  The body is an audio file in any format libsndfile reads, sent with a
+                       Content-Length. Query parameters override the service's config (see
+                       parse_service_query). The processed file is streamed back with
+                       X-HQABP-* headers carrying its level, character and timing.
+        GET /metrics   Request counts, admission state and latency histograms (Prometheus text format)
+        GET /health    "ok" while the service runs
+
+    At most jobs + queue_size /process requests are admitted at once (uploading, waiting
+    for a worker or being processed). Further requests get 429 with a Retry-After estimate
+    straight away instead of piling up. Clients sending "Expect: 100-continue" are refused
+    before they upload. An admitted request that does not finish within timeout_sec gets 504;
+    its slot is only freed once its worker is actually done (or the queued task is
+    cancelled), so timeouts never overcommit the pool. Each connection carries one request.
+
+    Args:
+        config: Default processing parameters
+        jobs: Worker processes
+        queue_size: Requests admitted beyond one per worker
+        timeout_sec: Time allowed per request, from admission to the processed result
+        max_upload_bytes: Largest accepted upload
+    """
+
+    def __init__(
+        self,
+        config: ProcessorConfig,
+        jobs: int,
+        queue_size: int = DEFAULT_SERVE_QUEUE_SIZE,
+        timeout_sec: float = DEFAULT_SERVE_TIMEOUT_SEC,
+        max_upload_bytes: int = int(DEFAULT_SERVE_MAX_UPLOAD_MB * (1 << 20))
+    ):
+        self.config = config
+        self.jobs = max(1, jobs)
+        self.capacity = self.jobs + max(0, queue_size)
+        self.timeout_sec = timeout_sec
+        self.max_upload_bytes = max_upload_bytes
+        self.admitted = 0
+        self.responses: Dict[Tuple[str, int], int] = {}
+        self.request_latency = LatencyHistogram(
+            'hqabp_request_duration_seconds', 'Time from request to the end of a successful POST /process response')
+        self.queue_wait = LatencyHistogram(
+            'hqabp_queue_wait_seconds', 'Time an uploaded request waited for a worker')
+        self.processing = LatencyHistogram(
+            'hqabp_processing_seconds', 'Decode, processing and encode time in the worker')
+        self.pool: Optional[ProcessPoolExecutor] = None
+
+    async def serve(self, host: str = DEFAULT_SERVE_HOST, port: int = DEFAULT_SERVE_PORT) -> None:
+        """Start the worker pool and answer requests until cancelled."""
+        self.pool = ProcessPoolExecutor(max_workers=self.jobs, initializer=_ignore_interrupts)
+        try:
+            server = await asyncio.start_server(self._handle, host, port)
+            async with server:
+                bound_port = server.sockets[0].getsockname()[1]
+                print(f"Serving on http://{host}:{bound_port} (POST /process, GET /metrics, GET /health; Ctrl+C to stop)")
+                await server.serve_forever()
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+
+    def render_metrics(self) -> str:
+        """Return the /metrics document."""
+        lines = [
+            "# HELP hqabp_responses_total Responses sent, by endpoint and status code",
+            "# TYPE hqabp_responses_total counter",
+        ]
+        lines.extend(
+            f'hqabp_responses_total{{path="{path}",code="{status}"}} {count}'
+            for (path, status), count in sorted(self.responses.items())
+        )
+        lines.extend([
+            "# HELP hqabp_requests_admitted Requests uploading, queued or processing",
+            "# TYPE hqabp_requests_admitted gauge",
+            f"hqabp_requests_admitted {self.admitted}",
+            "# HELP hqabp_request_capacity Requests admitted at most before 429",
+            "# TYPE hqabp_request_capacity gauge",
+            f"hqabp_request_capacity {self.capacity}",
+            "# HELP hqabp_workers Worker processes",
+            "# TYPE hqabp_workers gauge",
+            f"hqabp_workers {self.jobs}",
+        ])
+        for histogram in (self.request_latency, self.queue_wait, self.processing):
+            lines.extend(histogram.render())
+        return "\n".join(lines) + "\n"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        start = time.perf_counter()
+        method, path, status = '-', '-', None
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), SERVE_HEADER_TIMEOUT_SEC)
+            if not request_line:
+                return
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+            headers = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), SERVE_HEADER_TIMEOUT_SEC)
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            url = urlsplit(target)
+            path = url.path
+            if path == '/process':
+                status = await self._process(method, url.query, headers, reader, writer)
+            elif path not in ('/metrics', '/health'):
+                status = await self._respond(writer, 404, b"Not found\n")
+            elif method != 'GET':
+                status = await self._respond(writer, 405, b"Use GET\n", headers={'Allow': 'GET'})
+            elif path == '/metrics':
+                status = await self._respond(writer, 200, self.render_metrics().encode(),
+                                             content_type='text/plain; version=0.0.4; charset=utf-8')
+            else:
+                status = await self._respond(writer, 200, b"ok\n")
+        except (ValueError, asyncio.TimeoutError, asyncio.LimitOverrunError):
+            if status is None:
+                status = await self._respond(writer, 400, b"Malformed request\n")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # Client went away
+        finally:
+            if status is not None:
+                key = (path if path in ('/process', '/metrics', '/health') else 'other', status)
+                self.responses[key] = self.responses.get(key, 0) + 1
+                print(f"  {method} {path} {status} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _process(
+        self,
+        method: str,
+        query: str,
+        headers: Dict[str, str],
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> int:
+        start = time.perf_counter()
+        length = int(headers.get('content-length', '0'))
+        expects_continue = headers.get('expect', '').lower() == '100-continue'
+
+        async def reject(status: int, message: str, reject_headers: Optional[Dict[str, str]] = None) -> int:
+            await self._respond(writer, status, f"{message}\n".encode(), headers=reject_headers)
+            if not expects_continue and length <= self.max_upload_bytes:
+                await self._discard(reader, length)  # So the client can read the response after sending its upload
+            return status
+
+        if method != 'POST':
+            return await reject(405, "Use POST with the audio file as the body", {'Allow': 'POST'})
+        if 'content-length' not in headers:
+            return await reject(411, "Send the upload with a Content-Length")
+        if length > self.max_upload_bytes:
+            return await reject(413, f"Uploads are limited to {self.max_upload_bytes} bytes")
+        try:
+            config, output_format, subtype = parse_service_query(self.config, parse_qs(query, keep_blank_values=True))
+        except ValueError as e:
+            return await reject(400, str(e))
+        if length <= 0:
+            return await reject(400, "Empty upload")
+        if self.admitted >= self.capacity:
+            # Mean time one worker needs per request, times the requests ahead per worker
+            retry_after = max(1, math.ceil(self.processing.mean() * self.admitted / self.jobs))
+            return await reject(429, "Too many requests in progress, retry later", {'Retry-After': str(retry_after)})
+
+        self.admitted += 1
+        future = None
+        try:
+            if expects_continue:
+                writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+            audio_bytes = await asyncio.wait_for(reader.readexactly(length), self.timeout_sec)
+            loop = asyncio.get_running_loop()
+            submitted = time.time()
+            future = self.pool.submit(_service_task, audio_bytes, config, output_format, subtype)
+            future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+            del audio_bytes
+            remaining = self.timeout_sec - (time.perf_counter() - start)
+            # Cancelling the wrapper on timeout cancels the task if no worker has started it
+            result = await asyncio.wait_for(asyncio.wrap_future(future), max(0.0, remaining))
+        except asyncio.TimeoutError:
+            if future is None:
+                return await self._respond(writer, 408, b"Upload timed out\n")
+            return await self._respond(writer, 504, f"Processing exceeded {self.timeout_sec:g} s\n".encode())
+        except Exception as e:
+            if future is None:
+                raise
+            return await self._respond(writer, 500, f"Worker failed: {str(e)}\n".encode())
+        finally:
+            if future is None:
+                self._release()
+
+        self.queue_wait.observe(max(0.0, result['started'] - submitted))
+        self.processing.observe(result['processing_seconds'])
+        if 'error' in result:
+            return await self._respond(writer, 422, f"Could not process the upload: {result['error']}\n".encode())
+        headers = {
+            'Content-Disposition': f'attachment; filename="processed{OUTPUT_FORMAT_EXTENSIONS[output_format]}"',
+            'X-HQABP-Sample-Rate': str(result['sample_rate']),
+            'X-HQABP-Duration-Seconds': f"{result['duration']:.6f}",
+            'X-HQABP-Peak-dBFS': f"{result['peak_dbfs']:.2f}",
+            'X-HQABP-Queue-Seconds': f"{max(0.0, result['started'] - submitted):.4f}",
+            'X-HQABP-Processing-Seconds': f"{result['processing_seconds']:.4f}",
+        }
+        if result['loudness_lufs'] is not None:
+            headers['X-HQABP-Loudness-LUFS'] = f"{result['loudness_lufs']:.2f}"
+        if result['character'] is not None:
+            headers['X-HQABP-Character'] = result['character']
+        status = await self._respond(writer, 200, result['body'], content_type=f"audio/{output_format.lower()}",
+                                     headers=headers)
+        self.request_latency.observe(time.perf_counter() - start)
+        return status
+
+    def _release(self) -> None:
+        self.admitted -= 1
+
+    @staticmethod
+    async def _discard(reader: asyncio.StreamReader, length: int) -> None:
+        try:
+            while length > 0:
+                chunk = await asyncio.wait_for(reader.read(min(length, SERVE_CHUNK_BYTES)), SERVE_HEADER_TIMEOUT_SEC)
+                if not chunk:
+                    return
+                length -= len(chunk)
+        except asyncio.TimeoutError:
+            pass
+
+    @staticmethod
+    async def _respond(
+        writer: asyncio.StreamWriter,
+        status: int,
+        body: bytes,
+        content_type: str = 'text/plain; charset=utf-8',
+        headers: Optional[Dict[str, str]] = None
+    ) -> int:
+        """Send a complete response, writing the body in flow-controlled chunks; return the status."""
+        head = [f"HTTP/1.1 {status} {HTTP_REASONS[status]}", f"Content-Type: {content_type}",
+                f"Content-Length: {len(body)}", "Connection: close"]
+        head.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1'))
+        view = memoryview(body)
+        for offset in range(0, len(body), SERVE_CHUNK_BYTES):
+            writer.write(view[offset:offset + SERVE_CHUNK_BYTES])
+            await writer.drain()
+        await writer.drain()
+        return status
+
+def run_service(
+    config: ProcessorConfig,
+    host: str = DEFAULT_SERVE_HOST,
+    port: int = DEFAULT_SERVE_PORT,
+    jobs: int = 1,
+    queue_size: int = DEFAULT_SERVE_QUEUE_SIZE,
+    timeout_sec: float = DEFAULT_SERVE_TIMEOUT_SEC,
+    max_upload_mb: float = DEFAULT_SERVE_MAX_UPLOAD_MB
+) -> None:
+    """
+    Run a ProcessingService until Ctrl+C.
+    """
+    service = ProcessingService(config, jobs, queue_size, timeout_sec, int(max_upload_mb * (1 << 20)))
+    try:
+        asyncio.run(service.serve(host, port))
+    except KeyboardInterrupt:
+        print("\nService stopped.")
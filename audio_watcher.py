@@ -0,0 +1,321 @@
+"""
+Directory watching for `audio_processor.py --watch`.
+
+DirectoryWatcher reports audio files that appear or change under the input directory
+once they are fully written, through Linux inotify (a small ctypes binding, no extra
+dependency) or by polling. audio_processor imports this module only for --watch.
+"""
+
+from __future__ import annotations
+
+import os
+import ctypes
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from audio_processor import (
+    AUDIO_EXTENSIONS,
+    DEFAULT_EXCLUDE_PATTERNS,
+    DEFAULT_INCLUDE_PATTERNS,
+    DEFAULT_MAX_DEPTH,
+    DEFAULT_WATCH_POLL_SEC,
+    DEFAULT_WATCH_SETTLE_SEC,
+    DEFAULT_WATCH_USE_INOTIFY,
+    _matches_any,
+    iter_audio_files,
+)
+
+class _Inotify:
+    """
+    Minimal ctypes binding of Linux inotify for watching directories.
+
+    The constructor raises OSError where inotify is unavailable (other platforms, or
+    the C library lacks it), so callers can fall back to polling.
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_ONLYDIR
+    EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+    def __init__(self):
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            inotify_init1 = libc.inotify_init1
+            self._inotify_add_watch = libc.inotify_add_watch
+        except (OSError, AttributeError) as e:
+            raise OSError(f"inotify is not available ({str(e)})")
+        self._inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify is not available ({os.strerror(errno)})")
+        self.directories: Dict[int, Path] = {}
+
+    def add_watch(self, directory: Path) -> None:
+        """Watch a directory (not its subdirectories) for entries created or written."""
+        wd = self._inotify_add_watch(self.fd, os.fsencode(directory), self.WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"cannot watch {directory} ({os.strerror(errno)})")
+        self.directories[wd] = directory
+
+    def read_events(self, timeout: Optional[float]) -> Optional[List[Tuple[Path, bool]]]:
+        """
+        Wait up to timeout seconds (None = indefinitely) for events.
+
+        Returns:
+            (path, is_directory) per entry created, written or moved in, or None if the
+            kernel queue overflowed and events were lost
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return []
+        events = []
+        overflowed = False
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                overflowed = True
+            elif mask & self.IN_IGNORED:
+                self.directories.pop(wd, None)  # Watched directory was removed
+            elif name and wd in self.directories:
+                events.append((self.directories[wd] / os.fsdecode(name), bool(mask & self.IN_ISDIR)))
+        return None if overflowed else events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+class DirectoryWatcher:
+    """
+    Reports audio files under a directory that appear or change, once they are fully written.
+
+    Changes are noticed through Linux inotify where available and by rescanning every
+    poll_sec seconds otherwise. A new or changed file is debounced: it is reported
+    only after its size and modification time have held still for settle_sec, so
+    files still being copied or rendered are not picked up half-written. Files are
+    filtered like iter_audio_files; deletions are ignored.
+
+    Create the watcher before the initial batch scan so changes made during the batch
+    are reported afterwards (the batch cache skips files it already processed).
+
+    Args:
+        folder_path: Directory to watch
+        include: Glob patterns a file must match (None = every audio file)
+        exclude: Glob patterns for files and directories to skip
+        max_depth: Directory levels to watch below folder_path (None = unlimited)
+        settle_sec: Seconds a file's size and mtime must stay unchanged
+        use_inotify: Use inotify if available (False = always poll)
+        poll_sec: Rescan interval when polling
+    """
+
+    def __init__(
+        self,
+        folder_path: Path,
+        include: Optional[List[str]] = DEFAULT_INCLUDE_PATTERNS,
+        exclude: Optional[List[str]] = DEFAULT_EXCLUDE_PATTERNS,
+        max_depth: Optional[int] = DEFAULT_MAX_DEPTH,
+        settle_sec: float = DEFAULT_WATCH_SETTLE_SEC,
+        use_inotify: bool = DEFAULT_WATCH_USE_INOTIFY,
+        poll_sec: float = DEFAULT_WATCH_POLL_SEC
+    ):
+        self.folder_path = Path(folder_path)
+        self.include = include
+        self.exclude = exclude
+        self.max_depth = max_depth
+        self.settle_sec = settle_sec
+        self.poll_sec = poll_sec
+        self._inotify = None
+        if use_inotify:
+            try:
+                self._inotify = _Inotify()
+                self._watch_tree(self.folder_path, '', 0)
+            except OSError as e:
+                self._fall_back_to_polling(str(e))
+        # Watches go in before the snapshot, so nothing written in between is missed
+        self._known = self._snapshot()
+        self._pending: Dict[Path, Tuple[Tuple[int, int], float]] = {}
+        self._next_poll = time.monotonic() + poll_sec
+
+    def __enter__(self) -> 'DirectoryWatcher':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def describe(self) -> str:
+        """Return how changes are detected, for the configuration summary."""
+        method = 'inotify' if self._inotify is not None else f"polling every {self.poll_sec:g}s"
+        return f"{method}, files processed once unchanged for {self.settle_sec:g}s"
+
+    def wait_for_changes(self, timeout: Optional[float] = None) -> List[Path]:
+        """
+        Block until at least one new or changed audio file has settled.
+
+        Args:
+            timeout: Seconds to wait at most (None = until something changes)
+
+        Returns:
+            Sorted paths of the settled files (empty if the timeout expired first)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            now = time.monotonic()
+            settled = self._collect_settled(now)
+            if settled:
+                return settled
+            if deadline is not None and now >= deadline:
+                return []
+            wake_times = [since + self.settle_sec for _, since in self._pending.values()]
+            if self._inotify is None:
+                wake_times.append(self._next_poll)
+            if deadline is not None:
+                wake_times.append(deadline)
+            wait_sec = max(0.0, min(wake_times) - now) if wake_times else None
+
+            if self._inotify is not None:
+                events = self._inotify.read_events(wait_sec)
+                if events is None:
+                    print("  Warning: too many changes at once for inotify, rescanning")
+                    self._rescan()
+                    continue
+                for path, is_directory in events:
+                    try:
+                        if is_directory:
+                            self._add_directory(path)
+                        elif self._accepts(path):
+                            self._consider(path, time.monotonic())
+                    except (FileNotFoundError, NotADirectoryError):
+                        continue  # Removed again before it could be watched
+                    except OSError as e:
+                        # Typically the inotify watch limit; a rescan catches what was missed
+                        self._fall_back_to_polling(str(e))
+                        self._rescan()
+                        break
+            else:
+                time.sleep(wait_sec)
+                if time.monotonic() >= self._next_poll:
+                    self._rescan()
+                    self._next_poll = time.monotonic() + self.poll_sec
+
+    def _fall_back_to_polling(self, reason: str) -> None:
+        print(f"  Warning: {reason}; watching by polling every {self.poll_sec:g}s instead")
+        self.close()
+
+    def _watch_tree(self, directory: Path, prefix: str, depth: int) -> None:
+        """Add inotify watches for a directory and the subdirectories iter_audio_files would walk."""
+        self._inotify.add_watch(directory)
+        if self.max_depth is not None and depth >= self.max_depth:
+            return
+        try:
+            with os.scandir(directory) as scan:
+                subdirectories = [entry for entry in scan if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            if depth == 0:
+                raise
+            return
+        for entry in subdirectories:
+            relative_path = prefix + entry.name
+            if not _matches_any(relative_path, self.exclude):
+                self._watch_tree(Path(entry.path), relative_path + '/', depth + 1)
+
+    def _add_directory(self, directory: Path) -> None:
+        """Watch a directory created or moved in, and consider the audio files already inside."""
+        relative_path = directory.relative_to(self.folder_path).as_posix()
+        parts = relative_path.split('/')
+        if self.max_depth is not None and len(parts) > self.max_depth:
+            return
+        if any(_matches_any('/'.join(parts[:index]), self.exclude) for index in range(1, len(parts) + 1)):
+            return
+        self._watch_tree(directory, relative_path + '/', len(parts))
+        now = time.monotonic()
+        for input_file in iter_audio_files(
+            directory, self.include, self.exclude, self.max_depth, _prefix=relative_path + '/', _depth=len(parts)
+        ):
+            self._consider(input_file, now)
+
+    def _accepts(self, path: Path) -> bool:
+        """Return True if iter_audio_files would yield this file (its type is not checked)."""
+        if os.path.splitext(path.name)[1].lower() not in AUDIO_EXTENSIONS:
+            return False
+        relative_path = path.relative_to(self.folder_path).as_posix()
+        parts = relative_path.split('/')
+        if self.max_depth is not None and len(parts) - 1 > self.max_depth:
+            return False
+        if any(_matches_any('/'.join(parts[:index]), self.exclude) for index in range(1, len(parts) + 1)):
+            return False
+        return not self.include or _matches_any(relative_path, self.include)
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for input_file in iter_audio_files(self.folder_path, self.include, self.exclude, self.max_depth):
+            signature = self._signature(input_file)
+            if signature is not None:
+                snapshot[input_file] = signature
+        return snapshot
+
+    def _rescan(self) -> None:
+        now = time.monotonic()
+        for input_file, signature in self._snapshot().items():
+            if signature != self._known.get(input_file):
+                self._consider(input_file, now, signature)
+
+    def _consider(self, path: Path, now: float, signature: Optional[Tuple[int, int]] = None) -> None:
+        """Start (or restart) the settle timer of a file whose size or mtime changed."""
+        if signature is None:
+            signature = self._signature(path)
+        if signature is None or signature == self._known.get(path):
+            self._pending.pop(path, None)
+            return
+        pending = self._pending.get(path)
+        if pending is None or pending[0] != signature:
+            self._pending[path] = (signature, now)
+
+    def _collect_settled(self, now: float) -> List[Path]:
+        settled = []
+        for path, (signature, since) in list(self._pending.items()):
+            if now - since < self.settle_sec:
+                continue
+            current = self._signature(path)
+            if current is None:
+                del self._pending[path]
+            elif current != signature:
+                self._pending[path] = (current, now)  # Still being written
+            else:
+                del self._pending[path]
+                self._known[path] = signature
+                settled.append(path)
+        return sorted(settled)